@@ -0,0 +1,240 @@
+"""
+End-to-end throughput and latency harness.
+
+Runs N simulated jobs (fetch formats, then download) through Downloader
+and the GUI queue plumbing, with benchmarks/fake_ytdlp.py standing in for
+yt-dlp. Because the fake's timing is known, everything on top of it is
+the app's own overhead.
+
+Usage:
+    python benchmarks/e2e_harness.py --jobs 10 --line-rate 500 --output e2e.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import queue
+import shutil
+import argparse
+import tempfile
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+FAKE_YTDLP = os.path.join(BENCH_DIR, "fake_ytdlp.py")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from downloader import Downloader
+
+
+def make_fake_executable(folder):
+    """Write a wrapper so the fake can be launched as a single executable path."""
+    if os.name == 'nt':
+        path = os.path.join(folder, "yt-dlp.cmd")
+        with open(path, "w") as f:
+            f.write(f'@"{sys.executable}" "{FAKE_YTDLP}" %*\r\n')
+    else:
+        path = os.path.join(folder, "yt-dlp")
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_YTDLP}" "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class EventPump:
+    """
+    Delivers downloader queue messages the way the GUI does.
+
+    Uses QueueHandler polled at the GUI's timer interval when PyQt5 is
+    available, and drains the raw queue at the same interval otherwise.
+    """
+
+    def __init__(self, download_queue, poll_interval):
+        self.queue = download_queue
+        self.poll_interval = poll_interval
+        self.events = []  # (type, payload, receive time)
+        self.handler = None
+        try:
+            from PyQt5.QtCore import QCoreApplication
+            from gui.utils.queue_handler import QueueHandler
+            self.app = QCoreApplication.instance() or QCoreApplication([])
+            self.handler = QueueHandler(download_queue)
+            self._connect()
+            self.mode = "QueueHandler"
+        except ImportError:
+            self.mode = "raw queue (PyQt5 not available)"
+
+    def _connect(self):
+        handler = self.handler
+        handler.formats_signal.connect(lambda data: self._record("formats", data))
+        handler.progress_signal.connect(lambda data: self._record("progress", data))
+        handler.download_complete_signal.connect(lambda data: self._record("download_complete", data))
+        handler.download_error_signal.connect(lambda data: self._record("download_error", data))
+        handler.merge_failed_signal.connect(lambda data: self._record("download_error", data))
+        handler.error_signal.connect(lambda data: self._record("error", data))
+        handler.enable_fetch_signal.connect(lambda data: self._record("enable_fetch", data))
+
+    def _record(self, event_type, payload):
+        self.events.append((event_type, payload, time.time()))
+
+    def poll(self):
+        if self.handler is not None:
+            self.handler.check_queue()
+            return
+        while True:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            payload = list(message[1:]) if message[0] == "progress" else (message[1] if len(message) > 1 else None)
+            self._record(message[0], payload)
+
+    def wait_for(self, event_types, timeout):
+        """Poll until one of event_types arrives; returns (type, payload, time) or None."""
+        deadline = time.time() + timeout
+        seen = len(self.events)
+        while time.time() < deadline:
+            self.poll()
+            for event in self.events[seen:]:
+                if event[0] in event_types:
+                    return event
+            seen = len(self.events)
+            time.sleep(self.poll_interval)
+        return None
+
+
+def run_job(downloader, pump, index, folder, config, timelog):
+    """Run one fetch + download and return its measurements."""
+    url = f"https://example.com/watch?v=job{index}"
+    result = {"job": index}
+
+    start = time.time()
+    downloader.fetch_formats(url, "1")
+    event = pump.wait_for({"formats", "error"}, timeout=60)
+    if event is None or event[0] != "formats":
+        result["error"] = f"fetch failed: {event[1] if event else 'timeout'}"
+        return result
+    pump.wait_for({"enable_fetch"}, timeout=5)
+    result["fetch_s"] = event[2] - start
+    result["fetch_overhead_s"] = result["fetch_s"] - config["extract_delay"]
+
+    formats = event[1]
+    if os.path.exists(timelog):
+        os.remove(timelog)
+    first_progress = len(pump.events)
+    start = time.time()
+    ok, error = downloader.start_download(url, "1", formats[0], folder, f"job {index}")
+    if not ok:
+        result["error"] = error
+        return result
+    event = pump.wait_for({"download_complete", "download_error"}, timeout=600)
+    if event is None or event[0] != "download_complete":
+        result["error"] = f"download failed: {event[1] if event else 'timeout'}"
+        return result
+
+    streams = 2  # "<video>+bestaudio"
+    simulated = (config["extract_delay"] + streams * config["lines"] / config["line_rate"]
+                 + config["merge_delay"])
+    result["download_s"] = event[2] - start
+    result["download_overhead_s"] = result["download_s"] - simulated
+
+    # Match fake emit times to GUI receive times, line for line
+    received = [e[2] for e in pump.events[first_progress:] if e[0] == "progress"]
+    emitted = []
+    if os.path.exists(timelog):
+        with open(timelog) as f:
+            emitted = [float(line.split()[1]) for line in f if line.strip()]
+    latencies = [(r - e) * 1000 for e, r in zip(emitted, received)]
+    result["progress_events"] = len(received)
+    result["progress_lines"] = len(emitted)
+    result["latency_ms_p50"] = percentile(latencies, 50)
+    result["latency_ms_p95"] = percentile(latencies, 95)
+    result["latency_ms_max"] = max(latencies) if latencies else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end harness using a fake yt-dlp.")
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--extract-delay", type=float, default=0.2)
+    parser.add_argument("--line-rate", type=float, default=200)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--total-mib", type=float, default=50)
+    parser.add_argument("--merge-delay", type=float, default=0.5)
+    parser.add_argument("--stderr-noise", type=float, default=0.0)
+    parser.add_argument("--fail-at", type=float, default=None, help="Inject a failure at this percent")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="GUI queue timer interval (s)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    config = {
+        "extract_delay": args.extract_delay, "line_rate": args.line_rate, "lines": args.lines,
+        "merge_delay": args.merge_delay,
+    }
+    workdir = tempfile.mkdtemp(prefix="e2e_harness_")
+    timelog = os.path.join(workdir, "timelog.txt")
+    os.environ.update({
+        "FAKE_YTDLP_EXTRACT_DELAY": str(args.extract_delay),
+        "FAKE_YTDLP_LINE_RATE": str(args.line_rate),
+        "FAKE_YTDLP_LINES": str(args.lines),
+        "FAKE_YTDLP_TOTAL_MIB": str(args.total_mib),
+        "FAKE_YTDLP_MERGE_DELAY": str(args.merge_delay),
+        "FAKE_YTDLP_STDERR_NOISE": str(args.stderr_noise),
+        "FAKE_YTDLP_FAIL_AT": "" if args.fail_at is None else str(args.fail_at),
+        "FAKE_YTDLP_TIMELOG": timelog,
+    })
+
+    try:
+        download_queue = queue.Queue()
+        downloader = Downloader(download_queue)
+        downloader.ytdlp_exe = make_fake_executable(workdir)
+        pump = EventPump(download_queue, args.poll_interval)
+        pump.poll()  # Drop the startup "yt-dlp not found" message, if any
+        pump.events.clear()
+
+        folder = os.path.join(workdir, "downloads")
+        os.makedirs(folder)
+        jobs = [run_job(downloader, pump, i, folder, config, timelog) for i in range(args.jobs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    done = [job for job in jobs if "error" not in job]
+
+    def summary(key):
+        values = [job[key] for job in done if job.get(key) is not None]
+        return statistics.median(values) if values else None
+
+    report = {
+        "dispatch": pump.mode,
+        "config": vars(args),
+        "jobs": jobs,
+        "summary": {
+            "completed": len(done),
+            "failed": len(jobs) - len(done),
+            "median_fetch_overhead_s": summary("fetch_overhead_s"),
+            "median_download_overhead_s": summary("download_overhead_s"),
+            "median_latency_ms_p50": summary("latency_ms_p50"),
+            "median_latency_ms_p95": summary("latency_ms_p95"),
+        },
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report["summary"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
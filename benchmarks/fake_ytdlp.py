@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Scriptable stand-in for the yt-dlp binary.
+
+Understands the subset of the yt-dlp command line the app uses
+(--dump-json, --flat-playlist, --load-info-json, --format, --output,
+--extract-audio, --merge-output-format, --print after_move:filepath)
+and prints output in yt-dlp's format, so Downloader can be exercised
+end-to-end without network access.
+
+Behaviour is configured through environment variables:
+
+    FAKE_YTDLP_EXTRACT_DELAY   Seconds spent "extracting" before any output (default 0.2)
+    FAKE_YTDLP_LINE_RATE       Progress lines per second (default 200)
+    FAKE_YTDLP_LINES           Progress lines per stream (default 200, max 1000)
+    FAKE_YTDLP_TOTAL_MIB       Size of each stream in MiB (default 50)
+    FAKE_YTDLP_FAIL_AT         Exit with an error once this percent is reached
+    FAKE_YTDLP_FAIL_CODE       Exit code used for injected failures (default 1)
+    FAKE_YTDLP_STDERR_NOISE    Probability of a noise line on stderr per progress line (default 0)
+    FAKE_YTDLP_MERGE_DELAY     Seconds spent in the merge phase for "A+B" formats (default 0.5)
+    FAKE_YTDLP_INFO_JSON       Path to a (optionally gzipped) --dump-json payload to replay
+    FAKE_YTDLP_TIMELOG         File that receives "<percent> <unix time>" for every progress line
+    FAKE_YTDLP_SEED            Random seed for noise injection
+    FAKE_YTDLP_PLAYLIST_SIZE   Entries listed by --flat-playlist (default 5)
+    FAKE_YTDLP_FAIL_IDS        Comma-separated video ids whose extraction fails
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+from urllib.parse import urlparse, parse_qs
+
+# Flags that consume the following argument
+VALUE_FLAGS = {
+    '--format', '-f', '--output', '-o', '--socket-timeout', '--retries', '--ffmpeg-location',
+    '--audio-format', '--audio-quality', '--merge-output-format', '--limit-rate', '-r',
+    '--print', '--download-archive', '--concurrent-fragments', '-N', '--playlist-items',
+    '--load-info-json',
+}
+
+
+def env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def parse_args(argv):
+    """Split argv into a flag dict and positional URLs."""
+    flags = {}
+    urls = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in VALUE_FLAGS and i + 1 < len(argv):
+            flags.setdefault(arg, []).append(argv[i + 1])
+            i += 2
+            continue
+        if arg.startswith('-'):
+            flags.setdefault(arg, []).append(True)
+        else:
+            urls.append(arg)
+        i += 1
+    return flags, urls
+
+
+def default_info(url):
+    """A small but realistic --dump-json payload."""
+    formats = [
+        {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2", "abr": 129.5, "filesize": 10296000},
+        {"format_id": "251", "ext": "webm", "vcodec": "none", "acodec": "opus", "abr": 131.7, "filesize": 10471000},
+    ]
+    for format_id, height in (("160", 144), ("133", 240), ("134", 360), ("135", 480), ("136", 720), ("137", 1080)):
+        formats.append({"format_id": format_id, "ext": "mp4", "vcodec": "avc1.64001F", "acodec": "none",
+                        "height": height, "width": height * 16 // 9, "fps": 30, "filesize": height * 150000})
+    # Playlist entries get their id (and a matching title) from the ?v= parameter
+    video_id = parse_qs(urlparse(url).query).get("v", ["fakeid00001"])[0]
+    title = "Fake Video" if video_id == "fakeid00001" else f"Fake Video {video_id}"
+    return {"id": video_id, "title": title, "extractor": "fake", "extractor_key": "Fake",
+            "webpage_url": url, "duration": 634, "formats": formats}
+
+
+def flat_playlist(url):
+    """--flat-playlist entries for a fake playlist."""
+    count = int(env_float("FAKE_YTDLP_PLAYLIST_SIZE", 5))
+    for index in range(1, count + 1):
+        video_id = f"fake{index:05d}"
+        yield {"_type": "url", "ie_key": "Fake", "id": video_id, "title": f"Fake Video {video_id}",
+               "url": f"https://example.com/watch?v={video_id}", "playlist_index": index,
+               "playlist_count": count, "playlist_title": "Fake Playlist", "playlist_id": "fakelist"}
+
+
+def load_info(url):
+    path = os.environ.get("FAKE_YTDLP_INFO_JSON")
+    if not path:
+        return default_info(url)
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_output(template, info, ext):
+    """Expand the handful of output template fields the app uses."""
+    return (template.replace('%(ext)s', ext)
+                    .replace('%(title)s', info.get('title', 'video'))
+                    .replace('%(id)s', info.get('id', 'id')))
+
+
+def emit_stream(destination, total_mib, lines, line_rate, fail_at, noise, timelog):
+    """Print a download phase for one stream; returns False on injected failure."""
+    print(f"[download] Destination: {destination}", flush=True)
+    interval = 1.0 / line_rate if line_rate > 0 else 0
+    speed = total_mib / (lines * interval) if interval else 100.0
+    next_time = time.perf_counter()
+    for i in range(lines + 1):
+        percent = 100.0 * i / lines
+        remaining = (total_mib * (1 - percent / 100)) / speed if speed else 0
+        print(f"[download] {percent:5.1f}% of {total_mib:9.2f}MiB at {speed:7.2f}MiB/s "
+              f"ETA {int(remaining) // 60:02d}:{int(remaining) % 60:02d}", flush=True)
+        if timelog:
+            timelog.write(f"{percent:.1f} {time.time():.6f}\n")
+        if noise and random.random() < noise:
+            print(f"WARNING: [fake] simulated stderr noise at {percent:.1f}%", file=sys.stderr, flush=True)
+        if fail_at is not None and percent >= fail_at:
+            print(f"ERROR: [fake] injected failure at {percent:.1f}%", file=sys.stderr, flush=True)
+            return False
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    print(f"[download] 100% of {total_mib:9.2f}MiB in 00:00:{int(lines * interval) % 60:02d} "
+          f"at {speed:.2f}MiB/s", flush=True)
+    return True
+
+
+def main(argv):
+    flags, urls = parse_args(argv)
+    if '--version' in flags:
+        print("2099.01.01-fake")
+        return 0
+    if not urls and '--load-info-json' not in flags:
+        print("ERROR: You must provide at least one URL.", file=sys.stderr)
+        return 2
+
+    random.seed(os.environ.get("FAKE_YTDLP_SEED", "0"))
+    url = urls[-1] if urls else ""
+    time.sleep(env_float("FAKE_YTDLP_EXTRACT_DELAY", 0.2))
+
+    if '--flat-playlist' in flags and '--dump-json' in flags:
+        for entry in flat_playlist(url):
+            print(json.dumps(entry), flush=True)
+        return 0
+
+    if '--load-info-json' in flags:
+        with open(flags['--load-info-json'][-1], encoding='utf-8') as f:
+            info = json.load(f)
+    else:
+        info = load_info(url)
+    if info.get('id') in os.environ.get("FAKE_YTDLP_FAIL_IDS", "").split(","):
+        print(f"ERROR: [fake] {info['id']}: Video unavailable", file=sys.stderr, flush=True)
+        return 1
+
+    if '--dump-json' in flags:
+        print(json.dumps(info), flush=True)
+        return 0
+
+    print(f"[generic] Extracting URL: {url}", flush=True)
+    print(f"[{info.get('extractor', 'generic')}] {info.get('id')}: Downloading webpage", flush=True)
+
+    format_spec = flags.get('--format', flags.get('-f', ['best']))[-1]
+    streams = format_spec.split('+')
+    print(f"[info] {info.get('id')}: Downloading 1 format(s): {format_spec}", flush=True)
+
+    extract_audio = '--extract-audio' in flags
+    merge_ext = flags.get('--merge-output-format', [None])[-1]
+    audio_ext = flags.get('--audio-format', ['mp3'])[-1]
+    template = flags.get('--output', flags.get('-o', ['%(title)s.%(ext)s']))[-1]
+
+    lines = max(1, min(int(env_float("FAKE_YTDLP_LINES", 200)), 1000))
+    total_mib = env_float("FAKE_YTDLP_TOTAL_MIB", 50)
+    line_rate = env_float("FAKE_YTDLP_LINE_RATE", 200)
+    fail_at = os.environ.get("FAKE_YTDLP_FAIL_AT")
+    fail_at = float(fail_at) if fail_at not in (None, "") else None
+    fail_code = int(env_float("FAKE_YTDLP_FAIL_CODE", 1))
+    noise = env_float("FAKE_YTDLP_STDERR_NOISE", 0)
+
+    timelog_path = os.environ.get("FAKE_YTDLP_TIMELOG")
+    timelog = open(timelog_path, 'a') if timelog_path else None
+    try:
+        parts = []
+        for index, stream in enumerate(streams):
+            ext = 'm4a' if (index > 0 or extract_audio) else 'mp4'
+            part_ext = f"f{stream}.{ext}" if len(streams) > 1 else ext
+            destination = render_output(template, info, part_ext)
+            if not emit_stream(destination, total_mib, lines, line_rate, fail_at, noise, timelog):
+                return fail_code
+            parts.append(destination)
+
+        if len(streams) > 1:
+            final = render_output(template, info, merge_ext or 'mkv')
+            print(f'[Merger] Merging formats into "{final}"', flush=True)
+            time.sleep(env_float("FAKE_YTDLP_MERGE_DELAY", 0.5))
+        elif extract_audio:
+            final = render_output(template, info, audio_ext)
+            print(f"[ExtractAudio] Destination: {final}", flush=True)
+        else:
+            final = parts[0]
+
+        # Create a sparse file of the right size instead of writing real data
+        os.makedirs(os.path.dirname(os.path.abspath(final)), exist_ok=True)
+        with open(final, 'wb') as f:
+            f.truncate(int(total_mib * len(streams) * 1048576))
+        if 'after_move:filepath' in flags.get('--print', []):
+            print(os.path.abspath(final), flush=True)
+        return 0
+    finally:
+        if timelog:
+            timelog.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,389 @@
+"""
+Local HTTP server that emulates a media CDN for download benchmarks.
+
+Serves generated media files plus HLS and DASH manifests, and can shape
+each connection: bandwidth caps, added latency, Range requests, random
+5xx/429 responses and connection resets. Everything is deterministic for
+a given seed, so runs are reproducible without the internet.
+
+Routes:
+    /media/<name>.mp4[?size=BYTES]       Progressive file (Range supported)
+    /hls/master.m3u8                     Master playlist (360p/720p/1080p)
+    /hls/<height>p/index.m3u8            Media playlist
+    /hls/<height>p/seg<N>.ts             Segment
+    /dash/manifest.mpd                   MPD with SegmentTemplate video + audio
+    /dash/<rep>/init.mp4, seg<N>.m4s     Init and media segments
+
+Run standalone:
+    python benchmarks/netem_server.py --port 8765 --bandwidth-kbps 4000 --error-rate 0.05
+"""
+
+import re
+import time
+import socket
+import struct
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Variants served for HLS/DASH: (height, bandwidth in bits/sec, codecs)
+VARIANTS = [
+    (360, 800000, "avc1.4d401e,mp4a.40.2"),
+    (720, 2500000, "avc1.4d401f,mp4a.40.2"),
+    (1080, 5000000, "avc1.640028,mp4a.40.2"),
+]
+AUDIO_BANDWIDTH = 128000
+
+
+class NetemConfig:
+    """Shaping parameters applied to every connection."""
+
+    def __init__(self, bandwidth_kbps=0, latency_ms=0, error_rate=0.0, error_codes=(500, 502, 503, 429),
+                 reset_rate=0.0, seed=0, media_size=16 * 1048576, segment_count=20, segment_seconds=4):
+        self.bandwidth_kbps = bandwidth_kbps  # Per connection, 0 = unlimited
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.reset_rate = reset_rate
+        self.seed = seed
+        self.media_size = media_size
+        self.segment_count = segment_count
+        self.segment_seconds = segment_seconds
+
+
+class NetemStats:
+    """Thread-safe counters shared by all request handlers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.errors_injected = 0
+            self.resets_injected = 0
+            self.retries = 0
+            self.recovery_times = []
+            self._failed_at = {}  # path -> time of first unrecovered failure
+
+    def record_request(self, path):
+        with self._lock:
+            self.requests += 1
+            if path in self._failed_at:
+                self.retries += 1
+
+    def record_failure(self, path, reset=False):
+        with self._lock:
+            if reset:
+                self.resets_injected += 1
+            else:
+                self.errors_injected += 1
+            self._failed_at.setdefault(path, time.perf_counter())
+
+    def record_success(self, path, sent):
+        with self._lock:
+            self.bytes_sent += sent
+            failed_at = self._failed_at.pop(path, None)
+            if failed_at is not None:
+                self.recovery_times.append(time.perf_counter() - failed_at)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "errors_injected": self.errors_injected,
+                "resets_injected": self.resets_injected,
+                "retries": self.retries,
+                "recovery_times_s": list(self.recovery_times),
+                "unrecovered": len(self._failed_at),
+            }
+
+
+def generate_bytes(path, offset, length):
+    """Deterministic pseudo-random content for a path, addressable by offset."""
+    block = hashlib.sha256(path.encode()).digest() * 2048  # 64 KiB pattern
+    start = offset % len(block)
+    out = bytearray()
+    while len(out) < length:
+        out += block[start:start + length - len(out)]
+        start = 0
+    return bytes(out)
+
+
+def hls_master():
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for height, bandwidth, codecs in VARIANTS:
+        width = height * 16 // 9
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height},CODECS="{codecs}"')
+        lines.append(f"{height}p/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def hls_media(config):
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{config.segment_seconds}",
+             "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for i in range(config.segment_count):
+        lines.append(f"#EXTINF:{config.segment_seconds:.3f},")
+        lines.append(f"seg{i}.ts")
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def dash_mpd(config):
+    duration = config.segment_count * config.segment_seconds
+    representations = []
+    for height, bandwidth, _codecs in VARIANTS:
+        representations.append(
+            f'      <Representation id="v{height}" bandwidth="{bandwidth}" width="{height * 16 // 9}" '
+            f'height="{height}" codecs="avc1.4d401f" mimeType="video/mp4"/>'
+        )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT{duration}S"
+     minBufferTime="PT2S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period id="0" start="PT0S">
+    <AdaptationSet contentType="video" segmentAlignment="true">
+      <SegmentTemplate timescale="1" duration="{config.segment_seconds}" startNumber="0"
+                       initialization="$RepresentationID$/init.mp4" media="$RepresentationID$/seg$Number$.m4s"/>
+{chr(10).join(representations)}
+    </AdaptationSet>
+    <AdaptationSet contentType="audio" lang="en">
+      <SegmentTemplate timescale="1" duration="{config.segment_seconds}" startNumber="0"
+                       initialization="$RepresentationID$/init.mp4" media="$RepresentationID$/seg$Number$.m4s"/>
+      <Representation id="a128" bandwidth="{AUDIO_BANDWIDTH}" codecs="mp4a.40.2" mimeType="audio/mp4"
+                      audioSamplingRate="44100"/>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+
+class NetemRequestHandler(BaseHTTPRequestHandler):
+    """Request handler; shaping comes from the server's config."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _resolve(self, path, query):
+        """Return (content_type, total_size, text_body or None) for a route, or None."""
+        config = self.server.config
+        if path.startswith("/media/") and path.endswith(".mp4"):
+            size = int(query.get("size", [config.media_size])[0])
+            return "video/mp4", size, None
+        if path == "/hls/master.m3u8":
+            body = hls_master().encode()
+            return "application/vnd.apple.mpegurl", len(body), body
+        match = re.fullmatch(r"/hls/(\d+)p/(index\.m3u8|seg(\d+)\.ts)", path)
+        if match:
+            if match.group(2) == "index.m3u8":
+                body = hls_media(config).encode()
+                return "application/vnd.apple.mpegurl", len(body), body
+            bandwidth = next((b for h, b, _c in VARIANTS if h == int(match.group(1))), VARIANTS[0][1])
+            return "video/mp2t", bandwidth // 8 * config.segment_seconds, None
+        if path == "/dash/manifest.mpd":
+            body = dash_mpd(config).encode()
+            return "application/dash+xml", len(body), body
+        match = re.fullmatch(r"/dash/(v\d+|a\d+)/(init\.mp4|seg(\d+)\.m4s)", path)
+        if match:
+            if match.group(2) == "init.mp4":
+                return "video/mp4", 1024, None
+            rep = match.group(1)
+            if rep.startswith("a"):
+                bandwidth = AUDIO_BANDWIDTH
+            else:
+                bandwidth = next((b for h, b, _c in VARIANTS if f"v{h}" == rep), VARIANTS[0][1])
+            return "video/iso.segment", bandwidth // 8 * config.segment_seconds, None
+        return None
+
+    def do_HEAD(self):
+        self._serve(head_only=True)
+
+    def do_GET(self):
+        self._serve(head_only=False)
+
+    def _serve(self, head_only):
+        server = self.server
+        config = server.config
+        parsed = urlparse(self.path)
+        path = parsed.path
+        server.stats.record_request(path)
+
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000)
+
+        route = self._resolve(path, parse_qs(parsed.query))
+        if route is None:
+            self.send_error(404)
+            return
+
+        rng = server.next_random()
+        if config.error_rate and rng.random() < config.error_rate:
+            code = rng.choice(config.error_codes)
+            server.stats.record_failure(path)
+            self.send_response(code)
+            if code == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        content_type, total, body = route
+        start, end = 0, total - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+            if match:
+                if match.group(1):
+                    start = int(match.group(1))
+                    if match.group(2):
+                        end = min(int(match.group(2)), total - 1)
+                elif match.group(2):
+                    start = max(0, total - int(match.group(2)))
+                if start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{total}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.end_headers()
+        if head_only:
+            server.stats.record_success(path, 0)
+            return
+
+        reset_after = None
+        if config.reset_rate and rng.random() < config.reset_rate:
+            reset_after = rng.randint(0, max(0, length - 1))
+
+        sent = self._send_shaped(path, body, start, length, reset_after)
+        if sent is None:
+            server.stats.record_failure(path, reset=True)
+        else:
+            server.stats.record_success(path, sent)
+
+    def _send_shaped(self, path, body, start, length, reset_after):
+        """Write the response body under the bandwidth cap. Returns bytes sent, or None on reset."""
+        rate = self.server.config.bandwidth_kbps * 1000 / 8  # bytes/sec
+        chunk_size = max(1024, int(rate / 20)) if rate else 65536
+        sent = 0
+        started = time.perf_counter()
+        while sent < length:
+            n = min(chunk_size, length - sent)
+            if reset_after is not None and sent + n > reset_after:
+                self._reset_connection()
+                return None
+            if body is not None:
+                data = body[start + sent:start + sent + n]
+            else:
+                data = generate_bytes(path, start + sent, n)
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                return sent
+            sent += n
+            if rate:
+                ahead = sent / rate - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        return sent
+
+    def _reset_connection(self):
+        """Abort the connection with a TCP RST instead of a clean close."""
+        try:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        except OSError:
+            pass
+        self.close_connection = True
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+
+class NetemServer(ThreadingHTTPServer):
+    """Threaded HTTP server with shared shaping config and stats."""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, config=None):
+        super().__init__((host, port), NetemRequestHandler)
+        self.config = config or NetemConfig()
+        self.stats = NetemStats()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._thread = None
+
+    def next_random(self):
+        """A per-request RNG derived from the server seed (reproducible ordering)."""
+        with self._rng_lock:
+            return random.Random(self._rng.random())
+
+    def url(self, path):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def add_config_arguments(parser):
+    """Command-line options shared by the server and the benchmark."""
+    parser.add_argument("--bandwidth-kbps", type=float, default=0, help="Per-connection cap (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx/429 response")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Probability of a mid-body reset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--media-mib", type=float, default=16)
+    parser.add_argument("--segments", type=int, default=20)
+
+
+def config_from_args(args):
+    return NetemConfig(
+        bandwidth_kbps=args.bandwidth_kbps, latency_ms=args.latency_ms, error_rate=args.error_rate,
+        reset_rate=args.reset_rate, seed=args.seed, media_size=int(args.media_mib * 1048576),
+        segment_count=args.segments,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local network-emulation media server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    server = NetemServer(args.host, args.port, config_from_args(args))
+    print(f"Serving on {server.url('/')} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.stats.snapshot())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Download throughput benchmark against the local network-emulation server.
+
+Starts benchmarks/netem_server.py in-process and, for a progressive file,
+an HLS master playlist and a DASH MPD, runs:
+
+    app    - the app's own path: Downloader.fetch_formats + start_download
+    ytdlp  - yt-dlp's generic extractor directly, with optional extra args
+             (e.g. --extra-args="--concurrent-fragments 4 --retries 10")
+
+and reports throughput, retries and recovery time from the server's view.
+Needs a real yt-dlp binary (bundled one, or --ytdlp PATH).
+
+Usage:
+    python benchmarks/network_bench.py --bandwidth-kbps 20000 --error-rate 0.05 --output net.json
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shlex
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+for path in (SRC_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from downloader import Downloader
+from utils import get_ytdlp_executable
+from netem_server import NetemServer, add_config_arguments, config_from_args
+from e2e_harness import EventPump
+
+SCENARIOS = {
+    "direct": "/media/bench.mp4",
+    "hls": "/hls/master.m3u8",
+    "dash": "/dash/manifest.mpd",
+}
+
+
+def folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder)
+               if os.path.isfile(os.path.join(folder, name)))
+
+
+def run_app(downloader, pump, url, folder, label):
+    """Fetch and download through Downloader, as the GUI does."""
+    start = time.time()
+    downloader.fetch_formats(url, "1")
+    event = pump.wait_for({"formats", "error"}, timeout=120)
+    pump.wait_for({"enable_fetch"}, timeout=5)
+    fetch_s = time.time() - start
+
+    if event is not None and event[0] == "formats" and event[1]:
+        format_str, type_choice = event[1][0], "1"
+    else:
+        # Direct files have no height, so let yt-dlp pick the single stream
+        format_str, type_choice = "best - direct", "2"
+        downloader.format_map = {format_str: ("best", "mp4")}
+
+    start = time.time()
+    ok, error = downloader.start_download(url, type_choice, format_str, folder, label)
+    if not ok:
+        return {"error": error, "fetch_s": fetch_s}
+    event = pump.wait_for({"download_complete", "download_error"}, timeout=1800)
+    elapsed = time.time() - start
+    if event is None or event[0] != "download_complete":
+        return {"error": event[1] if event else "timeout", "fetch_s": fetch_s, "download_s": elapsed}
+    return {"fetch_s": fetch_s, "download_s": elapsed}
+
+
+def run_ytdlp(ytdlp, url, folder, extra_args):
+    """Run yt-dlp's generic extractor directly."""
+    command = [ytdlp, "--no-playlist", "--no-warnings", "--newline", "--force-generic-extractor",
+               "--output", os.path.join(folder, "%(id)s.%(ext)s"), *extra_args, url]
+    start = time.time()
+    result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    elapsed = time.time() - start
+    if result.returncode != 0:
+        return {"error": result.stderr.strip()[-500:], "download_s": elapsed}
+    return {"download_s": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark against a local emulated CDN.")
+    add_config_arguments(parser)
+    parser.add_argument("--ytdlp", help="yt-dlp binary (default: the bundled one)")
+    parser.add_argument("--paths", default="app,ytdlp", help="Comma-separated: app, ytdlp")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated: direct, hls, dash")
+    parser.add_argument("--extra-args", default="", help="Extra yt-dlp args for the 'ytdlp' path")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    ytdlp = args.ytdlp or get_ytdlp_executable()
+    if not ytdlp:
+        print("yt-dlp executable not found; pass --ytdlp PATH")
+        sys.exit(1)
+
+    server = NetemServer(config=config_from_args(args)).start()
+    workdir = tempfile.mkdtemp(prefix="network_bench_")
+    download_queue = queue.Queue()
+    downloader = Downloader(download_queue)
+    downloader.ytdlp_exe = ytdlp
+    pump = EventPump(download_queue, 0.1)
+    pump.poll()
+
+    runs = []
+    try:
+        for scenario in args.scenarios.split(","):
+            url = server.url(SCENARIOS[scenario])
+            for path in args.paths.split(","):
+                folder = os.path.join(workdir, f"{scenario}_{path}")
+                os.makedirs(folder)
+                server.stats.reset()
+                if path == "app":
+                    result = run_app(downloader, pump, url, folder, f"{scenario} bench")
+                else:
+                    result = run_ytdlp(ytdlp, url, folder, shlex.split(args.extra_args))
+                stats = server.stats.snapshot()
+                recovery = stats.pop("recovery_times_s")
+                elapsed = result.get("download_s") or 0
+                result.update({
+                    "scenario": scenario,
+                    "path": path,
+                    "file_bytes": folder_bytes(folder),
+                    "throughput_mib_s": stats["bytes_sent"] / 1048576 / elapsed if elapsed else None,
+                    "recovery_s_median": statistics.median(recovery) if recovery else None,
+                    "recovery_s_max": max(recovery) if recovery else None,
+                    **stats,
+                })
+                runs.append(result)
+                status = result.get("error") or "ok"
+                throughput = result["throughput_mib_s"]
+                print(f"{scenario:7} {path:6} {elapsed:7.2f}s "
+                      f"{(throughput or 0):7.2f} MiB/s  retries={stats['retries']:3}  {status[:60]}")
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Disk write benchmark for concurrent downloads.
+
+Writes --jobs files at once, interleaving small chunks the way several
+downloads arriving over the network do, with two strategies:
+
+    append   - open in append mode and write every chunk as it arrives
+    aligned  - prealloc.AlignedWriter: preallocate the full size, then
+               write in large block-aligned chunks
+
+and reports wall time, throughput and the number of extents per file
+(from filefrag, where available; more extents means more fragmentation).
+Use --dir to test a particular disk; the default is a temporary folder.
+
+Usage:
+    python benchmarks/prealloc_bench.py --jobs 4 --size 256 --dir /mnt/hdd --output prealloc.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+for path in (SRC_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from prealloc import AlignedWriter
+
+
+class AppendWriter:
+    """Unbuffered appends, one write per network chunk."""
+
+    def __init__(self, path, total):
+        self.file = open(path, "ab", buffering=0)
+
+    def write(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+def aligned_writer(path, total):
+    return AlignedWriter(path, total=total)
+
+
+STRATEGIES = {
+    "append": AppendWriter,
+    "aligned": aligned_writer,
+}
+
+
+def extent_count(path):
+    """Number of extents filefrag reports for path, or None if it can't tell."""
+    filefrag = shutil.which("filefrag") or ("/usr/sbin/filefrag" if os.path.exists("/usr/sbin/filefrag") else None)
+    if not filefrag:
+        return None
+    try:
+        output = subprocess.run([filefrag, path], capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+) extents? found", output)
+    return int(match.group(1)) if match else None
+
+
+def run(strategy, folder, jobs, size, chunk):
+    """Write jobs files of size bytes round-robin in chunk-sized pieces."""
+    paths = [os.path.join(folder, f"{strategy}-{i}.bin") for i in range(jobs)]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    payload = os.urandom(chunk)
+    start = time.perf_counter()
+    writers = [STRATEGIES[strategy](path, size) for path in paths]
+    written = 0
+    while written < size:
+        n = min(chunk, size - written)
+        for writer in writers:
+            writer.write(payload[:n])
+        written += n
+    for writer in writers:
+        writer.close()
+    # Include the time to get the data onto the disk, not just into the page cache
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    elapsed = time.perf_counter() - start
+
+    extents = [extent_count(path) for path in paths]
+    for path in paths:
+        os.remove(path)
+    known = [e for e in extents if e is not None]
+    return {
+        "strategy": strategy,
+        "seconds": round(elapsed, 3),
+        "mib_per_s": round(jobs * size / 1048576 / elapsed, 1),
+        "extents_per_file": round(statistics.mean(known), 1) if known else None,
+        "extents": extents,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="Folder to write in (default: a temporary folder)")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent files")
+    parser.add_argument("--size", type=int, default=128, help="Size of each file in MiB")
+    parser.add_argument("--chunk", type=int, default=16384, help="Network chunk size in bytes")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per strategy")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    folder = args.dir or tempfile.mkdtemp(prefix="prealloc_bench_")
+    os.makedirs(folder, exist_ok=True)
+    size = args.size * 1048576
+    results = []
+    try:
+        for _ in range(args.repeat):
+            for strategy in STRATEGIES:
+                result = run(strategy, folder, args.jobs, size, args.chunk)
+                results.append(result)
+                extents = result["extents_per_file"] if result["extents_per_file"] is not None else "n/a"
+                print(f"{strategy:8s} {result['seconds']:8.3f}s {result['mib_per_s']:8.1f} MiB/s "
+                      f"extents/file: {extents}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"jobs": args.jobs, "size_mib": args.size, "chunk": args.chunk, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Record fresh benchmark fixtures with a real yt-dlp binary.
+
+Captures the exact progress transcript yt-dlp prints for a download
+(with the same --progress --newline flags the app uses) and the raw
+--dump-json payload for a URL.
+
+Usage:
+    python benchmarks/record_fixtures.py progress URL progress_http.txt [extra yt-dlp args...]
+    python benchmarks/record_fixtures.py dump-json URL dump_json_large.json.gz
+"""
+
+import os
+import sys
+import gzip
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils import get_ytdlp_executable
+
+
+def record_progress(ytdlp, url, fixture, extra_args):
+    """Download url into a scratch folder and save every output line."""
+    with tempfile.TemporaryDirectory() as scratch:
+        command = [
+            ytdlp, "--progress", "--newline", "--no-warnings", "--no-playlist",
+            "--output", os.path.join(scratch, "%(title)s.%(ext)s"), *extra_args, url
+        ]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding="utf-8", errors="replace")
+    with open(os.path.join(FIXTURES_DIR, fixture), "w", encoding="utf-8", newline="\n") as f:
+        f.write(result.stdout)
+    return result.returncode
+
+
+def record_dump_json(ytdlp, url, fixture):
+    """Save the --dump-json payload for url (gzip-compressed)."""
+    result = subprocess.run([ytdlp, "--dump-json", "--no-playlist", "--no-warnings", url],
+                            capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if result.returncode == 0:
+        with gzip.open(os.path.join(FIXTURES_DIR, fixture), "wt", encoding="utf-8") as f:
+            f.write(result.stdout)
+    return result.returncode
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in ("progress", "dump-json"):
+        print(__doc__)
+        sys.exit(2)
+
+    ytdlp = get_ytdlp_executable()
+    if not ytdlp:
+        print("yt-dlp executable not found")
+        sys.exit(1)
+
+    mode, url, fixture = sys.argv[1:4]
+    if mode == "progress":
+        code = record_progress(ytdlp, url, fixture, sys.argv[4:])
+    else:
+        code = record_dump_json(ytdlp, url, fixture)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Benchmark suite for the parsing and dispatch hot paths.
+
+Runs against the fixtures in benchmarks/fixtures (synthetic until they are
+re-recorded with record_fixtures.py) and writes a machine-readable JSON
+result file so runs can be compared across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # run, write results/<commit>.json
+    python benchmarks/run_benchmarks.py --output out.json    # run, write to a specific file
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import argparse
+import platform
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from downloader import Downloader
+from utils import sanitize_filename
+
+PROGRESS_FIXTURES = {
+    "http": "progress_http.txt",
+    "hls": "progress_hls.txt",
+    "dash": "progress_dash.txt",
+}
+DUMP_JSON_FIXTURE = "dump_json_large.json.gz"
+
+
+def load_lines(name):
+    """Load a recorded yt-dlp output transcript as a list of stripped lines."""
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_dump_json(name=DUMP_JSON_FIXTURE):
+    """Load a recorded --dump-json payload."""
+    with gzip.open(os.path.join(FIXTURES_DIR, name), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def measure(func, items_per_call, rounds=7, min_time=0.2):
+    """
+    Time func() repeatedly and report throughput.
+
+    Each round repeats func until at least min_time has elapsed, so short
+    calls still get a stable reading.
+
+    Returns:
+        dict with items/sec (best and median), per-call time and round count
+    """
+    func()  # Warm-up
+    per_call = []
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        per_call.append(elapsed / calls)
+    best = min(per_call)
+    median = statistics.median(per_call)
+    return {
+        "items_per_call": items_per_call,
+        "best_items_per_sec": items_per_call / best,
+        "median_items_per_sec": items_per_call / median,
+        "best_call_us": best * 1e6,
+        "median_call_us": median * 1e6,
+        "rounds": rounds,
+    }
+
+
+def bench_parse_progress(downloader, results):
+    """parse_progress_output lines/sec for each transcript."""
+    for kind, fixture in PROGRESS_FIXTURES.items():
+        lines = load_lines(fixture)
+        parse = downloader.parse_progress_output
+
+        def run():
+            for line in lines:
+                parse(line)
+
+        results[f"parse_progress_output[{kind}]"] = measure(run, len(lines))
+
+
+def bench_format_grouping(downloader, results):
+    """Format grouping of a large --dump-json payload, per download type."""
+    info = load_dump_json()
+    formats = info["formats"]
+    for type_choice, label in (("1", "video_audio"), ("3", "audio")):
+        def run():
+            downloader._build_format_list(formats, type_choice)
+
+        results[f"build_format_list[{label}]"] = measure(run, len(formats))
+
+    payload = json.dumps(info)
+
+    def run_parse():
+        downloader._build_format_list(json.loads(payload)["formats"], "1")
+
+    results["dump_json_parse_and_group"] = measure(run_parse, len(formats))
+
+
+def bench_check_queue(results):
+    """QueueHandler.check_queue dispatch cost for a realistic message mix."""
+    try:
+        from PyQt5.QtCore import QCoreApplication
+        from gui.utils.queue_handler import QueueHandler
+    except ImportError as e:
+        results["check_queue"] = {"skipped": f"PyQt5 not available: {e}"}
+        return
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    messages = []
+    for i in range(1000):
+        messages.append(("progress", i / 10.0, 4.2, "01:23"))
+    messages.extend([("status", "Merging formats..."), ("download_complete", "file.mp4")])
+
+    message_queue = queue.Queue()
+    handler = QueueHandler(message_queue)
+    for signal in (handler.progress_signal, handler.status_signal, handler.download_complete_signal):
+        signal.connect(lambda *args: None)
+
+    def run():
+        for message in messages:
+            message_queue.put(message)
+        handler.check_queue()
+
+    results["check_queue"] = measure(run, len(messages))
+    del app
+
+
+def bench_sanitize_filename(results):
+    """sanitize_filename calls/sec over a mix of plain, dirty and long titles."""
+    titles = [
+        "Big Buck Bunny 60fps 4K - Official Blender Foundation Short Film - 2160p (60fps)",
+        'What is "this"? A <weird>: title / with | all * the \\ bad chars',
+        "Control\x00chars\x1fin\x7fthe title",
+        "Very long title " * 20,
+        "",
+    ]
+
+    def run():
+        for title in titles:
+            sanitize_filename(title)
+
+    results["sanitize_filename"] = measure(run, len(titles))
+
+
+def git_commit():
+    """Return the current commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_all():
+    """Run every benchmark and return the result document."""
+    downloader = Downloader(queue.Queue())
+    results = {}
+    bench_parse_progress(downloader, results)
+    bench_format_grouping(downloader, results)
+    bench_check_queue(results)
+    bench_sanitize_filename(results)
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(old_path, new_path):
+    """Print the relative change in median throughput between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'benchmark':45} {old['commit']:>12} {new['commit']:>12} {'change':>8}")
+    for name, new_result in new["results"].items():
+        old_result = old["results"].get(name, {})
+        if "median_items_per_sec" not in new_result or "median_items_per_sec" not in old_result:
+            continue
+        before = old_result["median_items_per_sec"]
+        after = new_result["median_items_per_sec"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:45} {before:12.0f} {after:12.0f} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsing and dispatch hot paths.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    document = run_all()
+    output = args.output or os.path.join(RESULTS_DIR, f"{document['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+
+    for name, result in document["results"].items():
+        if "skipped" in result:
+            print(f"{name:45} skipped ({result['skipped']})")
+        else:
+            print(f"{name:45} {result['median_items_per_sec']:14.0f} items/s")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
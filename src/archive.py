@@ -0,0 +1,201 @@
+import os
+import re
+import sys
+import sqlite3
+import threading
+from urllib.parse import urlparse, parse_qs
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from site_index import classify_url
+else:
+    # Running directly as .py
+    from utils import logger
+    from site_index import classify_url
+
+YOUTUBE_ID = re.compile(r'^[0-9A-Za-z_-]{11}$')
+YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com', 'youtu.be')
+# Extractor name of url_import.url_key() keys: pages no extractor recognises, keyed by their URL
+PAGE_EXTRACTOR = 'url'
+
+
+def archive_id(extractor, video_id):
+    """yt-dlp's archive line for a video: lower-cased extractor key, a space, the id."""
+    return f"{extractor.lower()} {video_id}"
+
+
+def key_for_info(info):
+    """
+    Archive key of a --dump-json (or --flat-playlist) entry.
+
+    Returns:
+        tuple: (extractor, video_id), or None if the entry lacks either
+    """
+    extractor = info.get('extractor_key') or info.get('ie_key')
+    video_id = info.get('id')
+    if not extractor or not video_id:
+        return None
+    return extractor.lower(), str(video_id)
+
+
+def key_for_url(url):
+    """
+    Archive key recognised from the URL alone, so a lookup needs no extraction.
+
+    Any URL the site index matches to an extractor with an id in the URL
+    is recognised. Without the index only YouTube watch, short and embed
+    links are; other URLs return None and are checked once their info has
+    been extracted.
+    """
+    site = classify_url(url)
+    if site.key and site.id:
+        return site.key.lower(), site.id
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+    host = (parsed.hostname or '').lower()
+    if not any(host == domain or host.endswith('.' + domain) for domain in YOUTUBE_HOSTS):
+        return None
+    if host.endswith('youtu.be'):
+        candidate = parsed.path.strip('/').split('/')[0]
+    else:
+        parts = [part for part in parsed.path.split('/') if part]
+        if parts[:1] == ['watch']:
+            candidate = parse_qs(parsed.query).get('v', [''])[0]
+        elif len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+            candidate = parts[1]
+        else:
+            return None
+    return ('youtube', candidate) if YOUTUBE_ID.match(candidate) else None
+
+
+class DownloadArchive:
+    """
+    Persistent record of downloaded videos, keyed by extractor and id.
+
+    The archive itself is a yt-dlp --download-archive text file (one
+    "extractor id" line per video), so it can be shared with yt-dlp run by
+    hand. Lookups go to a SQLite index kept next to it instead of reading
+    the file: a primary-key lookup stays a few page reads at hundreds of
+    thousands of entries. Lines appended to the text file by someone else
+    are picked up incrementally; if it shrinks, the index is rebuilt.
+
+    Pages downloaded without an extractor (PhantomJS and static
+    extraction results, keyed by page URL) are only recorded in a table
+    of the index, so the text file holds nothing yt-dlp wouldn't write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.index.sqlite'
+        self._lock = threading.Lock()
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS archive (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._db.commit()
+        with self._lock:
+            self._sync()
+
+    def contains(self, extractor, video_id):
+        """Whether the video has been downloaded before."""
+        with self._lock:
+            if extractor == PAGE_EXTRACTOR:
+                row = self._db.execute('SELECT 1 FROM pages WHERE url = ?', (video_id,)).fetchone()
+            else:
+                self._sync()
+                row = self._db.execute('SELECT 1 FROM archive WHERE key = ?',
+                                       (archive_id(extractor, video_id),)).fetchone()
+        return row is not None
+
+    def contains_key(self, key):
+        """contains() for a (extractor, id) tuple; None is never archived."""
+        return key is not None and self.contains(*key)
+
+    def add(self, extractor, video_id):
+        """Record a finished download in the index and the text file."""
+        line = archive_id(extractor, video_id)
+        if extractor == PAGE_EXTRACTOR:
+            with self._lock:
+                self._db.execute('INSERT OR IGNORE INTO pages (url) VALUES (?)', (video_id,))
+                self._db.commit()
+            logger.info(f"Download archive: recorded page {video_id}")
+            return
+        with self._lock:
+            self._sync()
+            cursor = self._db.execute('INSERT OR IGNORE INTO archive (key) VALUES (?)', (line,))
+            if cursor.rowcount:
+                with open(self.path, 'a+b') as f:
+                    # Don't glue our line onto an unfinished one
+                    f.seek(0, os.SEEK_END)
+                    if f.tell():
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b'\n':
+                            f.write(b'\n')
+                    f.write((line + '\n').encode('utf-8'))
+                self._set_offset(os.path.getsize(self.path))
+            self._db.commit()
+        logger.info(f"Download archive: recorded {line}")
+
+    def add_key(self, key):
+        """add() for a (extractor, id) tuple; None is ignored."""
+        if key is not None:
+            self.add(*key)
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return self._db.execute('SELECT COUNT(*) FROM archive').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _offset(self):
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'text_offset'").fetchone()
+        return row[0] if row else 0
+
+    def _set_offset(self, offset):
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('text_offset', ?)", (offset,))
+
+    def _sync(self):
+        """Index lines added to the text file since the last sync. Caller holds the lock."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        offset = self._offset()
+        if size == offset:
+            return
+        if size < offset:
+            # Edited or replaced by hand; start over
+            logger.info("Download archive file shrank, rebuilding its index")
+            self._db.execute('DELETE FROM archive')
+            offset = 0
+            if size == 0:
+                self._set_offset(0)
+                self._db.commit()
+                return
+        added = 0
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # A line still being written by another process is left for the next sync
+        complete = data.rfind(b'\n') + 1
+        for raw in data[:complete].decode('utf-8', 'replace').splitlines():
+            line = raw.strip()
+            if line and ' ' in line:
+                extractor, video_id = line.split(' ', 1)
+                self._db.execute('INSERT OR IGNORE INTO archive (key) VALUES (?)',
+                                 (archive_id(extractor, video_id),))
+                added += 1
+        self._set_offset(offset + complete)
+        self._db.commit()
+        if added:
+            logger.info(f"Download archive: indexed {added} lines from {self.path}")
@@ -0,0 +1,192 @@
+import sys
+import time
+import threading
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# No job is throttled below this, so a crowded limit can't stall anyone
+MIN_RATE = 64 * 1024
+
+
+def with_limit_rate(args, rate):
+    """Return args with any --limit-rate replaced by rate (bytes/s; None for unlimited)."""
+    result = []
+    skip = False
+    for arg in args:
+        if skip:
+            skip = False
+            continue
+        if arg in ('--limit-rate', '-r'):
+            skip = True
+            continue
+        result.append(arg)
+    if rate:
+        result.extend(['--limit-rate', str(int(rate))])
+    return result
+
+
+class BandwidthGovernor:
+    """
+    Shares one global download limit among all running jobs.
+
+    Each job gets a weighted fair share of the limit. Jobs that can't use
+    their share (a slow server, say) are capped at what they actually
+    achieve, and the headroom goes to the others (water-filling). When a
+    job's share moves by more than restart_threshold, its owner is asked
+    to restart it with the new rate; yt-dlp resumes from the .part file.
+    Restarts are rate-limited per job, since each one costs a reconnect.
+    """
+
+    def __init__(self, limit_mbps=0.0, restart_threshold=0.3, restart_interval=10.0, clock=time.monotonic):
+        self.limit = None
+        self.restart_threshold = restart_threshold
+        self.restart_interval = restart_interval
+        self.clock = clock
+        self.jobs = {}  # key -> {weight, rate, speed, on_rate_change, last_change, restartable}
+        self._lock = threading.Lock()
+        self.set_limit(limit_mbps, rebalance=False)
+
+    def set_limit(self, limit_mbps, rebalance=True):
+        """Set the total limit in MB/s (0 or None for unlimited) and rebalance running jobs."""
+        with self._lock:
+            self.limit = int(limit_mbps * 1048576) if limit_mbps else None
+        logger.info(f"Bandwidth limit: {f'{limit_mbps} MB/s' if limit_mbps else 'unlimited'}")
+        if rebalance:
+            self.rebalance(force=True)
+
+    def register(self, key, weight=1.0, on_rate_change=None):
+        """
+        Add a job and return the rate it should start with.
+
+        Args:
+            key: Unique job key
+            weight (float): Relative share of the limit
+            on_rate_change: Called with the new rate (bytes/s or None) when
+                the job should be restarted with a different --limit-rate
+
+        Returns:
+            int: Rate in bytes/s, or None when unlimited
+        """
+        with self._lock:
+            self.jobs[key] = {'weight': max(weight, 0.01), 'rate': None, 'speed': None,
+                              'on_rate_change': on_rate_change, 'last_change': self.clock(),
+                              'restartable': False}
+            allocation = self.allocate()
+            self.jobs[key]['rate'] = allocation.get(key)
+        # Existing jobs lose part of their share to the newcomer
+        self.rebalance(skip=key)
+        return self.rate_for(key)
+
+    def unregister(self, key):
+        """Remove a finished job and hand its share to the others."""
+        with self._lock:
+            removed = self.jobs.pop(key, None)
+        if removed is not None:
+            self.rebalance()
+
+    def set_weight(self, key, weight):
+        """Change a job's weight and rebalance."""
+        with self._lock:
+            if key not in self.jobs:
+                return
+            self.jobs[key]['weight'] = max(weight, 0.01)
+        self.rebalance()
+
+    def rate_for(self, key):
+        """Currently assigned rate for a job (bytes/s, None when unlimited)."""
+        with self._lock:
+            job = self.jobs.get(key)
+            return job['rate'] if job else None
+
+    def report(self, key, speed, restartable=True):
+        """
+        Record a job's observed speed.
+
+        Args:
+            key: Job key
+            speed (float): Observed download speed in bytes/s
+            restartable (bool): False while the job is merging or post-processing
+        """
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is None:
+                return
+            job['speed'] = speed
+            job['restartable'] = restartable
+        if self.limit:
+            self.rebalance()
+
+    def allocate(self):
+        """
+        Split the limit across jobs by weighted water-filling. Caller holds the lock.
+
+        Returns:
+            dict: key -> rate in bytes/s (None for every job when unlimited)
+        """
+        if not self.limit:
+            return {key: None for key in self.jobs}
+
+        demands = {}
+        for key, job in self.jobs.items():
+            # A job running well below its cap is limited elsewhere; leave it a little room to grow
+            if job['rate'] and job['speed'] and job['speed'] < 0.85 * job['rate']:
+                demands[key] = max(MIN_RATE, job['speed'] * 1.25)
+            else:
+                demands[key] = float('inf')
+
+        allocation = {}
+        remaining = float(self.limit)
+        active = set(self.jobs)
+        while active:
+            total_weight = sum(self.jobs[key]['weight'] for key in active)
+            shares = {key: remaining * self.jobs[key]['weight'] / total_weight for key in active}
+            satisfied = [key for key in active if demands[key] <= shares[key]]
+            if not satisfied:
+                allocation.update(shares)
+                break
+            for key in satisfied:
+                allocation[key] = demands[key]
+                remaining -= demands[key]
+                active.discard(key)
+
+        return {key: int(max(MIN_RATE, rate)) for key, rate in allocation.items()}
+
+    def rebalance(self, force=False, skip=None):
+        """Recompute shares and notify jobs whose rate changed enough to be worth a restart."""
+        changes = []
+        now = self.clock()
+        with self._lock:
+            allocation = self.allocate()
+            # While the assigned rates add up to more than the limit, cuts can't wait for the interval
+            assigned = sum(job['rate'] or self.limit or 0 for job in self.jobs.values())
+            oversubscribed = bool(self.limit) and assigned > self.limit * 1.05
+            for key, rate in allocation.items():
+                job = self.jobs[key]
+                if key == skip or rate == job['rate']:
+                    continue
+                if not force:
+                    cut = oversubscribed and job['rate'] is not None and rate < job['rate']
+                    if not job['restartable']:
+                        continue
+                    if now - job['last_change'] < self.restart_interval and not cut:
+                        continue
+                    if job['rate'] and rate and abs(rate - job['rate']) < self.restart_threshold * job['rate']:
+                        continue
+                job['rate'] = rate
+                job['last_change'] = now
+                if job['on_rate_change']:
+                    changes.append((key, job['on_rate_change'], rate))
+
+        for key, callback, rate in changes:
+            logger.info(f"Bandwidth: job {key} now limited to "
+                        f"{f'{rate / 1048576:.2f} MB/s' if rate else 'unlimited'}")
+            try:
+                callback(rate)
+            except Exception as e:
+                logger.error(f"Error applying rate change to job {key}: {str(e)}")
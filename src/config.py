@@ -90,4 +90,138 @@ def save_fragments_config(fragments):
     except Exception as e:
         logger.error(f"Error saving fragments config: {str(e)}")
         return False
-    return True 
\ No newline at end of file
+    return True 
+
+
+def load_tracing_config():
+    """Load whether job tracing is enabled from the config file (defaults to False)."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'trace_enabled' in config['Settings']:
+                return config['Settings'].getboolean('trace_enabled')
+    except Exception as e:
+        logger.error(f"Error loading tracing config: {str(e)}")
+    return False
+
+def load_hedge_delay_config():
+    """Load the delay (seconds) before yt-dlp is raced against PhantomJS (defaults to 0.5)."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'hedge_delay' in config['Settings']:
+                return max(0.0, float(config['Settings']['hedge_delay']))
+    except Exception as e:
+        logger.error(f"Error loading hedge delay config: {str(e)}")
+    return 0.5
+
+def load_playlist_workers_config():
+    """Load per-stage worker counts for playlist downloads (extract, download, post-process)."""
+    workers = [3, 2, 2]
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config:
+                for i, key in enumerate(('playlist_extract_workers', 'playlist_download_workers',
+                                         'playlist_postprocess_workers')):
+                    if key in config['Settings']:
+                        workers[i] = max(1, int(config['Settings'][key]))
+    except Exception as e:
+        logger.error(f"Error loading playlist workers config: {str(e)}")
+    return tuple(workers)
+
+def load_bandwidth_limit_config():
+    """Load the total download bandwidth limit in MB/s (0 means unlimited)."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'bandwidth_limit_mbps' in config['Settings']:
+                return max(0.0, float(config['Settings']['bandwidth_limit_mbps']))
+    except Exception as e:
+        logger.error(f"Error loading bandwidth limit config: {str(e)}")
+    return 0.0
+
+def save_bandwidth_limit_config(limit_mbps):
+    """Save the total download bandwidth limit in MB/s (0 means unlimited)."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+        if 'Settings' not in config:
+            config['Settings'] = {}
+        config['Settings']['bandwidth_limit_mbps'] = str(limit_mbps)
+
+        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+        with open(CONFIG_FILE, 'w') as configfile:
+            config.write(configfile)
+
+        if os.name == 'nt':
+            try:
+                import ctypes
+                FILE_ATTRIBUTE_HIDDEN = 0x02
+                ctypes.windll.kernel32.SetFileAttributesW(CONFIG_FILE, FILE_ATTRIBUTE_HIDDEN)
+            except Exception as e:
+                logger.warning(f"Could not hide config file: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error saving bandwidth limit config: {str(e)}")
+        return False
+    return True
+
+def load_archive_config():
+    """
+    Load the download archive path (a yt-dlp --download-archive file).
+
+    Returns:
+        str: Path of the archive, or None when download_archive is set to an empty value
+    """
+    path = os.path.join(os.path.expanduser("~"), ".yt_downloader_archive.txt")
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'download_archive' in config['Settings']:
+                value = config['Settings']['download_archive'].strip()
+                return os.path.expanduser(value) if value else None
+    except Exception as e:
+        logger.error(f"Error loading download archive config: {str(e)}")
+    return path
+
+def load_preallocate_config():
+    """Load whether direct downloads reserve their full size on disk before writing."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'preallocate' in config['Settings']:
+                return config['Settings'].getboolean('preallocate')
+    except Exception as e:
+        logger.error(f"Error loading preallocate config: {str(e)}")
+    return True
+
+def load_engine_port_config():
+    """Load the localhost port the download engine's HTTP API listens on."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'engine_port' in config['Settings']:
+                return config['Settings'].getint('engine_port')
+    except Exception as e:
+        logger.error(f"Error loading engine port config: {str(e)}")
+    return 9614
+
+def load_job_store_config():
+    """Load the location of the job store shared by download workers."""
+    try:
+        config = configparser.ConfigParser()
+        if os.path.exists(CONFIG_FILE):
+            config.read(CONFIG_FILE)
+            if 'Settings' in config and 'job_store' in config['Settings']:
+                return config['Settings']['job_store']
+    except Exception as e:
+        logger.error(f"Error loading job store config: {str(e)}")
+    return os.path.join(os.path.expanduser("~"), ".yt_downloader_jobs.db")
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+import urllib3
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from prealloc import AlignedWriter, BUFFER_SIZE, committed_size, discard
+else:
+    # Running directly as .py
+    from utils import logger
+    from prealloc import AlignedWriter, BUFFER_SIZE, committed_size, discard
+
+# Progress lines per second, about what yt-dlp prints
+PROGRESS_INTERVAL = 0.1
+
+
+def _mib(size):
+    return size / 1048576
+
+
+def _range_total(response):
+    """Full size from a 416 response's Content-Range (bytes */SIZE), or None."""
+    value = response.headers.get('Content-Range', '')
+    total = value.rsplit('/', 1)[-1]
+    return int(total) if value.startswith('bytes */') and total.isdigit() else None
+
+
+class DirectDownload:
+    """
+    Downloads one plain HTTP(S) media file without going through yt-dlp.
+
+    Used for progressive files found by the media probe, where yt-dlp's
+    generic extractor would only do a GET anyway. The file is preallocated
+    to its size and written through AlignedWriter. Progress is reported as
+    yt-dlp-style lines to on_output and the final path is printed the way
+    --print after_move:filepath does, so the download thread treats both
+    engines the same.
+
+    Behaves like the subprocess.Popen objects the scheduler and governor
+    manage: poll(), wait(), terminate() and kill(). A stopped download
+    leaves a .part file cut to the bytes written, which the next run
+    resumes with a Range request. A killed one leaves it preallocated,
+    with the written position recorded beside it.
+    """
+
+    def __init__(self, http, url, path, size=None, rate=None, on_output=None, buffer_size=BUFFER_SIZE,
+                 allocate=True):
+        """
+        Args:
+            http: urllib3.PoolManager to download with
+            url (str): Media URL
+            path (str): Final output path
+            size (int): Expected size from the probe, used if the server doesn't say
+            rate (int): Speed limit in bytes/s, or None
+            on_output: Callback receiving each output line
+            buffer_size (int): Write chunk size
+            allocate (bool): Preallocate the file to its expected size
+        """
+        self.http = http
+        self.url = url
+        self.path = path
+        self.part_path = path + '.part'
+        self.size = size
+        self.rate = rate
+        self.on_output = on_output or (lambda line: None)
+        self.buffer_size = buffer_size
+        self.allocate = allocate
+        self.returncode = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise subprocess.TimeoutExpired(self.url, timeout)
+        return self.returncode
+
+    def terminate(self):
+        self._stop.set()
+
+    kill = terminate
+
+    def _run(self):
+        try:
+            self.returncode = self._download()
+        except Exception as e:
+            logger.error(f"Direct download of {self.url} failed: {str(e)}")
+            self.on_output(f"ERROR: {str(e)}")
+            self.returncode = 1
+
+    def _request(self, offset):
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        return self.http.request('GET', self.url, headers=headers, preload_content=False,
+                                 redirect=True, timeout=urllib3.Timeout(connect=10, read=30))
+
+    def _download(self):
+        # Not the file size: the .part of a killed download is preallocated past its data
+        offset = committed_size(self.part_path)
+        response = self._request(offset)
+        if response.status == 416 and offset and _range_total(response) != offset:
+            # The saved part doesn't match the file on the server; start over
+            logger.warning(f"Server rejected resuming {self.part_path} at {offset} bytes, starting over")
+            response.release_conn()
+            discard(self.part_path)
+            offset = 0
+            response = self._request(offset)
+        try:
+            if response.status == 416 and offset:
+                # The server confirmed everything was downloaded before the last stop
+                total = offset
+                os.truncate(self.part_path, offset)
+            elif response.status >= 400:
+                self.on_output(f"ERROR: HTTP Error {response.status} for {self.url}")
+                return 1
+            else:
+                if response.status != 206:
+                    offset = 0  # The server ignored the Range header; start over
+                length = response.headers.get('Content-Length', '')
+                total = offset + int(length) if length.isdigit() else self.size
+
+            self.on_output(f"[download] Destination: {self.path}")
+            if response.status != 416:
+                with AlignedWriter(self.part_path, offset=offset, total=total, buffer_size=self.buffer_size,
+                                   allocate=self.allocate, track=True) as writer:
+                    if writer.allocation:
+                        logger.info(f"Preallocated {self.part_path} to {total} bytes ({writer.allocation})")
+                    self._copy(response, writer, offset, total)
+                downloaded = writer.position  # After close() wrote out the buffer
+                if self._stop.is_set():
+                    return -15  # Like a terminated yt-dlp: the .part file is kept for resuming
+                if total and downloaded < total:
+                    self.on_output(f"ERROR: Download ended at {downloaded} of {total} bytes")
+                    return 1
+        finally:
+            if self._stop.is_set():
+                # Unread body data would be left on the connection; don't hand it back to the pool
+                response.close()
+            response.release_conn()
+
+        os.replace(self.part_path, self.path)
+        discard(self.part_path)  # A position record left by an earlier, killed run
+        self.on_output(os.path.abspath(self.path))
+        return 0
+
+    def _copy(self, response, writer, offset, total):
+        started = time.monotonic()
+        received = 0
+        last_report = 0.0
+        for chunk in response.stream(64 * 1024):
+            if self._stop.is_set():
+                break
+            writer.write(chunk)
+            received += len(chunk)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            if self.rate:
+                # Sleep until the average speed is back under the limit
+                ahead = received / self.rate - elapsed
+                if ahead > 0:
+                    self._stop.wait(ahead)
+                    elapsed = max(time.monotonic() - started, 1e-6)
+            if elapsed - last_report >= PROGRESS_INTERVAL:
+                last_report = elapsed
+                self._report(offset + received, total, received / elapsed)
+        self._report(offset + received, total, received / max(time.monotonic() - started, 1e-6))
+
+    def _report(self, done, total, speed):
+        if total:
+            remaining = (total - done) / speed if speed else 0
+            self.on_output(f"[download] {100.0 * done / total:5.1f}% of {_mib(total):9.2f}MiB at "
+                           f"{_mib(speed):7.2f}MiB/s ETA {int(remaining) // 60:02d}:{int(remaining) % 60:02d}")
+        else:
+            self.on_output(f"[download] {_mib(done):.2f}MiB at {_mib(speed):.2f}MiB/s")
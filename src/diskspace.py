@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import shutil
+import threading
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Always left free on the target disk, on top of what downloads reserve
+MIN_FREE_BYTES = 256 * 1024 * 1024
+
+
+def format_bytes(fmt, duration=None):
+    """Size of one yt-dlp format: exact, approximate, or bitrate x duration."""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if not size and fmt.get('tbr') and duration:
+        size = fmt['tbr'] * 125 * duration  # kbit/s -> bytes
+    return int(size) if size else None
+
+
+def info_size(info):
+    """
+    Estimated download size of a --dump-json entry for its selected formats.
+
+    Returns:
+        int: Bytes, or None if yt-dlp gave nothing to go on
+    """
+    duration = info.get('duration')
+    parts = info.get('requested_formats') or [info]
+    sizes = [format_bytes(fmt, duration) for fmt in parts]
+    if not all(sizes):
+        return None
+    return sum(sizes)
+
+
+class FolderCache:
+    """
+    Short-lived cache of whether a folder is writable and how much space it has.
+
+    Checking writability means creating and deleting a file, which is slow
+    on network shares, so the answer is kept for writable_ttl seconds.
+    Free space changes as downloads run and is kept only for free_ttl.
+    """
+
+    def __init__(self, writable_ttl=60.0, free_ttl=2.0, clock=time.monotonic):
+        self.writable_ttl = writable_ttl
+        self.free_ttl = free_ttl
+        self.clock = clock
+        self._writable = {}  # folder -> (checked at, bool)
+        self._free = {}      # folder -> (checked at, bytes)
+        self._lock = threading.Lock()
+
+    def writable(self, folder):
+        """Whether files can be created in folder (cached)."""
+        folder = os.path.abspath(folder)
+        now = self.clock()
+        with self._lock:
+            cached = self._writable.get(folder)
+            if cached and now - cached[0] < self.writable_ttl:
+                return cached[1]
+        test_file = os.path.join(folder, ".write_test")
+        try:
+            with open(test_file, 'w') as f:
+                f.write("test")
+            os.remove(test_file)
+            result = True
+        except OSError:
+            result = False
+        with self._lock:
+            self._writable[folder] = (now, result)
+        return result
+
+    def free_space(self, folder):
+        """Free bytes on the disk holding folder (cached briefly)."""
+        folder = os.path.abspath(folder)
+        now = self.clock()
+        with self._lock:
+            cached = self._free.get(folder)
+            if cached and now - cached[0] < self.free_ttl:
+                return cached[1]
+        free = shutil.disk_usage(folder).free
+        with self._lock:
+            self._free[folder] = (now, free)
+        return free
+
+    def invalidate(self, folder=None, free_only=False):
+        """Forget cached results for one folder, or all of them."""
+        with self._lock:
+            if folder is None:
+                self._free.clear()
+                if not free_only:
+                    self._writable.clear()
+            else:
+                folder = os.path.abspath(folder)
+                self._free.pop(folder, None)
+                if not free_only:
+                    self._writable.pop(folder, None)
+
+
+class Reservation:
+    """Space held for one download until it finishes."""
+
+    def __init__(self, manager, device, folder, size, download_size):
+        self.manager = manager
+        self.device = device
+        self.folder = folder
+        self.size = size
+        self.download_size = download_size
+        self.written = 0
+        self._finished_streams = 0  # Bytes of the streams already downloaded
+        self._stream_bytes = 0  # Bytes of the current stream so far
+        self._stream_percent = 0.0
+
+    @property
+    def outstanding(self):
+        """Reserved bytes not yet on disk (and so not yet counted in free space)."""
+        return max(0, self.size - self.written)
+
+    def update(self, written):
+        """Record how much of the download is already on disk."""
+        self.written = max(self.written, int(written))
+
+    def update_percent(self, percent, stream_size=None):
+        """
+        update() from yt-dlp's progress.
+
+        The percentage is of the stream being downloaded, and starts again
+        at 0 for each stream (video, then audio) of a merged download, so
+        it is applied to that stream's own size. Without a size nothing is
+        counted and the space stays held. The counted bytes never exceed
+        the download size, leaving the overhead for merging reserved.
+
+        Args:
+            percent (float): Progress of the current stream (0-100)
+            stream_size (int): Size of the current stream in bytes, if known
+        """
+        if percent < self._stream_percent:
+            # A new stream started
+            self._finished_streams += self._stream_bytes
+            self._stream_bytes = 0
+        self._stream_percent = percent
+        if stream_size:
+            self._stream_bytes = max(self._stream_bytes, int(stream_size * percent / 100))
+        self.update(min(self.download_size, self._finished_streams + self._stream_bytes))
+
+    def release(self):
+        self.manager.release(self)
+
+
+class DiskSpaceManager:
+    """
+    Admits downloads against the free space of their target disk.
+
+    Each job reserves its estimated size before it starts. A job is
+    admitted only if the free space, minus everything already reserved on
+    the same disk that isn't written yet, minus MIN_FREE_BYTES, still
+    covers it. That way downloads that each fit on their own can't
+    overrun the disk together. Jobs with an unknown size reserve nothing
+    but still need the margin.
+    """
+
+    def __init__(self, cache=None, min_free=MIN_FREE_BYTES):
+        self.cache = cache or FolderCache()
+        self.min_free = min_free
+        self.reservations = []
+        self._cond = threading.Condition()
+
+    def available(self, folder):
+        """Free bytes on folder's disk that aren't already promised to a download."""
+        device = self._device(folder)
+        free = self.cache.free_space(folder)
+        with self._cond:
+            reserved = sum(r.outstanding for r in self.reservations if r.device == device)
+        return free - reserved - self.min_free
+
+    def reserve(self, folder, size, overhead=1.0, wait=False, cancelled=None):
+        """
+        Reserve space for a download.
+
+        Args:
+            folder (str): Target folder
+            size (int): Estimated download size in bytes (None or 0 if unknown)
+            overhead (float): Peak disk use as a multiple of size, e.g. 2 while
+                a merge holds both the parts and the merged file
+            wait (bool): Wait for other downloads on the same disk to release
+                space instead of failing while any are still running
+            cancelled: Optional threading.Event that aborts the wait
+
+        Returns:
+            tuple: (Reservation or None, error message or None)
+        """
+        download_size = int(size or 0)
+        size = int(download_size * overhead)
+        device = self._device(folder)
+        while True:
+            # Asked outside the lock: a slow or network volume mustn't hold up other disks' reservations
+            free = self.cache.free_space(folder)
+            with self._cond:
+                others = [r for r in self.reservations if r.device == device]
+                available = free - sum(r.outstanding for r in others) - self.min_free
+                if size <= available:
+                    reservation = Reservation(self, device, folder, size, download_size)
+                    self.reservations.append(reservation)
+                    return reservation, None
+                if not wait or not others or (cancelled is not None and cancelled.is_set()):
+                    break
+                # Someone else's download will finish and free its reservation
+                self._cond.wait(self.cache.free_ttl)
+        message = (f"Not enough disk space: needs about {size / 1048576:.0f} MB, "
+                   f"{max(0, available) / 1048576:.0f} MB available")
+        logger.warning(f"{message} in {folder}")
+        return None, message
+
+    def release(self, reservation):
+        """Return a reservation's space once its download finished or failed."""
+        with self._cond:
+            if reservation in self.reservations:
+                self.reservations.remove(reservation)
+            self._cond.notify_all()
+        # The finished file now shows up in the real free space
+        self.cache.invalidate(reservation.folder, free_only=True)
+
+    def _device(self, folder):
+        try:
+            return os.stat(folder).st_dev
+        except OSError:
+            return os.path.abspath(folder)
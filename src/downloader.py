@@ -5,19 +5,55 @@ import re
 import sys
 import subprocess
 import json
+import queue
+import itertools
 from collections import defaultdict
 
 # Adjust import paths dynamically
 if getattr(sys, 'frozen', False):
     # Running as compiled .exe
     from utils import format_size, ffmpeg_executable, sanitize_filename, logger, get_ytdlp_executable
-    from config import load_fragments_config, save_fragments_config
+    from config import load_fragments_config, save_fragments_config, load_tracing_config, load_hedge_delay_config
+    from config import load_bandwidth_limit_config, load_archive_config, load_preallocate_config
     from phantom import PhantomJSHandler
+    from tracing import tracer, PhaseTracker
+    from routing import ExtractorRouter
+    from media_probe import MediaProbe, MANIFEST_URL
+    from static_extract import StaticExtractor
+    from manifest import format_filter
+    from playlist import PlaylistDownload
+    from url_import import UrlListDownload, url_key
+    from bandwidth import BandwidthGovernor, with_limit_rate
+    from scheduler import JobScheduler, PRIORITY_HIGH, stop_process
+    from archive import DownloadArchive, key_for_info
+    from thumbnails import pick_thumbnail
+    from diskspace import DiskSpaceManager, format_bytes
+    from direct_download import DirectDownload
+    from site_index import classify_url
 else:
     # Running directly as .py
     from utils import format_size, ffmpeg_executable, sanitize_filename, logger, get_ytdlp_executable
-    from config import load_fragments_config, save_fragments_config
+    from config import load_fragments_config, save_fragments_config, load_tracing_config, load_hedge_delay_config
+    from config import load_bandwidth_limit_config, load_archive_config, load_preallocate_config
     from phantom import PhantomJSHandler
+    from tracing import tracer, PhaseTracker
+    from routing import ExtractorRouter
+    from media_probe import MediaProbe, MANIFEST_URL
+    from static_extract import StaticExtractor
+    from manifest import format_filter
+    from playlist import PlaylistDownload
+    from url_import import UrlListDownload, url_key
+    from bandwidth import BandwidthGovernor, with_limit_rate
+    from scheduler import JobScheduler, PRIORITY_HIGH, stop_process
+    from archive import DownloadArchive, key_for_info
+    from thumbnails import pick_thumbnail
+    from diskspace import DiskSpaceManager, format_bytes
+    from direct_download import DirectDownload
+    from site_index import classify_url
+
+# Multipliers for the size units in yt-dlp progress lines
+UNIT_BYTES = {'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3}
+
 
 class Downloader:
     def __init__(self, queue):
@@ -27,6 +63,25 @@ class Downloader:
         self.active_threads = []
         self.ytdlp_process = None
         self.temp_files = []  # Track temporary files for cleanup
+        self.playlist_job = None  # Running PlaylistDownload, if any
+        # Shares the global bandwidth limit among all running downloads
+        self.governor = BandwidthGovernor(load_bandwidth_limit_config())
+        # Priority scheduling: main-window downloads preempt playlist entries
+        self.scheduler = JobScheduler(self.queue)
+        self._download_ids = itertools.count(1)
+        self.download_job = None  # Scheduler job of the main-window download
+        # Videos downloaded before, keyed by extractor and id
+        self.archive = self._open_archive()
+        self.archive_keys = {}  # URL -> (extractor, id) learned from its extracted info
+        self.thumbnails = {}  # URL -> thumbnail URL from its extracted info
+        self.queued_keys = set()  # (extractor, id) of playlist and import entries in progress
+        self._queued_lock = threading.Lock()
+        # Cached folder checks and free-space reservations shared by all downloads
+        self.disk_space = DiskSpaceManager()
+        self.format_sizes = {}  # format string -> estimated bytes, alongside format_map
+        self.trace_jobs = {}  # URL -> trace job id, so fetch and download share a track
+        tracer.enabled = load_tracing_config()
+        self.hedge_delay = load_hedge_delay_config()  # Seconds before yt-dlp joins a PhantomJS extraction
         # Get yt-dlp executable path
         from utils import get_ytdlp_executable, resource_path
         self.ytdlp_exe = get_ytdlp_executable()
@@ -35,12 +90,62 @@ class Downloader:
             self.queue.put(("error", "yt-dlp executable not found!"))
         # Initialize PhantomJS handler
         self.phantom_handler = PhantomJSHandler()
+        # Learned per-domain choice between yt-dlp and PhantomJS
+        self.router = ExtractorRouter()
+        # Pooled HTTP prober for URLs found by PhantomJS
+        self.media_probe = MediaProbe()
+        # Static-HTML tier tried before a PhantomJS render, sharing the probe's connection pool
+        self.static_extractor = StaticExtractor(http=self.media_probe.http)
         # Set up PhantomJS path
         self.phantomjs_path = resource_path(os.path.join('assets', 'phantomjs.exe'))
         if not os.path.exists(self.phantomjs_path):
             self.phantomjs_path = os.path.join(os.path.dirname(sys.executable), 'assets', 'phantomjs.exe')
 
-    def execute_ytdlp(self, args, capture_output=True, text=True, timeout=None):
+    def _open_archive(self):
+        """Open the download archive, or return None if it is disabled or unusable."""
+        path = load_archive_config()
+        if not path:
+            return None
+        try:
+            return DownloadArchive(path)
+        except Exception as e:
+            logger.error(f"Could not open download archive {path}: {str(e)}")
+            return None
+
+    def archive_key(self, url):
+        """
+        (extractor, id) of a page URL, from its fetched info or the URL itself.
+
+        Pages no extractor recognises (PhantomJS and static extraction) are
+        keyed by their canonical URL, so they are still found next time.
+        """
+        return self.archive_keys.get(url) or url_key(url)
+
+    def is_archived(self, url):
+        """Whether the video at url is already in the download archive."""
+        return self.archive is not None and self.archive.contains_key(self.archive_key(url))
+
+    def claim_key(self, key):
+        """
+        Mark a video as queued by a batch download.
+
+        Returns:
+            bool: False if another entry already has it (None keys always succeed)
+        """
+        if key is None:
+            return True
+        with self._queued_lock:
+            if key in self.queued_keys:
+                return False
+            self.queued_keys.add(key)
+            return True
+
+    def release_key(self, key):
+        """Forget a claim_key() once its entry finished, failed or was cancelled."""
+        with self._queued_lock:
+            self.queued_keys.discard(key)
+
+    def execute_ytdlp(self, args, capture_output=True, text=True, timeout=None, on_start=None):
         """Execute yt-dlp binary with given arguments and return the result.
         
         Args:
@@ -48,6 +153,8 @@ class Downloader:
             capture_output: Whether to capture stdout/stderr
             text: Whether to return output as text (vs bytes)
             timeout: Timeout in seconds
+            on_start: Optional callback receiving the Popen object, so another
+                thread can kill the process early
             
         Returns:
             CompletedProcess object with stdout/stderr
@@ -59,14 +166,23 @@ class Downloader:
         logger.info(f"Executing: {' '.join(command)}")
         
         try:
-            result = subprocess.run(
+            pipe = subprocess.PIPE if capture_output else None
+            process = subprocess.Popen(
                 command,
-                capture_output=capture_output,
+                stdout=pipe,
+                stderr=pipe,
                 text=text,
-                timeout=timeout,
                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
             )
-            return result
+            if on_start:
+                on_start(process)
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+            return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
         except subprocess.TimeoutExpired as e:
             logger.error(f"yt-dlp command timed out: {e}")
             raise
@@ -166,6 +282,8 @@ class Downloader:
             speed_unit = data['speed_unit']
             eta_str = data['eta']
             
+            size_bytes = int(float(data['size']) * UNIT_BYTES[data['size_unit']])
+            
             # Convert speed to MB/s based on captured unit
             if speed_unit == 'KiB':
                 speed_mbps = speed_val / 1024
@@ -178,7 +296,8 @@ class Downloader:
                 'status': 'downloading',
                 'percent': percent,
                 'speed': round(speed_mbps, 1), # Round for display
-                'eta': eta_str
+                'eta': eta_str,
+                'size': size_bytes
             }
             
         # Check for merging/processing indication
@@ -207,6 +326,14 @@ class Downloader:
             
         return None
 
+    def _trace_job(self, url, new=False):
+        """Return the trace job id for a URL, allocating a new track if needed."""
+        job_id = self.trace_jobs.get(url)
+        if new or job_id is None:
+            job_id = tracer.new_job(url)
+            self.trace_jobs[url] = job_id
+        return job_id
+
     def fetch_formats(self, url, type_choice):
         """Initiate fetching of video formats."""
         # Create and start the thread
@@ -217,49 +344,75 @@ class Downloader:
 
     def _fetch_formats_thread(self, url, type_choice):
         """Fetch video formats in a separate thread using --dump-json."""
+        job_id = self._trace_job(url, new=True)
+        root_span = tracer.start_span("fetch_formats", job_id, url=url, type_choice=type_choice)
         try:
-            # Check if PhantomJS is required for this URL
-            use_phantom = self.phantom_handler.is_phantom_required(url)
-            
-            if use_phantom:
-                logger.info(f"Using PhantomJS for URL: {url}")
-                self.queue.put(("status", "Using PhantomJS to process this URL..."))
-                
-                # Extract media URLs using PhantomJS
-                phantom_result = self.phantom_handler.extract_media_urls(url)
-                
-                if "error" in phantom_result:
-                    self.queue.put(("error", f"PhantomJS error: {phantom_result['error']}"))
+            # Recognisable URLs are checked against the archive before anything is extracted
+            if self.is_archived(url):
+                self.queue.put(("status", "Already downloaded (found in the download archive)"))
+
+            # A pasted manifest is expanded locally instead of going through an extractor
+            if MANIFEST_URL.search(url):
+                with tracer.span("manifest", job_id, parent=root_span) as span:
+                    formats, format_map = self._probe_formats([url], type_choice=type_choice)
+                    span.set(formats=len(formats))
+                if formats:
+                    root_span.set(winner="manifest")
+                    self.format_map = format_map
+                    self.queue.put(("formats", formats))
                     return
-                    
-                # Get compatible URLs for yt-dlp
-                phantom_urls = self.phantom_handler.get_ytdlp_compatible_urls(phantom_result)
-                
-                if not phantom_urls:
-                    logger.warning("PhantomJS couldn't find any media URLs, falling back to yt-dlp")
-                    self.queue.put(("status", "PhantomJS couldn't find content, trying standard method..."))
-                    # Fall through to standard method if PhantomJS fails to find URLs
-                else:
-                    # Use the title from PhantomJS if available
-                    if "title" in phantom_result and phantom_result["title"]:
-                        self.queue.put(("video_title", phantom_result["title"]))
-                    
-                    # Process each URL found by PhantomJS
-                    self._process_phantom_results(phantom_urls, type_choice)
+
+            # Route by domain history. Without history, sites yt-dlp has an extractor for go to
+            # yt-dlp; PhantomJS sites and sites unknown to the index try static HTML first
+            with tracer.span("route", job_id, parent=root_span) as span:
+                known = classify_url(url).supported and not self.phantom_handler.is_phantom_required(url)
+                default = "ytdlp" if known else "direct"
+                route = self.router.choose(url, ("ytdlp", "phantom", "direct"), default=default)
+                span.set(route=route, default=default)
+
+            # Static HTML first; a page that needs rendering falls through to PhantomJS
+            if route == "direct":
+                if self._static_extract(url, type_choice, job_id, root_span):
+                    root_span.set(winner="direct")
                     return
-            
-            # Standard yt-dlp extraction using --dump-json
+                route = "phantom"
+            use_phantom = route == "phantom"
+
             try:
-                info_args = [
-                    '--dump-json',
-                    '--no-playlist',
-                    '--no-warnings',
-                    '--socket-timeout', '30',
-                    url
-                ]
-                
-                result = self.execute_ytdlp(info_args, timeout=60)
-                
+                result = None  # CompletedProcess from --dump-json
+                if use_phantom:
+                    logger.info(f"Using PhantomJS for URL: {url}")
+                    self.queue.put(("status", "Using PhantomJS to process this URL..."))
+
+                    # Race PhantomJS against yt-dlp and keep whichever answers first
+                    source, outcome = self._hedged_extract(url, job_id, root_span)
+                    root_span.set(winner=source)
+                    if source == "phantom":
+                        phantom_result, phantom_urls = outcome
+                        # Use the title from PhantomJS if available
+                        if "title" in phantom_result and phantom_result["title"]:
+                            self.queue.put(("video_title", phantom_result["title"]))
+
+                        # Process each URL found by PhantomJS
+                        self._process_phantom_results(phantom_urls, type_choice, phantom_result.get("audioUrls"))
+                        return
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                    result = outcome
+
+                # Standard yt-dlp extraction using --dump-json
+                if result is None:
+                    with tracer.span("dump_json", job_id, parent=root_span) as span:
+                        started = time.perf_counter()
+                        try:
+                            result = self._dump_json(url)
+                        except subprocess.TimeoutExpired:
+                            self.router.record(url, "ytdlp", False, time.perf_counter() - started)
+                            raise
+                        self.router.record(url, "ytdlp", result.returncode == 0 and bool(result.stdout),
+                                           time.perf_counter() - started)
+                        span.set(returncode=result.returncode, stdout_bytes=len(result.stdout or ''))
+
                 if result.returncode != 0:
                     logger.error(f"yt-dlp info extraction failed: {result.stderr}")
                     self.queue.put(("error", f"Error: Could not retrieve video information: {result.stderr}"))
@@ -273,9 +426,16 @@ class Downloader:
                     self.queue.put(("error", "Error: Could not parse video information"))
                     return
                     
+                self.archive_keys[url] = key_for_info(info)
+                if self.archive is not None and self.archive.contains_key(self.archive_keys[url]):
+                    self.queue.put(("status", "Already downloaded (found in the download archive)"))
+
                 # Get and set the video title
                 title = info.get('title', 'Untitled Video')
                 self.queue.put(("video_title", title))
+                self.thumbnails[url] = pick_thumbnail(info)
+                if self.thumbnails[url]:
+                    self.queue.put(("thumbnail", self.thumbnails[url]))
                 
                 # Process formats from the JSON info
                 formats_data = info.get('formats', [])
@@ -284,51 +444,8 @@ class Downloader:
                     return
                     
                 # Filter and format based on type_choice
-                format_list = []
-                self.format_map = {}
-                format_groups = defaultdict(list)
-                
-                if type_choice == '3':  # Audio Only
-                    for f in formats_data:
-                        if f.get('vcodec') == 'none' and f.get('acodec') != 'none':
-                            key = f.get('abr')
-                            if key:
-                                format_groups[key].append(f)
-                                
-                    # Sort groups by bitrate (abr) descending
-                    for key in sorted(format_groups.keys(), reverse=True):
-                        group = format_groups[key]
-                        best = max(group, key=lambda x: x.get('filesize_approx') or x.get('filesize') or 0)
-                        size = best.get('filesize_approx') or best.get('filesize')
-                        size_str = format_size(size) if size else "Unknown"
-                        abr = best.get('abr', 'Unknown')
-                        format_str = f"{abr} kbps - {size_str}"
-                        
-                        format_list.append(format_str)
-                        self.format_map[format_str] = (best['format_id'], best.get('ext', 'm4a'))
-                        
-                else:  # Video + Audio or Video Only
-                    for f in formats_data:
-                        # Consider only video formats (may or may not have audio initially)
-                        if f.get('vcodec') != 'none' and f.get('height') is not None:
-                            key = (f.get('height'), f.get('fps')) # Group by height and fps
-                            format_groups[key].append(f)
-                            
-                    # Sort groups by height descending, then fps descending
-                    for key in sorted(format_groups.keys(), key=lambda x: (x[0] or 0, x[1] or 0), reverse=True):
-                        group = format_groups[key]
-                        # Find best format (e.g., largest filesize_approx)
-                        best = max(group, key=lambda x: x.get('filesize_approx') or x.get('filesize') or 0)
-                        size = best.get('filesize_approx') or best.get('filesize')
-                        size_str = format_size(size) if size else "Unknown"
-                        height = best.get('height', '?')
-                        fps = best.get('fps', '')
-                        fps_str = f" ({fps}fps)" if fps else ""
-                        format_str = f"{height}p{fps_str} - {size_str}"
-                        
-                        format_list.append(format_str)
-                        # Store format_id and original extension
-                        self.format_map[format_str] = (best['format_id'], best.get('ext', 'mp4')) 
+                format_list, self.format_map = self._build_format_list(formats_data, type_choice)
+                self.format_sizes = self._format_sizes(info, self.format_map, type_choice)
 
                 if not format_list:
                     self.queue.put(("error", f"No compatible {'audio' if type_choice == '3' else 'video'} formats found"))
@@ -350,32 +467,304 @@ class Downloader:
             logger.error(f"General error in fetch_formats_thread: {str(e)}", exc_info=True)
             self.queue.put(("error", "Error processing URL"))
         finally:
+            root_span.end()
             # Re-enable the fetch button after completion (success or error)
             self.queue.put(("enable_fetch", None))
 
-    def _process_phantom_results(self, phantom_urls, type_choice):
-        """Process the URLs extracted by PhantomJS."""
-        # Use self.phantomjs_path wherever phantomjs.exe is needed
-        try:
-            formats = []
-            self.format_map = {}
-            
-            # For each URL, try to extract format information
-            for url in phantom_urls:
+    def _dump_json(self, url, on_start=None):
+        """Run yt-dlp --dump-json for a single URL and return the CompletedProcess."""
+        info_args = [
+            '--dump-json',
+            '--no-playlist',
+            '--no-warnings',
+            '--socket-timeout', '30',
+            url
+        ]
+        return self.execute_ytdlp(info_args, timeout=60, on_start=on_start)
+
+    def _hedged_extract(self, url, job_id, parent_span):
+        """Race PhantomJS against yt-dlp --dump-json and keep the first usable result.
+
+        yt-dlp starts after self.hedge_delay seconds, or as soon as PhantomJS
+        comes back empty-handed. The loser is cancelled and its process killed.
+
+        Returns:
+            ('phantom', (phantom_result, phantom_urls)) if PhantomJS found media,
+            otherwise ('ytdlp', CompletedProcess or the exception it raised)
+        """
+        results = queue.Queue()
+        start_ytdlp = threading.Event()
+        cancelled = threading.Event()
+        ytdlp_processes = []
+        started_at = {}  # path -> perf_counter() when it started
+        # The worker is shared with other jobs, so only this request may be cancelled
+        phantom_request = self.phantom_handler.new_request_id()
+
+        def on_ytdlp_start(process):
+            ytdlp_processes.append(process)
+            if cancelled.is_set():
+                process.kill()
+
+        def run_phantom():
+            started = started_at["phantom"] = time.perf_counter()
+            with tracer.span("phantom_extract", job_id, parent=parent_span, hedged=True) as span:
                 try:
-                    if "video" in url.lower():
-                        format_id = f"phantom:{url}"
-                        format_list = [f"Video (Direct) - {url[:30]}..."]
-                        self.format_map[format_list[0]] = (format_id, "mp4")
-                        formats.extend(format_list)
-                    elif "audio" in url.lower():
-                        format_id = f"phantom:{url}"
-                        format_list = [f"Audio (Direct) - {url[:30]}..."]
-                        self.format_map[format_list[0]] = (format_id, "mp3")
-                        formats.extend(format_list)
+                    phantom_result = self.phantom_handler.extract_media_urls(url, request_id=phantom_request)
                 except Exception as e:
-                    logger.warning(f"Error processing phantom URL: {url}, error: {str(e)}")
-            
+                    phantom_result = {"error": str(e)}
+                phantom_urls = []
+                if "error" not in phantom_result:
+                    phantom_urls = self.phantom_handler.get_ytdlp_compatible_urls(phantom_result)
+                span.set(urls=len(phantom_urls), error=phantom_result.get("error"))
+            # A cancelled loser was recorded when it lost
+            if not cancelled.is_set():
+                self.router.record(url, "phantom", bool(phantom_urls), time.perf_counter() - started)
+            results.put(("phantom", (phantom_result, phantom_urls)))
+
+        def run_ytdlp():
+            start_ytdlp.wait(self.hedge_delay)
+            if cancelled.is_set():
+                return
+            started = started_at["ytdlp"] = time.perf_counter()
+            with tracer.span("dump_json", job_id, parent=parent_span, hedged=True) as span:
+                try:
+                    outcome = self._dump_json(url, on_start=on_ytdlp_start)
+                    span.set(returncode=outcome.returncode)
+                    success = outcome.returncode == 0 and bool(outcome.stdout)
+                except Exception as e:
+                    outcome = e
+                    success = False
+            if not cancelled.is_set():
+                self.router.record(url, "ytdlp", success, time.perf_counter() - started)
+            results.put(("ytdlp", outcome))
+
+        for target in (run_phantom, run_ytdlp):
+            threading.Thread(target=target, daemon=True).start()
+
+        phantom_done = ytdlp_done = False
+        while True:
+            source, outcome = results.get()
+            if source == "phantom":
+                phantom_done = True
+                if outcome[1]:
+                    winner = ("phantom", outcome)
+                    break
+                if "error" in outcome[0]:
+                    logger.warning(f"PhantomJS failed ({outcome[0]['error']}), waiting for yt-dlp")
+                else:
+                    logger.warning("PhantomJS couldn't find any media URLs, waiting for yt-dlp")
+                self.queue.put(("status", "PhantomJS couldn't find content, trying standard method..."))
+                start_ytdlp.set()
+                if ytdlp_done:
+                    winner = ("ytdlp", ytdlp_outcome)
+                    break
+            else:
+                ytdlp_done = True
+                ytdlp_outcome = outcome
+                usable = not isinstance(outcome, Exception) and outcome.returncode == 0 and outcome.stdout
+                if usable or phantom_done:
+                    winner = ("ytdlp", outcome)
+                    break
+
+        # Cancel the loser
+        cancelled.set()
+        start_ytdlp.set()
+        if winner[0] == "phantom":
+            for process in ytdlp_processes:
+                if process.poll() is None:
+                    logger.info("PhantomJS won the race, killing yt-dlp extraction")
+                    process.kill()
+        elif not phantom_done:
+            logger.info("yt-dlp won the race, cancelling PhantomJS extraction")
+            self.phantom_handler.cancel(phantom_request)
+            # It produced nothing in time: a failed sample, so it lowers PhantomJS's success
+            # rate for this domain without adding a latency it never achieved
+            now = time.perf_counter()
+            self.router.record(url, "phantom", False,
+                               now - min(started_at.get("phantom", now), started_at["ytdlp"]))
+        return winner
+
+    def _build_format_list(self, formats_data, type_choice):
+        """Group yt-dlp formats into display strings for the format dropdown.
+
+        Args:
+            formats_data: The 'formats' list from yt-dlp's --dump-json output
+            type_choice: '1' (Video + Audio), '2' (Video Only) or '3' (Audio Only)
+
+        Returns:
+            Tuple of (format_list, format_map)
+        """
+        format_list = []
+        format_map = {}
+        format_groups = defaultdict(list)
+
+        if type_choice == '3':  # Audio Only
+            for f in formats_data:
+                if f.get('vcodec') == 'none' and f.get('acodec') != 'none':
+                    key = f.get('abr')
+                    if key:
+                        format_groups[key].append(f)
+
+            # Sort groups by bitrate (abr) descending
+            for key in sorted(format_groups.keys(), reverse=True):
+                group = format_groups[key]
+                best = max(group, key=lambda x: x.get('filesize_approx') or x.get('filesize') or 0)
+                size = best.get('filesize_approx') or best.get('filesize')
+                size_str = format_size(size) if size else "Unknown"
+                abr = best.get('abr', 'Unknown')
+                format_str = f"{abr} kbps - {size_str}"
+
+                format_list.append(format_str)
+                format_map[format_str] = (best['format_id'], best.get('ext', 'm4a'))
+
+        else:  # Video + Audio or Video Only
+            for f in formats_data:
+                # Consider only video formats (may or may not have audio initially)
+                if f.get('vcodec') != 'none' and f.get('height') is not None:
+                    key = (f.get('height'), f.get('fps')) # Group by height and fps
+                    format_groups[key].append(f)
+
+            # Sort groups by height descending, then fps descending
+            for key in sorted(format_groups.keys(), key=lambda x: (x[0] or 0, x[1] or 0), reverse=True):
+                group = format_groups[key]
+                # Find best format (e.g., largest filesize_approx)
+                best = max(group, key=lambda x: x.get('filesize_approx') or x.get('filesize') or 0)
+                size = best.get('filesize_approx') or best.get('filesize')
+                size_str = format_size(size) if size else "Unknown"
+                height = best.get('height', '?')
+                fps = best.get('fps', '')
+                fps_str = f" ({fps}fps)" if fps else ""
+                format_str = f"{height}p{fps_str} - {size_str}"
+
+                format_list.append(format_str)
+                # Store format_id and original extension
+                format_map[format_str] = (best['format_id'], best.get('ext', 'mp4'))
+
+        return format_list, format_map
+
+    def _format_sizes(self, info, format_map, type_choice):
+        """
+        Estimated download size of every entry in format_map.
+
+        Video + Audio adds the largest audio-only format, which is what
+        bestaudio will usually pick.
+
+        Returns:
+            dict: format string -> bytes (None when unknown)
+        """
+        duration = info.get('duration')
+        by_id = {f.get('format_id'): f for f in info.get('formats', [])}
+        audio_sizes = [format_bytes(f, duration) or 0 for f in by_id.values()
+                       if f.get('vcodec') == 'none' and f.get('acodec') != 'none']
+        best_audio = max(audio_sizes, default=0)
+        sizes = {}
+        for format_str, (format_id, _ext) in format_map.items():
+            fmt = by_id.get(format_id, {})
+            size = format_bytes(fmt, duration)
+            if size and type_choice == '1' and fmt.get('acodec') in (None, 'none'):
+                size += best_audio
+            sizes[format_str] = size
+        return sizes
+
+    def _static_extract(self, url, type_choice, job_id, parent_span):
+        """
+        Try to resolve a page from its static HTML alone.
+
+        Returns:
+            bool: True if formats were found and sent to the queue
+        """
+        with tracer.span("static_extract", job_id, parent=parent_span) as span:
+            started = time.perf_counter()
+            result = self.static_extractor.extract_media_urls(url)
+            candidates = result['videoUrls'] + result['audioUrls']
+            formats, format_map = self._probe_formats(candidates, result['audioUrls'], type_choice) \
+                if candidates else ([], {})
+            self.router.record(url, "direct", bool(formats), time.perf_counter() - started)
+            span.set(candidates=len(candidates), formats=len(formats), bytes_read=result['bytesRead'],
+                     error=result['error'])
+
+        if not formats:
+            logger.info(f"No media in static HTML for {url}, falling back to PhantomJS")
+            return False
+        if result['title']:
+            self.queue.put(("video_title", result['title']))
+        self.format_map = format_map
+        self.queue.put(("formats", formats))
+        return True
+
+    def _probe_formats(self, media_urls, audio_urls=None, type_choice='1'):
+        """
+        Probe candidate media URLs and turn them into format entries.
+
+        Each URL is probed over HTTP for its type, size and (for manifests)
+        renditions; the ranked results replace guessing from the URL text.
+        HLS and DASH manifests are expanded into one entry per rendition.
+
+        Returns:
+            tuple: (format_list, format_map)
+        """
+        audio_urls = set(audio_urls or [])
+        video_formats, audio_formats = [], []
+        format_map = {}
+        sizes = {}
+
+        def add(format_list, label, details, value, size=None):
+            # Keep labels unique; they double as format_map keys and filename parts
+            name, counter = label, 2
+            while any(key.startswith(f"{name} - ") for key in format_map):
+                name, counter = f"{label} #{counter}", counter + 1
+            format_str = f"{name} - {details}"
+            format_map[format_str] = value
+            sizes[format_str] = size
+            format_list.append(format_str)
+
+        for info in self.media_probe.probe_all(media_urls):
+            if info['kind'] == 'manifest' and info['variants']:
+                protocol = info['protocol'].upper()
+                renditions = sorted(info['variants'], key=lambda r: (-(r['height'] or 0), -(r['tbr'] or 0)))
+                for record in renditions:
+                    bitrate = f"{record['tbr'] / 1000:.1f} Mbps" if record['tbr'] and record['tbr'] >= 1000 \
+                        else f"{record['tbr']:.0f} kbps" if record['tbr'] else "Unknown bitrate"
+                    value = (f"phantom:{info['final_url']}", "m4a" if record['kind'] == 'audio' else "mp4",
+                             format_filter(record))
+                    if record['kind'] == 'audio':
+                        label = " ".join(filter(None, ["Audio", protocol, record['name'] or record['language']]))
+                        add(audio_formats, label, f"{bitrate} {record['acodec'] or ''}".strip(), value)
+                    else:
+                        fps = f"{record['fps']:.0f}" if record['fps'] and record['fps'] > 30 else ""
+                        label = f"Video {record['height']}p{fps} {protocol}" if record['height'] else f"Video {protocol}"
+                        codec = (record['vcodec'] or '').split('.')[0]
+                        add(video_formats, label, f"{bitrate} {codec}".strip(), value)
+                continue
+
+            # Audio-only MP4s report video/mp4, so trust the network classification
+            is_audio = info['kind'] == 'audio' or info['url'] in audio_urls
+            label = "Audio" if is_audio else "Video"
+            if not is_audio and info['height']:
+                label += f" {info['height']}p"
+            if info['kind'] == 'manifest':
+                label += f" {(info['protocol'] or 'stream').upper()}"
+                details = "Stream"
+            else:
+                label += f" {MediaProbe.extension_for(info).upper()}"
+                details = format_size(info['size']) if info['size'] else "Unknown size"
+            ext = "mp3" if is_audio else MediaProbe.extension_for(info)
+            # Progressive video files are plain GETs, fetched by DirectDownload instead of yt-dlp
+            value = (f"phantom:{info['final_url']}", ext, "", "direct") if info['kind'] == 'video' \
+                else (f"phantom:{info['final_url']}", ext, "")
+            add(audio_formats if is_audio else video_formats, label, details, value, info['size'])
+
+        # Probed sizes go with the format list the caller is about to show
+        self.format_sizes = sizes
+
+        if type_choice == '3':
+            return audio_formats + video_formats, format_map
+        return video_formats + audio_formats, format_map
+
+    def _process_phantom_results(self, phantom_urls, type_choice, audio_urls=None):
+        """Probe the URLs extracted by PhantomJS and offer them as formats."""
+        try:
+            formats, self.format_map = self._probe_formats(phantom_urls, audio_urls, type_choice)
             if formats:
                 self.queue.put(("formats", formats))
             else:
@@ -384,13 +773,31 @@ class Downloader:
             logger.error(f"Error in _process_phantom_results: {str(e)}")
             self.queue.put(("error", f"Failed to process extracted content: {str(e)}"))
 
-    def start_download(self, url, type_choice, format_str, folder, user_title):
+    def start_download(self, url, type_choice, format_str, folder, user_title, engine=None):
+        """
+        Download the selected format of the fetched video.
+
+        Args:
+            url (str): Video page URL
+            type_choice (str): '1' video+audio, '2' video only, '3' audio only
+            format_str (str): One of the fetched formats
+            folder (str): Folder the file is saved in
+            user_title (str): File name, before the format suffix
+            engine (EngineClient): Running download engine to hand the download
+                to, so its scheduler and bandwidth limit cover it too
+
+        Returns:
+            tuple: (success, error_message)
+        """
+        job_id = self._trace_job(url)
+        start_span = tracer.start_span("start_download", job_id, format=format_str)
         try:
             # Extract format information from the selected format string
             if format_str not in self.format_map:
                 return False, "Selected format is not available"
             
-            format_id, format_ext = self.format_map[format_str]
+            format_entry = self.format_map[format_str]
+            format_id, format_ext = format_entry[:2]
             
             logger.info(f"Starting download: {url}, type: {type_choice}, format: {format_id}")
             
@@ -402,6 +809,7 @@ class Downloader:
             
             # Check if it's a PhantomJS URL
             is_phantom_url = format_id.startswith("phantom:")
+            use_direct = False
             
             # Common flags for all downloads
             common_flags = [
@@ -411,31 +819,53 @@ class Downloader:
                 '--no-playlist',
                 '--socket-timeout', '30',
                 '--retries', '5',
-                '--ffmpeg-location', ffmpeg_executable,
+                # Report the real output path; --no-quiet keeps the output --print would hide
+                '--print', 'after_move:filepath',
+                '--no-quiet',
             ]
+            if ffmpeg_executable:
+                common_flags.extend(['--ffmpeg-location', ffmpeg_executable])
             
             if is_phantom_url:
                 # Direct download using the PhantomJS extracted URL
-                if "Video" in format_str:
-                    # No specific action needed for sequence here anymore
-                    pass
-                else:
-                    # No specific action needed for sequence here anymore
-                    pass
-                
                 direct_url = format_id.replace("phantom:", "")
                 expected_ext = format_ext
+                # Manifest renditions carry a yt-dlp format filter such as "[height=720][tbr=2500]"
+                rendition = format_entry[2] if len(format_entry) > 2 else ""
                 
                 if type_choice == '3' and "Audio" in format_str:
                     # Audio download
                     command_args = [
                         *common_flags,
+                        *(['--format', f"ba{rendition}/ba/b"] if rendition else []),
                         '--extract-audio',
                         '--audio-format', 'mp3',
                         '--audio-quality', '0', 
                     ]
                     expected_ext = 'mp3'
                     is_video_only = False # Phantom URLs are treated as single stream
+                elif rendition and "Audio" in format_str:
+                    # A single audio rendition from a manifest
+                    command_args = [
+                        *common_flags,
+                        '--format', f"ba{rendition}/ba",
+                    ]
+                    is_video_only = False
+                elif rendition and type_choice == '1':
+                    # The chosen rendition plus the manifest's best audio, unless it is already muxed
+                    command_args = [
+                        *common_flags,
+                        '--format', f"bv*{rendition}+ba/b{rendition}/bv*+ba/b",
+                        '--merge-output-format', 'mp4',
+                    ]
+                    expected_ext = 'mp4'
+                    is_video_only = False
+                elif rendition:
+                    command_args = [
+                        *common_flags,
+                        '--format', f"bv*{rendition}/b{rendition}/bv*",
+                    ]
+                    is_video_only = True
                 else:
                     # Video download
                     command_args = [
@@ -443,6 +873,7 @@ class Downloader:
                         '--format', 'best', # Let yt-dlp choose best for direct URL
                     ]
                     is_video_only = True # Phantom URLs are treated as single stream
+                    use_direct = len(format_entry) > 3 and format_entry[3] == "direct"
                     
                 # Override the URL with the direct URL from PhantomJS
                 direct_download_url = direct_url
@@ -456,7 +887,7 @@ class Downloader:
                     expected_ext = 'mp4'
                     command_args = [
                         *common_flags,
-                        '--format', f"{format_id}+bestaudio",
+                        '--format', f"{format_id}+bestaudio/{format_id}",  # Muxed formats have no separate audio
                         '--merge-output-format', 'mp4',
                     ]
                 elif type_choice == '2':
@@ -489,90 +920,204 @@ class Downloader:
             full_filename = os.path.join(folder, f"{base_filename}.{expected_ext}")
             
             # Validate the download path
-            valid, error_msg = self.validate_download_path(folder, full_filename)
+            with tracer.span("validate_download_path", job_id, parent=start_span):
+                valid, error_msg = self.validate_download_path(folder, full_filename)
             if not valid:
+                start_span.end(error=error_msg)
+                return False, error_msg
+
+            if engine is not None:
+                format_spec = command_args[command_args.index('--format') + 1] if '--format' in command_args else None
+                engine_type = '3' if '--extract-audio' in command_args else ('2' if is_video_only else '1')
+                start_span.end(engine=True)
+                return engine.start_download(direct_download_url, engine_type, folder, format_spec=format_spec,
+                                             title=base_filename, page_url=url if is_phantom_url else None)
+
+            # Merging and audio extraction briefly need room for both input and output
+            reservation, error_msg = self.disk_space.reserve(
+                folder, self.format_sizes.get(format_str), overhead=2.0 if type_choice in ('1', '3') else 1.0)
+            if reservation is None:
+                start_span.end(error=error_msg)
                 return False, error_msg
             
             command_args.extend(['--output', os.path.join(folder, f"{base_filename}.%(ext)s")])
+            # Fetched in-process, preallocated to the probed size
+            direct = {'path': full_filename, 'size': self.format_sizes.get(format_str)} if use_direct else None
             self.ytdlp_process = None
             self.queue.put(("status", "Starting download..."))
             
             download_thread_obj = threading.Thread(
                 target=self._download_thread, 
-                args=(direct_download_url, command_args, folder, base_filename, expected_ext, is_phantom_url), 
+                args=(direct_download_url, command_args, base_filename, is_phantom_url, job_id, reservation, direct,
+                      self.thumbnails.get(url), url),
                 daemon=True
             )
             download_thread_obj.do_run = True
             self.active_threads.append(download_thread_obj)
             download_thread_obj.start()
-            
+
+            start_span.end()
             return True, None
         except Exception as e:
             logger.error(f"Error starting download: {str(e)}")
+            start_span.end(error=str(e))
             return False, f"Error starting download: {str(e)}"
 
-    def _download_thread(self, url, command_args, folder, base_filename, expected_ext, is_phantom_url=False):
+    def _download_thread(self, url, command_args, base_filename, is_phantom_url=False, job_id=None, reservation=None,
+                         direct=None, thumbnail=None, page_url=None):
         # Note: Removed type_choice from args as it's not needed here anymore
+        if job_id is None:
+            job_id = self._trace_job(url)
+        root_span = tracer.start_span("download", job_id, url=url)
+        phases = PhaseTracker(tracer, job_id, parent=root_span)
+        first_output = threading.Event()
+        error_lines = []  # ERROR lines from yt-dlp; the reader threads own the pipes
+        final_path = {}  # Filled from --print after_move:filepath
+        job_key = f"download-{next(self._download_ids)}"
+        size = reservation.download_size if reservation is not None else None
+        self._publish_job(job_key, title=base_filename, state='queued', size=size or None, thumbnail=thumbnail)
         try:
             # Log whether we're using PhantomJS URL
             if is_phantom_url:
                 logger.info(f"Downloading using PhantomJS extracted URL: {url}")
             
-            full_command_args = command_args + [url]
-            
             # Define a callback to handle output lines (simplified)
             def process_output(line):
+                if not first_output.is_set():
+                    first_output.set()
+                    tracer.instant("first_output", job_id, line=line[:200])
+                if line.startswith("ERROR:"):
+                    error_lines.append(line)
+                elif not line.startswith("[") and os.path.isabs(line) and os.path.isfile(line):
+                    # --print after_move:filepath
+                    final_path['path'] = line
+                    return
                 progress_info = self.parse_progress_output(line)
                 if progress_info:
+                    self._trace_phase(phases, progress_info, line)
                     self._handle_progress_info(progress_info)
+                    if progress_info.get('status') == 'downloading':
+                        self.governor.report(job_key, progress_info['speed'] * 1048576)
+                        if reservation is not None:
+                            reservation.update_percent(progress_info['percent'], progress_info['size'])
+                        self._publish_job(job_key, state='downloading', phase='download',
+                                          percent=progress_info['percent'], speed=progress_info['speed'],
+                                          eta=progress_info['eta'], **({} if size else {'size': progress_info['size']}))
+                    elif progress_info.get('status') == 'processing':
+                        self.governor.report(job_key, 0, restartable=False)
+                        self._publish_job(job_key, state='processing', speed=0.0,
+                                          phase='merge' if progress_info.get('phase') == 'merging' else 'postprocess')
                 elif "Merging formats" in line:
                     # Send a status update for merging
                     self.queue.put(("status", "Merging formats..."))
-                
-            # Start the yt-dlp process
-            process = self.start_ytdlp_process(full_command_args, on_output=process_output)
-            self.ytdlp_process = process
-            
-            # Wait for the process to complete
-            return_code = process.wait()
+
+            # The scheduler stops this job while a higher-priority one runs or while it's paused,
+            # and the governor restarts it when its share changes; either way yt-dlp resumes
+            # from the .part file when the loop starts it again
+            job = self.scheduler.add(job_key, base_filename, PRIORITY_HIGH)
+            self.download_job = job
+            return_code = None
+            registered = False
+            try:
+                while True:
+                    if not self.scheduler.wait_turn(job):
+                        break
+                    if not registered:
+                        self.governor.register(job_key, on_rate_change=job.restart)
+                        registered = True
+                    self._publish_job(job_key, state='downloading')
+                    rate = self.governor.rate_for(job_key)
+                    # Start the yt-dlp process, or the direct download standing in for it
+                    with tracer.span("spawn", job_id, parent=root_span, limit_rate=rate, direct=bool(direct)):
+                        if direct:
+                            process = DirectDownload(self.media_probe.http, url, direct['path'], direct['size'],
+                                                     rate, on_output=process_output,
+                                                     allocate=load_preallocate_config()).start()
+                            self.ytdlp_process = process
+                        else:
+                            process = self.start_ytdlp_process(with_limit_rate(command_args, rate) + [url],
+                                                               on_output=process_output)
+                    self.scheduler.attach(job, process)
+                    phases.enter("startup")
+
+                    # Wait for the process to complete
+                    return_code = process.wait()
+                    phases.close(returncode=return_code)
+                    if not self.scheduler.detach(job):
+                        break
+                    tracer.instant("restart", job_id, state=job.state)
+                    if not self.scheduler.may_run(job):
+                        # Hand the paused job's bandwidth to the others
+                        self.governor.unregister(job_key)
+                        registered = False
+                        self._publish_job(job_key, state=job.state, speed=0.0)
+            finally:
+                self.scheduler.remove(job)
+                if self.download_job is job:
+                    self.download_job = None
+
+            if job.cancelled:
+                root_span.set(error="cancelled")
+                self._publish_job(job_key, state='cancelled', speed=0.0)
+                self.queue.put(("download_error", "Download cancelled"))
+                return
             
             # Check if download succeeded
             if return_code != 0:
-                error = process.stderr.read() if process.stderr else "Unknown error"
+                error = "\n".join(error_lines) or "Unknown error"
                 logger.error(f"yt-dlp process failed with code {return_code}: {error}")
+                root_span.set(error=f"exit code {return_code}")
+                self._publish_job(job_key, state='failed', speed=0.0, error=error)
                 self.queue.put(("download_error", f"Download failed with error code {return_code}"))
                 return
             
-            # Simplified filename finding for Video+Audio (just look for mp4)
-            if "+bestaudio" in str(command_args): # Crude check if it was video+audio mode
-                filename = os.path.join(folder, f"{base_filename}.mp4")
-            elif ".mp3" in str(command_args): # Check if audio only mode
-                 filename = os.path.join(folder, f"{base_filename}.mp3")
-            else: # Video only mode
-                filename = os.path.join(folder, f"{base_filename}.{expected_ext}")
-                
-            # Fallback if expected file not found
-            if not os.path.exists(filename):
-                 for file in os.listdir(folder):
-                    if file.startswith(base_filename) and os.path.isfile(os.path.join(folder, file)):
-                        filename = os.path.join(folder, file)
-                        logger.info(f"Found output file via fallback search: {filename}")
-                        break
-                        
-            # Verify file exists after download
-            if not os.path.exists(filename):
+            finalize_span = tracer.start_span("finalize", job_id, parent=root_span)
+            # yt-dlp printed the final path after merging and post-processing
+            filename = final_path.get('path')
+            if not filename or not os.path.exists(filename):
+                finalize_span.end(error="file not found")
+                self._publish_job(job_key, state='failed', speed=0.0, error="File not found after download")
                 self.queue.put(("download_error", "Download failed: File not found after download"))
                 return
             
             # Set file modification time to current time
             current_time = time.time()
             os.utime(filename, (current_time, current_time))
+            finalize_span.end(filename=filename)
+            if self.archive is not None:
+                # url is the media URL for PhantomJS results; the archive knows the video by its page
+                self.archive.add_key(self.archive_key(page_url or url))
             
+            self._publish_job(job_key, state='done', percent=100.0, speed=0.0, phase='')
             self.queue.put(("download_complete", filename))
             
         except Exception as e:
             logger.error(f"Error in download thread: {str(e)}")
+            root_span.set(error=str(e))
+            self._publish_job(job_key, state='failed', speed=0.0, error=str(e))
             self.queue.put(("download_error", f"Download failed: {str(e)}"))
+        finally:
+            self.governor.unregister(job_key)
+            if reservation is not None:
+                reservation.release()
+            phases.close()
+            root_span.end()
+
+    def _trace_phase(self, phases, progress_info, line):
+        """Move the job's trace to the phase indicated by a parsed output line."""
+        status = progress_info.get('status')
+        if status == 'finished' and 'Destination:' in line:
+            # Each destination line starts a new stream (video, then audio)
+            phases.enter("download", destination=line.split('Destination:', 1)[1].strip())
+        elif status == 'downloading':
+            current = phases.current
+            if current is None or current.name == "startup":
+                phases.enter("download")
+        elif status == 'processing':
+            name = "merge" if progress_info.get('phase') == 'merging' else "postprocess"
+            current = phases.current
+            if current is None or current.name != name:
+                phases.enter(name)
 
     def _handle_progress_info(self, progress_info):
         """Handle progress information from yt-dlp output (simplified)."""
@@ -605,52 +1150,123 @@ class Downloader:
             if not os.path.exists(folder):
                 os.makedirs(folder, exist_ok=True)
                 
-            # Check if path is writable
-            test_file = os.path.join(folder, ".write_test")
-            try:
-                with open(test_file, 'w') as f:
-                    f.write("test")
-                os.remove(test_file)
-            except (PermissionError, OSError):
+            # Check if path is writable (cached; a test file per job is slow on network shares)
+            if not self.disk_space.cache.writable(folder):
                 return False, "No write permission for this folder"
                 
             # Check if file already exists
             if os.path.exists(filename):
                 return False, "This file already exists in the directory"
                 
-            # Check for disk space (rough estimate - 1GB free minimum)
-            if os.name == 'posix':
-                import shutil
-                stats = shutil.disk_usage(folder)
-                if stats.free < 1073741824:  # 1GB in bytes
-                    return False, "Not enough disk space"
-                    
+            # Disk space is checked against the job's estimated size when it is admitted
             return True, ""
         except Exception as e:
             logger.error(f"Error validating download path: {str(e)}")
             return False, "Error validating download path"
             
+    def start_playlist_download(self, url, type_choice, quality, folder):
+        """
+        Download every entry of a playlist or channel.
+
+        Args:
+            url (str): Playlist or channel URL
+            type_choice (str): '1' video+audio, '2' video only, '3' audio only
+            quality (str): One of playlist.PLAYLIST_QUALITIES
+            folder (str): Parent folder; entries go into a subfolder named after the playlist
+
+        Returns:
+            tuple: (success, error_message)
+        """
+        if self.playlist_job and self.playlist_job.thread and self.playlist_job.thread.is_alive():
+            return False, "A playlist or import is already running"
+        if not self.ytdlp_exe:
+            return False, "yt-dlp executable not found"
+        logger.info(f"Starting playlist download: {url}, type: {type_choice}, quality: {quality}")
+        self.queue.put(("status", "Listing playlist entries..."))
+        self.playlist_job = PlaylistDownload(self, url, type_choice, quality, folder)
+        self.playlist_job.start()
+        return True, None
+
+    def start_url_list_download(self, type_choice, quality, folder, text=None, path=None):
+        """
+        Download every URL in a pasted list or a .txt/.csv file.
+
+        The list is read on the pipeline thread, so this returns at once
+        however long it is.
+
+        Args:
+            type_choice (str): '1' video+audio, '2' video only, '3' audio only
+            quality (str): One of playlist.PLAYLIST_QUALITIES
+            folder (str): Folder the files are saved in
+            text (str): Pasted URLs
+            path (str): File to read URLs from instead
+
+        Returns:
+            tuple: (success, error_message)
+        """
+        if self.playlist_job and self.playlist_job.thread and self.playlist_job.thread.is_alive():
+            return False, "A playlist or import is already running"
+        if not self.ytdlp_exe:
+            return False, "yt-dlp executable not found"
+        logger.info(f"Starting URL import from {path or 'pasted text'}, type: {type_choice}, quality: {quality}")
+        self.queue.put(("status", "Reading URL list..."))
+        self.playlist_job = UrlListDownload(self, type_choice, quality, folder, text=text, path=path)
+        self.playlist_job.start()
+        return True, None
+
     def cancel_active_process(self):
         """Cancel any active yt-dlp processes."""
         try:
+            if self.playlist_job:
+                self.playlist_job.cancel()
+            if self.download_job:
+                # Also releases a download that is waiting while paused or preempted
+                self.scheduler.cancel(self.download_job.key)
             if self.ytdlp_process and self.ytdlp_process.poll() is None:
-                # Process is still running, terminate it
+                # Process is still running; returns as soon as it has exited
                 logger.info("Terminating active yt-dlp process")
-                self.ytdlp_process.terminate()
-                # Give it a moment to terminate
-                time.sleep(0.5)
-                # If it's still running, kill it forcefully
-                if self.ytdlp_process.poll() is None:
-                    self.ytdlp_process.kill()
+                stop_process(self.ytdlp_process)
                 return True
             return False
         except Exception as e:
             logger.error(f"Error cancelling yt-dlp process: {str(e)}")
             return False
 
+    def pause_job(self, key):
+        """
+        Pause a download. Its process is stopped, the .part file is kept,
+        and resume_job() continues from the same byte offset.
+
+        Returns:
+            bool: False if no such job is running
+        """
+        return self.scheduler.pause(key)
+
+    def resume_job(self, key):
+        """Resume a paused download."""
+        return self.scheduler.resume(key)
+
+    def set_job_priority(self, key, priority):
+        """Change a download's priority (PRIORITY_LOW/NORMAL/HIGH from scheduler)."""
+        return self.scheduler.set_priority(key, priority)
+
+    def list_jobs(self):
+        """Snapshots of all scheduled downloads, highest priority first."""
+        return self.scheduler.snapshot()
+
+    def _publish_job(self, key, **fields):
+        """Send changed fields of a job's progress record to the job table."""
+        fields['key'] = key
+        self.queue.put(("job_updates", [fields]))
+
     def cleanup(self):
-        """Clean up temporary files."""
+        """Clean up temporary files and the PhantomJS worker."""
         try:
+            if self.playlist_job:
+                self.playlist_job.cancel()
+            self.phantom_handler.shutdown()
+            # Spans are kept in memory during the session and written once
+            tracer.flush()
             # Clean up temp files
             for temp_file in self.temp_files:
                 if os.path.exists(temp_file):
@@ -0,0 +1,730 @@
+import os
+import sys
+import hmac
+import json
+import time
+import queue
+import signal
+import secrets
+import itertools
+import threading
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from config import load_config, load_engine_port_config, save_bandwidth_limit_config
+    from downloader import Downloader
+    from playlist import PLAYLIST_QUALITIES, PlaylistDownload
+    from url_import import UrlListDownload, url_key
+    from scheduler import PRIORITY_HIGH, PRIORITY_NAMES
+    from utils import sanitize_filename
+else:
+    # Running directly as .py
+    from utils import logger
+    from config import load_config, load_engine_port_config, save_bandwidth_limit_config
+    from downloader import Downloader
+    from playlist import PLAYLIST_QUALITIES, PlaylistDownload
+    from url_import import UrlListDownload, url_key
+    from scheduler import PRIORITY_HIGH, PRIORITY_NAMES
+    from utils import sanitize_filename
+
+# Port, token and process id of the running engine, for clients on this machine
+ENDPOINT_FILE = os.path.join(os.path.expanduser("~"), ".yt_downloader_engine.json")
+
+# API names for the download types, besides the GUI's '1', '2' and '3'
+TYPE_CHOICES = {'1': '1', '2': '2', '3': '3', 'video+audio': '1', 'video': '2', 'audio': '3'}
+FINAL_STATES = ('done', 'failed', 'cancelled')
+# Playlists and URL lists running at once; single videos start regardless
+MAX_RUNNING_BATCHES = 2
+# Finished submissions kept for queries, with their entries
+MAX_FINISHED = 200
+# Events a slow client may fall behind by before it is disconnected (it reconnects to a fresh snapshot)
+SUBSCRIBER_BACKLOG = 1000
+KEEPALIVE_SECONDS = 15
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+def load_endpoint():
+    """
+    Where the engine listens, as written by the last one started.
+
+    Returns:
+        dict: port, token and pid, or None if no engine has run
+    """
+    try:
+        with open(ENDPOINT_FILE, encoding='utf-8') as f:
+            endpoint = json.load(f)
+        return endpoint if endpoint.get('port') and endpoint.get('token') else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_endpoint(port, token):
+    """Write the endpoint file, readable only by the current user."""
+    fd = os.open(ENDPOINT_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'port': port, 'token': token, 'pid': os.getpid()}, f)
+
+
+class SingleDownload(UrlListDownload):
+    """
+    One video, downloaded ahead of batch entries.
+
+    Runs through the same pipeline as a URL list, but its download has
+    the main window's priority, so it preempts playlist entries instead
+    of queueing behind them. Videos sent by the window carry its chosen
+    format and file name, and are downloaded even if archived: the window
+    has already asked about that. The URL is used exactly as given, never
+    parsed as a list or canonicalized, since media URLs found on a page
+    often carry commas and signed query strings.
+    """
+
+    name = "Download"
+    priority = PRIORITY_HIGH
+
+    def __init__(self, downloader, url, type_choice, quality, folder, format_spec=None, title=None, page_url=None,
+                 force=False, **kwargs):
+        """
+        Args:
+            url (str): Video page, or media URL found on page_url
+            format_spec (str): yt-dlp format selector instead of the quality's
+            title (str): File name without extension instead of the video's title
+            page_url (str): Page the media URL was found on; archived under it
+            force (bool): Download even if the video is in the archive
+        """
+        super().__init__(downloader, type_choice, quality, folder, workers=(1, 1, 1), **kwargs)
+        self.url = url
+        self.format_spec = format_spec or self.format_spec
+        self.title = title
+        self.page_url = page_url
+        self.skip_archived = not force
+
+    def _enumerate(self, extract_queue):
+        """Queue the one entry."""
+        if not self.downloader.ytdlp_exe:
+            return "yt-dlp executable not found"
+        key = url_key(self.page_url or self.url)
+        self.total = 1
+        entry = self._new_entry(1, self.title or self.url, self.url, archive_key=None if key[0] == 'url' else key)
+        self._add_entry(extract_queue, entry)
+        self.enumerated = True
+        return "Cancelled" if self.stop_event.is_set() else None
+
+    def _base_name(self, entry):
+        return sanitize_filename(self.title) if self.title else super()._base_name(entry)
+
+    def _extract(self, entry):
+        entry = super()._extract(entry)
+        if entry is not None and self.page_url:
+            # The media URL's own key would not be found when the page is next checked
+            self._release(entry)
+            entry['archive_key'] = url_key(self.page_url)
+            entry['claimed'] = self.downloader.claim_key(entry['archive_key'])
+        return entry
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            entry = next(iter(self.entries.values()), None)
+            stats['path'] = entry['path'] if entry and entry['state'] == 'done' else None
+            stats['error'] = entry['error'] if entry else None
+        return stats
+
+
+class _SubmissionMessages:
+    """Queue-like target of a batch's messages, handing them to the engine with their submission."""
+
+    def __init__(self, engine, submission):
+        self.engine = engine
+        self.submission = submission
+
+    def put(self, message):
+        self.engine._handle(self.submission, message)
+
+
+class Submission:
+    """A batch of work submitted to the engine: a video, a URL list, a file of URLs or a playlist."""
+
+    def __init__(self, submission_id, kind, type_choice, quality, folder, url=None, text=None, path=None,
+                 format_spec=None, title=None, page_url=None):
+        self.id = submission_id
+        self.kind = kind  # 'video', 'urls', 'file' or 'playlist'
+        self.type_choice = type_choice
+        self.quality = quality
+        self.folder = folder
+        self.url = url
+        self.text = text
+        self.path = path
+        self.format_spec = format_spec
+        self.title = title
+        self.page_url = page_url
+        self.state = 'queued'
+        self.stats = None  # Latest playlist_progress / playlist_complete stats
+        self.error = None
+        self.created = time.time()
+        self.batch = None  # PlaylistDownload while running
+        self.entry_prefix = None  # Job table keys of its entries start with this
+        self.cancel_requested = False
+        self.finished = threading.Event()
+
+    @property
+    def single(self):
+        """Whether this is one video, started without waiting for running batches."""
+        return self.kind == 'video' or (self.kind == 'urls' and self.url is not None)
+
+    def snapshot(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'type': self.type_choice,
+            'quality': self.quality,
+            'folder': self.folder,
+            'url': self.url,
+            'path': self.path,
+            'title': self.title,
+            'stats': self.stats,
+            'error': self.error,
+            'created': self.created,
+        }
+
+
+class Engine:
+    """
+    Headless download engine that owns the job queue.
+
+    Submissions run side by side as playlist or URL-list batches on one
+    Downloader, so every download, including single videos sent by the
+    window, shares its scheduler, bandwidth limit and archive: videos
+    preempt batch entries and one limit covers them all. At most
+    MAX_RUNNING_BATCHES playlists and lists run at once, which keeps many
+    submitters from multiplying the number of downloads; single videos
+    never wait for them. Each batch's messages are turned into job state
+    here and fanned out to every subscriber (the HTTP API's event
+    streams).
+    """
+
+    def __init__(self, downloader=None):
+        self.queue = downloader.queue if downloader is not None else queue.Queue()
+        self.downloader = downloader or Downloader(self.queue)
+        self.submissions = OrderedDict()  # id -> Submission, oldest first
+        self.entries = OrderedDict()  # job table key -> latest record
+        self.running = set()
+        self._pending = deque()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._subscribers = set()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the dispatcher and runner threads."""
+        for target in (self._dispatch, self._run):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Cancel the running batches and stop the engine."""
+        self._stopped.set()
+        with self._wake:
+            self._wake.notify_all()
+            batches = [submission.batch for submission in self.running if submission.batch is not None]
+        for batch in batches:
+            batch.cancel()
+        self.downloader.cleanup()
+
+    def submit(self, kind, type_choice='1', quality=PLAYLIST_QUALITIES[0], folder=None, url=None, text=None,
+               path=None, format_spec=None, title=None, page_url=None):
+        """
+        Queue a batch.
+
+        Returns:
+            Submission: The queued submission
+        """
+        with self._wake:
+            submission = Submission(f"job-{next(self._ids)}", kind, type_choice, quality, folder or load_config(),
+                                    url=url, text=text, path=path, format_spec=format_spec, title=title,
+                                    page_url=page_url)
+            self.submissions[submission.id] = submission
+            self._pending.append(submission)
+            self._wake.notify()
+        logger.info(f"Engine: queued {submission.id} ({kind}) for {submission.folder}")
+        self._broadcast('job', submission.snapshot())
+        return submission
+
+    def cancel(self, submission_id):
+        """
+        Cancel a queued or running submission.
+
+        Returns:
+            dict: Its snapshot, or None if there is no such submission
+        """
+        with self._wake:
+            submission = self.submissions.get(submission_id)
+            if submission is None:
+                return None
+            if submission.state == 'queued':
+                self._pending.remove(submission)
+                submission.state = 'cancelled'
+                submission.finished.set()
+            elif submission.state == 'running':
+                submission.cancel_requested = True
+            batch = submission.batch
+        if batch is not None:
+            batch.cancel()
+        snapshot = submission.snapshot()
+        self._broadcast('job', snapshot)
+        return snapshot
+
+    def get(self, submission_id):
+        """Snapshot of a submission with its entries, or None."""
+        with self._lock:
+            submission = self.submissions.get(submission_id)
+            if submission is None:
+                return None
+            snapshot = submission.snapshot()
+            prefix = submission.entry_prefix
+            snapshot['entries'] = [dict(record) for key, record in self.entries.items()
+                                   if prefix and key.startswith(prefix)]
+        return snapshot
+
+    def list(self):
+        """Snapshots of all known submissions, oldest first."""
+        with self._lock:
+            return [submission.snapshot() for submission in self.submissions.values()]
+
+    def set_bandwidth_limit(self, limit_mbps):
+        """Change the total download limit of all submissions and save it."""
+        self.downloader.governor.set_limit(limit_mbps)
+        save_bandwidth_limit_config(limit_mbps or 0)
+
+    def subscribe(self):
+        """
+        Start receiving events.
+
+        Returns:
+            Subscriber: Holds (event, data) pairs, starting with the current
+                submissions and entries
+        """
+        subscriber = Subscriber()
+        with self._lock:
+            for submission in self.submissions.values():
+                subscriber.put('job', submission.snapshot())
+            if self.entries:
+                subscriber.put('entries', [dict(record) for record in self.entries.values()])
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if not subscriber.put(event, data):
+                self.unsubscribe(subscriber)
+
+    def _next(self):
+        """The oldest queued submission that may start now, or None. Caller holds the lock."""
+        batches = sum(1 for submission in self.running if not submission.single)
+        for submission in self._pending:
+            if submission.single or batches < MAX_RUNNING_BATCHES:
+                return submission
+        return None
+
+    def _run(self):
+        """Start queued submissions, each on its own thread, as they are allowed to run."""
+        while not self._stopped.is_set():
+            with self._wake:
+                submission = self._next()
+                while submission is None and not self._stopped.is_set():
+                    self._wake.wait()
+                    submission = self._next()
+                if self._stopped.is_set():
+                    return
+                self._pending.remove(submission)
+                submission.state = 'running'
+                self.running.add(submission)
+            self._broadcast('job', submission.snapshot())
+            threading.Thread(target=self._execute, args=(submission,), name=f"engine-{submission.id}",
+                             daemon=True).start()
+
+    def _batch(self, submission):
+        """The PlaylistDownload that carries out a submission."""
+        options = {'messages': _SubmissionMessages(self, submission)}
+        if submission.kind == 'playlist':
+            return PlaylistDownload(self.downloader, submission.url, submission.type_choice, submission.quality,
+                                    submission.folder, **options)
+        if submission.single:
+            return SingleDownload(self.downloader, submission.url, submission.type_choice, submission.quality,
+                                  submission.folder, format_spec=submission.format_spec, title=submission.title,
+                                  page_url=submission.page_url, force=submission.kind == 'video', **options)
+        return UrlListDownload(self.downloader, submission.type_choice, submission.quality, submission.folder,
+                               text=submission.text, path=submission.path, **options)
+
+    def _execute(self, submission):
+        try:
+            if not self.downloader.ytdlp_exe:
+                submission.error = "yt-dlp executable not found"
+            else:
+                batch = self._batch(submission)
+                with self._lock:
+                    submission.batch = batch
+                    submission.entry_prefix = batch.job_group + '-'
+                if submission.cancel_requested:
+                    batch.cancel()
+                batch.run()
+                if submission.single and submission.stats and submission.stats['failed']:
+                    submission.error = submission.stats['error']
+        except Exception as e:
+            logger.error(f"Engine: {submission.id} failed: {str(e)}")
+            submission.error = str(e)
+        if submission.cancel_requested:
+            submission.state = 'cancelled'
+        elif submission.error:
+            submission.state = 'failed'
+        else:
+            submission.state = 'done'
+        logger.info(f"Engine: {submission.id} {submission.state}")
+        with self._wake:
+            self.running.discard(submission)
+            submission.batch = None
+            submission.finished.set()
+            self._prune()
+            self._wake.notify()
+        self._broadcast('job', submission.snapshot())
+
+    def _prune(self):
+        """Forget the oldest finished submissions and their entries. Caller holds the lock."""
+        finished = [s for s in self.submissions.values() if s.state in FINAL_STATES]
+        for submission in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self.submissions[submission.id]
+            if submission.entry_prefix:
+                for key in [key for key in self.entries if key.startswith(submission.entry_prefix)]:
+                    del self.entries[key]
+
+    def _handle(self, submission, message):
+        """Turn a batch's message into job state and events."""
+        message_type = message[0]
+        data = message[1] if len(message) > 1 else None
+        if message_type == 'job_updates':
+            with self._lock:
+                for update in data:
+                    self.entries.setdefault(update['key'], {}).update(update)
+            self._broadcast('entries', data)
+        elif message_type in ('playlist_progress', 'playlist_complete', 'download_error'):
+            if message_type == 'download_error':
+                submission.error = data
+            else:
+                submission.stats = data
+            self._broadcast('job', submission.snapshot())
+        elif message_type in ('status', 'error'):
+            self._broadcast('status', {'job': submission.id, 'message': data})
+
+    def _dispatch(self):
+        """Pass on the downloader's own messages: scheduler changes and engine-wide status."""
+        while not self._stopped.is_set():
+            try:
+                message = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if message[0] == 'jobs_changed':
+                self._broadcast('scheduler', message[1])
+            elif message[0] in ('status', 'error'):
+                self._broadcast('status', {'job': None, 'message': message[1]})
+
+
+class Subscriber:
+    """Bounded event queue of one event stream."""
+
+    def __init__(self, backlog=SUBSCRIBER_BACKLOG):
+        self.events = queue.Queue(maxsize=backlog)
+        self.dropped = False
+
+    def put(self, event, data):
+        """Queue an event; False (and dropped) once the client has fallen too far behind."""
+        try:
+            self.events.put_nowait((event, data))
+            return True
+        except queue.Full:
+            self.dropped = True
+            return False
+
+
+class EngineRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the engine.
+
+        GET    /health            engine is up
+        POST   /jobs              submit {"url" | "urls" | "text" | "path", "playlist",
+                                  "type", "quality", "folder"}, or a video chosen in
+                                  the window {"video", "format", "title", "page_url", ...}
+        GET    /jobs              all submissions
+        GET    /jobs/<id>         one submission with its entries
+        DELETE /jobs/<id>         cancel a submission
+        GET    /downloads         the scheduler's downloads
+        POST   /downloads/<key>   {"paused": bool} and/or {"priority": n}
+        GET    /limit             total bandwidth limit {"mbps"} (0 = unlimited)
+        PUT    /limit             change it
+        GET    /events            server-sent events: job, entries, status, scheduler
+
+    Every request needs the token from the endpoint file, as a Bearer
+    Authorization header or a token query parameter (EventSource can't
+    send headers). CORS is open so bookmarklets can call the API from any
+    page; the token is what keeps other pages out.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ADMVideoDownloaderEngine'
+
+    def log_message(self, format, *args):
+        logger.debug(f"Engine API: {self.address_string()} {format % args}")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._send_cors_headers()
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Authorization, Content-Type')
+        # Chrome asks before letting a public page reach a local address
+        self.send_header('Access-Control-Allow-Private-Network', 'true')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        path = self._route()
+        if path is None:
+            return
+        engine = self.server.engine
+        if path == '/health':
+            self._send_json(200, {'ok': True, 'pid': os.getpid(), 'jobs': len(engine.submissions)})
+        elif path == '/jobs':
+            self._send_json(200, {'jobs': engine.list()})
+        elif path.startswith('/jobs/'):
+            snapshot = engine.get(path[len('/jobs/'):])
+            self._send_json(200 if snapshot else 404, snapshot or {'error': 'No such job'})
+        elif path == '/downloads':
+            self._send_json(200, {'downloads': engine.downloader.list_jobs()})
+        elif path == '/limit':
+            limit = engine.downloader.governor.limit
+            self._send_json(200, {'mbps': limit / 1048576 if limit else 0.0})
+        elif path == '/events':
+            self._stream_events()
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        path = self._route()
+        if path is None:
+            return
+        if path.startswith('/downloads/'):
+            self._change_download(path[len('/downloads/'):])
+            return
+        if path != '/jobs':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        try:
+            body = self._read_json()
+            submission = self._submit(body)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(202, submission.snapshot())
+
+    def do_PUT(self):
+        path = self._route()
+        if path is None:
+            return
+        if path != '/limit':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        try:
+            mbps = float(self._read_json().get('mbps') or 0)
+        except (TypeError, ValueError):
+            self._send_json(400, {'error': 'mbps must be a number'})
+            return
+        if mbps < 0:
+            self._send_json(400, {'error': 'mbps must not be negative'})
+            return
+        self.server.engine.set_bandwidth_limit(mbps)
+        self._send_json(200, {'mbps': mbps})
+
+    def do_DELETE(self):
+        path = self._route()
+        if path is None:
+            return
+        snapshot = self.server.engine.cancel(path[len('/jobs/'):]) if path.startswith('/jobs/') else None
+        self._send_json(200 if snapshot else 404, snapshot or {'error': 'No such job'})
+
+    def _route(self):
+        """Path of an authorized request, or None once an error has been sent."""
+        parts = urlsplit(self.path)
+        token = self.headers.get('Authorization', '')
+        token = token[len('Bearer '):] if token.startswith('Bearer ') else parse_qs(parts.query).get('token', [''])[0]
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            self._send_json(401, {'error': 'Missing or wrong token'})
+            return None
+        return parts.path.rstrip('/') or '/'
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def _change_download(self, key):
+        """Pause, resume or reprioritize one of the scheduler's downloads."""
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        downloader = self.server.engine.downloader
+        found = True
+        if 'paused' in body:
+            found = (downloader.pause_job if body['paused'] else downloader.resume_job)(key)
+        if found and 'priority' in body:
+            if body['priority'] not in PRIORITY_NAMES:
+                self._send_json(400, {'error': f"priority must be one of {', '.join(map(str, PRIORITY_NAMES))}"})
+                return
+            found = downloader.set_job_priority(key, body['priority'])
+        self._send_json(200 if found else 404, {'ok': True} if found else {'error': 'No such download'})
+
+    def _submit(self, body):
+        type_choice = TYPE_CHOICES.get(str(body.get('type', '1')).lower())
+        if type_choice is None:
+            raise ValueError(f"type must be one of {', '.join(TYPE_CHOICES)}")
+        quality = body.get('quality', PLAYLIST_QUALITIES[0])
+        if quality not in PLAYLIST_QUALITIES:
+            raise ValueError(f"quality must be one of {', '.join(PLAYLIST_QUALITIES)}")
+        folder = body.get('folder') or load_config()
+        if not folder:
+            raise ValueError("No folder given and no default download folder set")
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            raise ValueError(f"Cannot use folder {folder}: {e}")
+        options = {'type_choice': type_choice, 'quality': quality, 'folder': folder}
+
+        engine = self.server.engine
+        if body.get('video'):
+            if not isinstance(body.get('url'), str):
+                raise ValueError("A video needs a url")
+            fields = {name: body.get(name) for name in ('format', 'title', 'page_url')}
+            if any(value is not None and not isinstance(value, str) for value in fields.values()):
+                raise ValueError("format, title and page_url must be strings")
+            return engine.submit('video', url=body['url'], format_spec=fields['format'] or None,
+                                 title=fields['title'] or None, page_url=fields['page_url'] or None, **options)
+        if body.get('playlist'):
+            if not isinstance(body.get('url'), str):
+                raise ValueError("A playlist needs a url")
+            return engine.submit('playlist', url=body['url'], **options)
+        if body.get('path'):
+            return engine.submit('file', path=str(body['path']), **options)
+        urls = body.get('urls') or ([body['url']] if body.get('url') else [])
+        if urls and isinstance(urls, list):
+            return engine.submit('urls', url=urls[0] if len(urls) == 1 else None,
+                                 text='\n'.join(str(url) for url in urls), **options)
+        if isinstance(body.get('text'), str):
+            return engine.submit('urls', text=body['text'], **options)
+        raise ValueError("Give a url, urls, text or path")
+
+    def _send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self._send_cors_headers()
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        engine = self.server.engine
+        subscriber = engine.subscribe()
+        try:
+            while not subscriber.dropped and not engine._stopped.is_set():
+                try:
+                    event, data = subscriber.events.get(timeout=KEEPALIVE_SECONDS)
+                    chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                except queue.Empty:
+                    chunk = ": keepalive\n\n"
+                self.wfile.write(chunk.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass  # Client went away
+        finally:
+            engine.unsubscribe(subscriber)
+
+
+class EngineServer(ThreadingHTTPServer):
+    """HTTP server on localhost serving an Engine."""
+
+    daemon_threads = True
+
+    def __init__(self, engine, token, port=0):
+        self.engine = engine
+        self.token = token
+        super().__init__(('127.0.0.1', port), EngineRequestHandler)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+def run_engine(port=None):
+    """
+    Run the engine and its API until interrupted.
+
+    The token is kept across restarts so bookmarklets and scripts keep
+    working; the endpoint file is rewritten with the current port.
+
+    Returns:
+        int: Exit status
+    """
+    endpoint = load_endpoint() or {}
+    token = endpoint.get('token') or secrets.token_urlsafe(24)
+    engine = Engine().start()
+    try:
+        server = EngineServer(engine, token, load_engine_port_config() if port is None else port)
+    except OSError as e:
+        logger.error(f"Engine could not listen: {str(e)}")
+        print(f"Could not start the download engine: {e}")
+        engine.stop()
+        return 1
+    _save_endpoint(server.port, token)
+    logger.info(f"Engine listening on 127.0.0.1:{server.port}")
+    print(f"Download engine listening on http://127.0.0.1:{server.port} (token in {ENDPOINT_FILE})")
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.stop()
+    return 0
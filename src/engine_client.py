@@ -0,0 +1,254 @@
+import sys
+import json
+import threading
+
+import urllib3
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from engine import load_endpoint, KEEPALIVE_SECONDS
+else:
+    # Running directly as .py
+    from utils import logger
+    from engine import load_endpoint, KEEPALIVE_SECONDS
+
+
+class EngineError(Exception):
+    """The engine refused a request or could not be reached."""
+
+
+class EngineClient:
+    """
+    Client of a running engine's HTTP API.
+
+    Besides the plain API calls it offers start_playlist_download(),
+    start_url_list_download() and the job controls with the Downloader's
+    signatures, and forward_events() to replay the engine's event stream
+    into a GUI queue as the messages the Downloader would have sent, so
+    the window can hand its downloads to the engine without changing how
+    it shows them.
+    """
+
+    def __init__(self, port, token, timeout=5):
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.port = port
+        self.token = token
+        self.http = urllib3.PoolManager(maxsize=2, timeout=urllib3.Timeout(connect=1, read=timeout),
+                                        retries=False)
+        self.submitted = set()  # Ids of submissions made through this client
+        self._stop = threading.Event()
+        self._response = None
+
+    @classmethod
+    def connect(cls):
+        """
+        Client of the engine running on this machine.
+
+        Returns:
+            EngineClient: None if no engine answers
+        """
+        endpoint = load_endpoint()
+        if endpoint is None:
+            return None
+        client = cls(endpoint['port'], endpoint['token'], timeout=1)
+        try:
+            client.health()
+        except EngineError:
+            return None
+        client.http.connection_pool_kw['timeout'] = urllib3.Timeout(connect=1, read=30)
+        return client
+
+    def _request(self, method, path, body=None):
+        headers = {'Authorization': f"Bearer {self.token}"}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        try:
+            response = self.http.request(method, self.base_url + path, headers=headers,
+                                         body=json.dumps(body) if body is not None else None)
+        except urllib3.exceptions.HTTPError as e:
+            raise EngineError(f"Download engine not reachable: {e}")
+        try:
+            data = json.loads(response.data or b'{}')
+        except ValueError:
+            raise EngineError(f"Unexpected answer from the download engine (HTTP {response.status})")
+        if response.status >= 400:
+            raise EngineError(data.get('error') or f"HTTP {response.status}")
+        return data
+
+    def health(self):
+        return self._request('GET', '/health')
+
+    def submit(self, **fields):
+        """
+        Submit a batch (see EngineRequestHandler for the fields).
+
+        Returns:
+            dict: The submission's snapshot
+        """
+        snapshot = self._request('POST', '/jobs', fields)
+        self.submitted.add(snapshot['id'])
+        return snapshot
+
+    def jobs(self):
+        return self._request('GET', '/jobs')['jobs']
+
+    def job(self, submission_id):
+        return self._request('GET', f'/jobs/{submission_id}')
+
+    def cancel(self, submission_id):
+        return self._request('DELETE', f'/jobs/{submission_id}')
+
+    def start_playlist_download(self, url, type_choice, quality, folder):
+        """Queue a playlist on the engine; same arguments and result as Downloader's."""
+        return self._start(playlist=True, url=url, type=type_choice, quality=quality, folder=folder)
+
+    def start_url_list_download(self, type_choice, quality, folder, text=None, path=None):
+        """Queue a URL list on the engine; same arguments and result as Downloader's."""
+        return self._start(text=text, path=path, type=type_choice, quality=quality, folder=folder)
+
+    def start_download(self, url, type_choice, folder, format_spec=None, title=None, page_url=None):
+        """Download one video on the engine, with the format and file name chosen in the window."""
+        return self._start(video=True, url=url, type=type_choice, folder=folder, format=format_spec, title=title,
+                           page_url=page_url)
+
+    def list_jobs(self):
+        """The engine's scheduled downloads, as Downloader.list_jobs() returns them."""
+        try:
+            return self._request('GET', '/downloads')['downloads']
+        except EngineError as e:
+            logger.error(f"Could not list engine downloads: {str(e)}")
+            return []
+
+    def pause_job(self, key):
+        return self._change_job(key, paused=True)
+
+    def resume_job(self, key):
+        return self._change_job(key, paused=False)
+
+    def set_job_priority(self, key, priority):
+        return self._change_job(key, priority=priority)
+
+    def _change_job(self, key, **changes):
+        try:
+            self._request('POST', f'/downloads/{key}', changes)
+        except EngineError as e:
+            logger.error(f"Could not change engine download {key}: {str(e)}")
+            return False
+        return True
+
+    def bandwidth_limit(self):
+        """Total download limit of the engine in MB/s (0 = unlimited)."""
+        return self._request('GET', '/limit')['mbps']
+
+    def set_bandwidth_limit(self, limit_mbps):
+        """Change the engine's total download limit; the engine saves it."""
+        self._request('PUT', '/limit', {'mbps': limit_mbps})
+
+    def _start(self, **fields):
+        try:
+            self.submit(**{name: value for name, value in fields.items() if value is not None})
+        except EngineError as e:
+            return False, str(e)
+        return True, None
+
+    def events(self):
+        """
+        Events from the engine until the stream ends.
+
+        Yields:
+            tuple: (event, data)
+        """
+        response = self.http.request(
+            'GET', f"{self.base_url}/events", headers={'Authorization': f"Bearer {self.token}"},
+            preload_content=False, timeout=urllib3.Timeout(connect=1, read=KEEPALIVE_SECONDS * 2))
+        self._response = response
+        try:
+            if response.status != 200:
+                raise EngineError(f"HTTP {response.status}")
+            event, data, buffer = None, [], b''
+            # read1() returns what has arrived; iterating the response would wait for 64 KiB
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    return
+                *lines, buffer = (buffer + chunk).split(b'\n')
+                for raw in lines:
+                    line = raw.decode('utf-8').rstrip('\r')
+                    if line.startswith('event:'):
+                        event = line[6:].strip()
+                    elif line.startswith('data:'):
+                        data.append(line[5:].strip())
+                    elif not line and event:
+                        yield event, json.loads('\n'.join(data))
+                        event, data = None, []
+        finally:
+            response.release_conn()
+
+    def forward_events(self, target_queue):
+        """
+        Replay engine events into a GUI queue on a background thread.
+
+        Entries of every submission go to the job table and scheduler
+        changes to the downloads dialog; progress, status and completion
+        only for submissions made through this client. The stream is
+        reopened if the engine restarts.
+        """
+        thread = threading.Thread(target=self._forward, args=(target_queue,), daemon=True)
+        thread.start()
+        return thread
+
+    def _forward(self, target_queue):
+        while not self._stop.is_set():
+            try:
+                for event, data in self.events():
+                    if self._stop.is_set():
+                        return
+                    for message in self._messages(event, data):
+                        target_queue.put(message)
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                logger.info(f"Engine event stream interrupted: {str(e)}")
+            self._stop.wait(2)
+
+    def _messages(self, event, data):
+        """Downloader queue messages equivalent to an engine event."""
+        if event == 'entries':
+            return [("job_updates", data)]
+        if event == 'scheduler':
+            return [("jobs_changed", data)]
+        if event == 'status':
+            return [("status", data['message'])] if data.get('job') in self.submitted else []
+        if event != 'job' or data['id'] not in self.submitted:
+            return []
+        state = data['state']
+        stats = data['stats']
+        if data['kind'] == 'video':
+            # Shown like a download started in the window
+            if state == 'running' and stats:
+                return [("progress", stats['percent'], stats['speed'], "")]
+            if state in ('done', 'cancelled', 'failed'):
+                self.submitted.discard(data['id'])
+                if stats and stats.get('path'):
+                    return [("download_complete", stats['path'])]
+                return [("download_error", data['error'] or (stats or {}).get('error') or f"Download {state}")]
+            return []
+        if state == 'running' and stats:
+            return [("playlist_progress", stats)]
+        if state in ('done', 'cancelled', 'failed'):
+            self.submitted.discard(data['id'])
+            if stats and 'folder' in stats:
+                return [("playlist_complete", stats)]
+            return [("download_error", data['error'] or f"Download {state}")]
+        return []
+
+    def stop(self):
+        """Stop forwarding events."""
+        self._stop.set()
+        if self._response is not None:
+            try:
+                self._response.close()
+            except Exception:
+                pass
@@ -7,6 +7,7 @@ from .url_input import URLInputComponent
 from .download_options import DownloadOptionsComponent
 from .format_selector import FormatSelectorComponent
 from .progress_section import ProgressSectionComponent
+from .job_table import JobTableComponent
 from .menu_bar import MenuBarComponent
 
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     'DownloadOptionsComponent',
     'FormatSelectorComponent',
     'ProgressSectionComponent',
+    'JobTableComponent',
     'MenuBarComponent'
 ] 
\ No newline at end of file
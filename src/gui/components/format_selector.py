@@ -4,7 +4,7 @@ Handles the format selection dropdown and fetch button.
 """
 
 from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, 
-                           QComboBox, QPushButton)
+                           QComboBox, QPushButton, QCheckBox)
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
 
 class FormatSelectorComponent(QWidget):
@@ -16,6 +16,7 @@ class FormatSelectorComponent(QWidget):
     # Signals
     fetch_clicked = pyqtSignal()
     format_selected = pyqtSignal(str)  # Emits the selected format string
+    playlist_toggled = pyqtSignal(bool)  # Emits whether whole-playlist mode is on
     
     def __init__(self, parent=None):
         """Initialize the format selector component."""
@@ -40,8 +41,15 @@ class FormatSelectorComponent(QWidget):
         self.fetch_button.clicked.connect(self._on_fetch_clicked)
         self.fetch_button.setDefault(True)
         
+        # Whole playlist / channel mode replaces fetching formats for one video
+        self.playlist_check = QCheckBox("Entire playlist / channel")
+        self.playlist_check.setCursor(Qt.PointingHandCursor)
+        self.playlist_check.setToolTip("Download every video of a playlist or channel")
+        self.playlist_check.toggled.connect(self.playlist_toggled.emit)
+        
         button_layout.addStretch()
         button_layout.addWidget(self.fetch_button)
+        button_layout.addWidget(self.playlist_check)
         button_layout.addStretch()
         
         # Format selection layout
@@ -127,6 +135,10 @@ class FormatSelectorComponent(QWidget):
         """Clear the format dropdown."""
         self.format_combo.clear()
         
+    def is_playlist_mode(self):
+        """Whether whole-playlist mode is selected."""
+        return self.playlist_check.isChecked()
+        
     def enable_fetch(self, enabled=True):
         """Enable or disable the fetch button WITHOUT changing text."""
         self.fetch_button.setEnabled(enabled)
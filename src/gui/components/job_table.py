@@ -0,0 +1,310 @@
+"""
+Job table component for the Video Downloader application.
+Lists every download (single videos and playlist entries) with its state and progress.
+"""
+
+from PyQt5.QtWidgets import (
+    QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyleOptionProgressBar,
+    QApplication, QStyle, QMenu
+)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, QEvent, QSize
+from PyQt5.QtGui import QPixmap
+
+# (record field, header) in display order
+COLUMNS = [
+    ("title", "Title"),
+    ("state", "State"),
+    ("percent", "Progress"),
+    ("speed", "Speed"),
+    ("eta", "ETA"),
+    ("size", "Size"),
+    ("phase", "Phase"),
+]
+FIELD_COLUMNS = {field: column for column, (field, _header) in enumerate(COLUMNS)}
+PERCENT_COLUMN = FIELD_COLUMNS["percent"]
+
+STATE_LABELS = {
+    "queued": "Queued",
+    "extracting": "Extracting",
+    "waiting": "Waiting",
+    "paused": "Paused",
+    "downloading": "Downloading",
+    "processing": "Processing",
+    "done": "Done",
+    "failed": "Failed",
+    "skipped": "Skipped",
+    "cancelled": "Cancelled",
+}
+PHASE_LABELS = {
+    "extract": "Extract",
+    "download": "Download",
+    "merge": "Merge",
+    "postprocess": "Process",
+}
+FINISHED_STATES = ("done", "failed", "skipped", "cancelled")
+# Longest text of each column after the title, for sizing
+COLUMN_SAMPLES = ("Downloading", "100.0%", "99.9 MB/s", "00:00", "999.9 MB", "Download")
+
+# Repaint at most this often, however many progress lines arrive in between
+REFRESH_INTERVAL_MS = 250
+# More separate dirty ranges than this are sent as one covering range
+MAX_RANGES = 8
+# Thumbnail shown before each title (16:9, fits the fixed row height)
+THUMBNAIL_SIZE = QSize(36, 20)
+
+
+class JobRecord:
+    """Latest known state of one job; formatted only when a visible cell is painted."""
+
+    __slots__ = ("key", "title", "state", "percent", "speed", "eta", "size", "phase", "error", "thumbnail")
+
+    def __init__(self, key):
+        self.key = key
+        self.title = key
+        self.state = "queued"
+        self.percent = 0.0
+        self.speed = 0.0
+        self.eta = ""
+        self.size = None
+        self.phase = ""
+        self.error = None
+        self.thumbnail = None
+
+
+def _format_size(size):
+    if not size:
+        return ""
+    if size >= 1024 ** 3:
+        return f"{size / 1024 ** 3:.2f} GB"
+    return f"{size / 1024 ** 2:.1f} MB"
+
+
+class JobTableModel(QAbstractTableModel):
+    """
+    Table model over JobRecords, fed with "job_updates" batches from the queue.
+
+    Updates only change the records and mark their rows dirty. A timer
+    turns the dirty rows into a few dataChanged ranges every
+    REFRESH_INTERVAL_MS, so hundreds of jobs reporting progress cost a
+    handful of signals per refresh, and the view repaints only the rows
+    that are on screen. Thumbnails are likewise only asked for when a
+    visible row is painted.
+    """
+
+    def __init__(self, parent=None, refresh_interval=REFRESH_INTERVAL_MS):
+        super().__init__(parent)
+        self.thumbnail_loader = None
+        self._blank = None
+        self.records = []
+        self.rows = {}  # key -> row
+        self._dirty_rows = set()
+        self._dirty_columns = set()
+        self._timer = QTimer(self)
+        self._timer.setInterval(refresh_interval)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        field = COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            if field == "title":
+                return record.title
+            if field == "state":
+                return STATE_LABELS.get(record.state, record.state)
+            if field == "percent":
+                return f"{record.percent:.1f}%"
+            if field == "speed":
+                return f"{record.speed:.1f} MB/s" if record.state == "downloading" and record.speed else ""
+            if field == "eta":
+                return record.eta if record.state == "downloading" else ""
+            if field == "size":
+                return _format_size(record.size)
+            if field == "phase":
+                return PHASE_LABELS.get(record.phase, record.phase)
+        elif role == Qt.DecorationRole and field == "title":
+            if record.thumbnail and self.thumbnail_loader is not None:
+                # A blank of the same size until it loads, so the title doesn't jump
+                return self.thumbnail_loader.pixmap(record.thumbnail, THUMBNAIL_SIZE) or self._placeholder()
+        elif role == Qt.UserRole and field == "percent":
+            return record.percent
+        elif role == Qt.ToolTipRole:
+            return record.error or record.title
+        elif role == Qt.TextAlignmentRole and field in ("speed", "eta", "size"):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def apply_updates(self, updates):
+        """
+        Merge a batch of job updates.
+
+        Args:
+            updates (list): Dicts with a 'key' and any JobRecord fields that changed
+        """
+        new_records = []
+        for update in updates:
+            key = update["key"]
+            row = self.rows.get(key)
+            if row is None:
+                record = JobRecord(key)
+                new_records.append(record)
+                # Rows are inserted below; later updates in this batch find them here
+                self.rows[key] = len(self.records) + len(new_records) - 1
+            else:
+                record = self.records[row] if row < len(self.records) else new_records[row - len(self.records)]
+            for field, value in update.items():
+                if field != "key" and getattr(record, field) != value:
+                    setattr(record, field, value)
+                    if row is not None:
+                        self._dirty_rows.add(row)
+                        self._dirty_columns.add(FIELD_COLUMNS.get(field, 0))
+        if new_records:
+            first = len(self.records)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_records) - 1)
+            self.records.extend(new_records)
+            self.endInsertRows()
+
+    def set_thumbnail_loader(self, loader):
+        """Show thumbnails from a ThumbnailLoader before the titles."""
+        self.thumbnail_loader = loader
+        loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+    def _placeholder(self):
+        if self._blank is None:
+            self._blank = QPixmap(THUMBNAIL_SIZE)
+            self._blank.fill(Qt.transparent)
+        return self._blank
+
+    def _on_thumbnail_ready(self, url):
+        # Repainted with the next flush; rows off screen ignore it
+        for row, record in enumerate(self.records):
+            if record.thumbnail == url:
+                self._dirty_rows.add(row)
+                self._dirty_columns.add(0)
+
+    def flush(self):
+        """Emit dataChanged for everything updated since the last flush."""
+        if not self._dirty_rows:
+            return
+        rows = sorted(self._dirty_rows)
+        first_column, last_column = min(self._dirty_columns), max(self._dirty_columns)
+        self._dirty_rows.clear()
+        self._dirty_columns.clear()
+        ranges = []
+        for row in rows:
+            if ranges and row == ranges[-1][1] + 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        if len(ranges) > MAX_RANGES:
+            ranges = [[rows[0], rows[-1]]]
+        for first, last in ranges:
+            self.dataChanged.emit(self.index(first, first_column), self.index(last, last_column))
+
+    def clear_finished(self):
+        """Drop jobs that are done, failed, skipped or cancelled."""
+        self.beginResetModel()
+        self.records = [record for record in self.records if record.state not in FINISHED_STATES]
+        self.rows = {record.key: row for row, record in enumerate(self.records)}
+        self._dirty_rows.clear()
+        self._dirty_columns.clear()
+        self.endResetModel()
+
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    """Paints the progress column as a progress bar."""
+
+    def paint(self, painter, option, index):
+        percent = index.data(Qt.UserRole)
+        if percent is None:
+            super().paint(painter, option, index)
+            return
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.palette = option.palette
+        bar.state = option.state | QStyle.State_Enabled
+        bar.minimum = 0
+        bar.maximum = 1000
+        bar.progress = int(percent * 10)
+        bar.text = index.data(Qt.DisplayRole)
+        bar.textVisible = True
+        bar.textAlignment = Qt.AlignCenter
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ProgressBar, bar, painter, option.widget)
+
+
+class JobTableComponent(QTableView):
+    """Table view of all downloads, backed by a JobTableModel."""
+
+    def __init__(self, parent=None):
+        """Initialize the job table component."""
+        super().__init__(parent)
+        self.job_model = JobTableModel(self)
+        self.setModel(self.job_model)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Set up the user interface for this component."""
+        self.setItemDelegateForColumn(PERCENT_COLUMN, ProgressBarDelegate(self))
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setAlternatingRowColors(True)
+        self.setMinimumHeight(110)
+
+        # Fixed row heights and column widths: no measuring every row on each update
+        vertical = self.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(22)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        self._fit_columns()
+
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_context_menu)
+
+    def _fit_columns(self):
+        """Make each column after the title wide enough for its longest value."""
+        metrics = self.fontMetrics()
+        for column, sample in enumerate(COLUMN_SAMPLES, start=1):
+            self.setColumnWidth(column, metrics.horizontalAdvance(sample) + 12)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # Theme style sheets change the font after construction
+        if event.type() in (QEvent.FontChange, QEvent.StyleChange):
+            self._fit_columns()
+
+    def set_thumbnail_loader(self, loader):
+        """Show thumbnails from a ThumbnailLoader before the titles."""
+        self.setIconSize(THUMBNAIL_SIZE)
+        self.job_model.set_thumbnail_loader(loader)
+
+    def update_jobs(self, updates):
+        """Apply a batch of job updates from the queue."""
+        self.job_model.apply_updates(updates)
+
+    def clear_finished(self):
+        """Remove finished jobs from the table."""
+        self.job_model.clear_finished()
+
+    def _show_context_menu(self, position):
+        menu = QMenu(self)
+        menu.addAction("Clear finished", self.clear_finished)
+        menu.exec_(self.viewport().mapToGlobal(position))
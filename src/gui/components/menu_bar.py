@@ -19,6 +19,9 @@ class MenuBarComponent(QMenuBar):
     # Signals
     theme_toggle_triggered = pyqtSignal()
     default_format_triggered = pyqtSignal()
+    bandwidth_limit_triggered = pyqtSignal()
+    jobs_triggered = pyqtSignal()
+    import_urls_triggered = pyqtSignal()
     auto_fetch_toggled = pyqtSignal(bool)
     remember_directory_toggled = pyqtSignal(bool)
     view_logs_triggered = pyqtSignal()
@@ -63,6 +66,18 @@ class MenuBarComponent(QMenuBar):
         self.update_yt_dlp_action.triggered.connect(self._on_update_yt_dlp_triggered)
         self.tools_menu.addAction(self.update_yt_dlp_action)
 
+        # Running downloads: pause, resume, priority
+        self.jobs_action = QAction("&Downloads...", self)
+        self.jobs_action.setStatusTip("Pause, resume or reprioritize running downloads")
+        self.jobs_action.triggered.connect(self._on_jobs_triggered)
+        self.tools_menu.addAction(self.jobs_action)
+
+        # Download a list of URLs
+        self.import_urls_action = QAction("&Import URLs...", self)
+        self.import_urls_action.setStatusTip("Download many URLs at once from pasted text or a .txt/.csv file")
+        self.import_urls_action.triggered.connect(self._on_import_urls_triggered)
+        self.tools_menu.addAction(self.import_urls_action)
+
         # Settings Menu
         self.settings_menu = self.addMenu("&Settings")
         
@@ -72,6 +87,12 @@ class MenuBarComponent(QMenuBar):
         self.default_format_action.triggered.connect(self._on_default_format_triggered)
         self.settings_menu.addAction(self.default_format_action)
         
+        # Global bandwidth limit
+        self.bandwidth_limit_action = QAction("&Bandwidth Limit...", self)
+        self.bandwidth_limit_action.setStatusTip("Limit the total download speed of all downloads")
+        self.bandwidth_limit_action.triggered.connect(self._on_bandwidth_limit_triggered)
+        self.settings_menu.addAction(self.bandwidth_limit_action)
+        
         # Light/Dark Toggle
         self.theme_toggle_action = QAction("Switch to &Light Theme", self)
         self.theme_toggle_action.setStatusTip("Switch between light and dark themes")
@@ -214,6 +235,18 @@ class MenuBarComponent(QMenuBar):
         """Handle default format action."""
         self.default_format_triggered.emit()
         
+    def _on_jobs_triggered(self):
+        """Handle downloads action."""
+        self.jobs_triggered.emit()
+        
+    def _on_import_urls_triggered(self):
+        """Handle import URLs action."""
+        self.import_urls_triggered.emit()
+        
+    def _on_bandwidth_limit_triggered(self):
+        """Handle bandwidth limit action."""
+        self.bandwidth_limit_triggered.emit()
+        
     def _on_auto_fetch_toggled(self, checked):
         """Handle auto-fetch toggle."""
         self.auto_fetch_toggled.emit(checked)
@@ -1,15 +1,18 @@
 """
 Progress section component for the Video Downloader application.
-Handles the progress bar and status messages.
+Handles the progress bar, the job table and status messages.
 """
 
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QProgressBar, QLabel
 from PyQt5.QtCore import Qt
 
+from .job_table import JobTableComponent
+
 class ProgressSectionComponent(QWidget):
     """
     Component for displaying download progress and status.
-    Shows a progress bar and status message.
+    Shows a progress bar for the current download or playlist, a table of
+    every job, and a status message.
     """
     
     def __init__(self, parent=None):
@@ -37,6 +40,9 @@ class ProgressSectionComponent(QWidget):
         self.status_label.setAlignment(Qt.AlignCenter)
         self.status_label.setMinimumHeight(25)
         
+        # Per-job table
+        self.job_table = JobTableComponent()
+        
         # Version label (remove calibration tip)
         self.version_label = QLabel("github.com/aymanibnezakir") # Or just version/link
         self.version_label.setAlignment(Qt.AlignCenter)
@@ -44,6 +50,7 @@ class ProgressSectionComponent(QWidget):
         # Add widgets to layout
         main_layout.addWidget(self.progress_bar)
         main_layout.addWidget(self.status_label)
+        main_layout.addWidget(self.job_table, 1)
         main_layout.addWidget(self.version_label)
         
         self.setLayout(main_layout)
@@ -61,6 +68,10 @@ class ProgressSectionComponent(QWidget):
         self.progress_bar.setValue(0)
         self.status_label.setText("")
         
+    def update_jobs(self, updates):
+        """Apply a batch of job updates to the job table."""
+        self.job_table.update_jobs(updates)
+        
     def update_download_progress(self, percent, speed_mbps, eta_str=""):
         """Update the progress display with generic download information."""
         self.progress_bar.setValue(int(percent))
@@ -96,7 +107,9 @@ class ProgressSectionComponent(QWidget):
         else:
             status_text = f"{phase_text}... "
         
-        self.status_label.setText(status_text)
+        # Progress lines often repeat the same rounded text
+        if status_text != self.status_label.text():
+            self.status_label.setText(status_text)
         
     def set_status_message(self, message):
         """Set a status message (used for PhantomJS and other status updates)."""
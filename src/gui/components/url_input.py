@@ -9,6 +9,8 @@ from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QLineEdit, QPushButton
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer, QEvent
 from PyQt5.QtGui import QIcon
 
+from url_import import URL_PATTERN
+
 class URLInputComponent(QWidget):
     """
     Component for entering and pasting video URLs.
@@ -18,6 +20,7 @@ class URLInputComponent(QWidget):
     # Signals
     url_changed = pyqtSignal(str)
     url_pasted = pyqtSignal(str)
+    urls_pasted = pyqtSignal(str)  # Clipboard held several URLs
     
     def __init__(self, parent=None):
         """Initialize the URL input component."""
@@ -170,6 +173,11 @@ class URLInputComponent(QWidget):
             # Get clipboard content
             clipboard_text = clipboard.paste()
             
+            # Several URLs go to the import dialog instead
+            if clipboard_text and len(URL_PATTERN.findall(clipboard_text)) > 1:
+                self.urls_pasted.emit(clipboard_text)
+                return True
+            
             # Check if it's a valid URL
             if clipboard_text and self._is_valid_url(clipboard_text.strip()):
                 # This is a valid URL, paste it
@@ -5,8 +5,12 @@ These are separate windows used for settings and other interactions.
 
 from .settings_dialog import FormatSelectionDialog
 from .about_dialog import show_about_dialog
+from .jobs_dialog import JobsDialog
+from .import_dialog import ImportDialog
 
 __all__ = [
     'FormatSelectionDialog',
-    'show_about_dialog'
+    'show_about_dialog',
+    'JobsDialog',
+    'ImportDialog'
 ] 
\ No newline at end of file
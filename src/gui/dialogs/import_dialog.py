@@ -0,0 +1,142 @@
+"""
+URL import dialog for the Video Downloader application.
+Collects a list of URLs to download, pasted or from a text/CSV file.
+"""
+
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QComboBox, QFileDialog
+)
+
+from playlist import PLAYLIST_QUALITIES
+
+# Files offered in the file picker and accepted when dropped
+URL_LIST_EXTENSIONS = ('.txt', '.csv', '.tsv', '.list')
+
+
+def is_url_list_file(path):
+    """Whether a local file looks like a URL list by its extension."""
+    return os.path.splitext(path)[1].lower() in URL_LIST_EXTENSIONS
+
+
+class ImportDialog(QDialog):
+    """Dialog for downloading many URLs at once."""
+
+    def __init__(self, parent=None, theme_manager=None, text="", path=None):
+        """
+        Initialize the import dialog.
+
+        Args:
+            parent: Parent widget
+            theme_manager: The application's theme manager for styling
+            text (str): URLs to start with, e.g. from the clipboard
+            path (str): URL list file to start with, e.g. a dropped file
+        """
+        super().__init__(parent)
+        self.path = None
+        self._setup_ui()
+
+        if theme_manager:
+            self.setStyleSheet(theme_manager.get_dialog_style())
+
+        if path:
+            self.set_file(path)
+        elif text:
+            self.text_edit.setPlainText(text)
+
+    def _setup_ui(self):
+        """Set up the user interface for this dialog."""
+        self.setWindowTitle("Import URLs")
+        self.setMinimumWidth(520)
+        self.setMinimumHeight(360)
+        self.setAcceptDrops(True)
+
+        layout = QVBoxLayout(self)
+        hint = QLabel("Paste URLs (one or more per line), or load or drop a .txt or .csv file. "
+                      "Each video is downloaded once, however often it is listed, and videos "
+                      "in the download archive are skipped.")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setPlaceholderText("https://www.youtube.com/watch?v=...\nhttps://youtu.be/...")
+        self.text_edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(self.text_edit, 1)
+
+        file_layout = QHBoxLayout()
+        self.file_button = QPushButton("Load File...")
+        self.file_button.clicked.connect(self._choose_file)
+        self.file_label = QLabel("")
+        self.clear_file_button = QPushButton("Clear")
+        self.clear_file_button.clicked.connect(self._clear_file)
+        self.clear_file_button.setVisible(False)
+        file_layout.addWidget(self.file_button)
+        file_layout.addWidget(self.file_label, 1)
+        file_layout.addWidget(self.clear_file_button)
+        layout.addLayout(file_layout)
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(QLabel("Maximum quality:"))
+        self.quality_combo = QComboBox()
+        self.quality_combo.addItems(PLAYLIST_QUALITIES)
+        button_layout.addWidget(self.quality_combo)
+        button_layout.addStretch()
+        self.ok_button = QPushButton("Download")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def set_file(self, path):
+        """Import from a file instead of the text box; it is read when the download starts."""
+        self.path = path
+        self.file_label.setText(os.path.basename(path))
+        self.file_label.setToolTip(path)
+        self.text_edit.setEnabled(False)
+        self.clear_file_button.setVisible(True)
+
+    def get_source(self):
+        """
+        Returns:
+            tuple: (text, path); exactly one of them is set
+        """
+        if self.path:
+            return None, self.path
+        return self.text_edit.toPlainText(), None
+
+    def get_quality(self):
+        """Selected maximum quality, one of PLAYLIST_QUALITIES."""
+        return self.quality_combo.currentText()
+
+    def _choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open URL List", "",
+            f"URL lists ({' '.join('*' + ext for ext in URL_LIST_EXTENSIONS)});;All files (*)"
+        )
+        if path:
+            self.set_file(path)
+
+    def _clear_file(self):
+        self.path = None
+        self.file_label.setText("")
+        self.text_edit.setEnabled(True)
+        self.clear_file_button.setVisible(False)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls() or event.mimeData().hasText():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        mime = event.mimeData()
+        files = [url.toLocalFile() for url in mime.urls() if url.isLocalFile()] if mime.hasUrls() else []
+        if files:
+            self.set_file(files[0])
+        elif mime.hasText():
+            self.text_edit.appendPlainText(mime.text())
+        event.acceptProposedAction()
@@ -0,0 +1,124 @@
+"""
+Downloads dialog for the Video Downloader application.
+Lists scheduled downloads and lets the user pause, resume and reprioritize them.
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QPushButton, QComboBox
+)
+from PyQt5.QtCore import Qt
+
+from scheduler import PRIORITY_NAMES, PRIORITY_HIGH
+
+STATE_LABELS = {
+    "running": "Running",
+    "waiting": "Waiting for higher priority",
+    "paused": "Paused",
+}
+
+
+class JobsDialog(QDialog):
+    """Non-modal dialog showing every download the scheduler knows about."""
+
+    def __init__(self, downloader, parent=None, theme_manager=None):
+        """
+        Initialize the downloads dialog.
+
+        Args:
+            downloader: Downloader (or EngineClient) whose jobs are shown and controlled
+            parent: Parent widget
+            theme_manager: The application's theme manager for styling
+        """
+        super().__init__(parent)
+        self.downloader = downloader
+        self._setup_ui()
+
+        if theme_manager:
+            self.setStyleSheet(theme_manager.get_dialog_style())
+
+        self.update_jobs(self.downloader.list_jobs())
+
+    def _setup_ui(self):
+        """Set up the user interface for this dialog."""
+        self.setWindowTitle("Downloads")
+        self.setMinimumWidth(480)
+        self.setMinimumHeight(260)
+
+        layout = QVBoxLayout(self)
+        hint = QLabel("Downloads started from the main window pause lower-priority ones until they finish.")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        self.job_list = QListWidget()
+        self.job_list.currentItemChanged.connect(self._update_buttons)
+        layout.addWidget(self.job_list)
+
+        button_layout = QHBoxLayout()
+        self.pause_button = QPushButton("Pause")
+        self.resume_button = QPushButton("Resume")
+        self.priority_combo = QComboBox()
+        for priority in sorted(PRIORITY_NAMES, reverse=True):
+            self.priority_combo.addItem(f"{PRIORITY_NAMES[priority]} priority", priority)
+        self.close_button = QPushButton("Close")
+
+        self.pause_button.clicked.connect(self._pause)
+        self.resume_button.clicked.connect(self._resume)
+        self.priority_combo.activated.connect(self._set_priority)
+        self.close_button.clicked.connect(self.close)
+
+        button_layout.addWidget(self.pause_button)
+        button_layout.addWidget(self.resume_button)
+        button_layout.addWidget(self.priority_combo)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+        self._update_buttons()
+
+    def update_jobs(self, jobs):
+        """Refresh the list from scheduler snapshots, keeping the selection."""
+        selected = self._selected_job()
+        selected_key = selected["key"] if selected else None
+        self.job_list.clear()
+        for job in jobs:
+            text = (f"{job['title']}  —  {STATE_LABELS.get(job['state'], job['state'])}"
+                    f"  ({PRIORITY_NAMES.get(job['priority'], job['priority'])})")
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, job)
+            self.job_list.addItem(item)
+            if job["key"] == selected_key:
+                self.job_list.setCurrentItem(item)
+        if not jobs:
+            item = QListWidgetItem("No downloads running")
+            item.setFlags(Qt.NoItemFlags)
+            self.job_list.addItem(item)
+        self._update_buttons()
+
+    def _selected_job(self):
+        item = self.job_list.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+    def _update_buttons(self, *_):
+        job = self._selected_job()
+        self.pause_button.setEnabled(bool(job) and job["state"] != "paused")
+        self.resume_button.setEnabled(bool(job) and job["state"] == "paused")
+        self.priority_combo.setEnabled(bool(job))
+        priority = job["priority"] if job else PRIORITY_HIGH
+        self.priority_combo.setCurrentIndex(max(0, self.priority_combo.findData(priority)))
+
+    def _pause(self):
+        job = self._selected_job()
+        if job:
+            self.downloader.pause_job(job["key"])
+
+    def _resume(self):
+        job = self._selected_job()
+        if job:
+            self.downloader.resume_job(job["key"])
+
+    def _set_priority(self, index):
+        job = self._selected_job()
+        if job:
+            self.downloader.set_job_priority(job["key"], self.priority_combo.itemData(index))
@@ -18,8 +18,9 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QLabel,
     QPushButton,
+    QInputDialog,
 )
-from PyQt5.QtCore import QTimer, Qt, pyqtSlot
+from PyQt5.QtCore import QTimer, Qt, QSize, pyqtSlot
 
 # Import components
 from .components.url_input import URLInputComponent
@@ -31,10 +32,13 @@ from .components.menu_bar import MenuBarComponent
 # Import dialogs
 from .dialogs.settings_dialog import FormatSelectionDialog
 from .dialogs.about_dialog import show_about_dialog
+from .dialogs.jobs_dialog import JobsDialog
+from .dialogs.import_dialog import ImportDialog, is_url_list_file
 
 # Import utilities
 from .utils.queue_handler import QueueHandler
 from .utils.ui_helpers import UIHelpers
+from .utils.thumbnail_loader import ThumbnailLoader
 
 # Import theme management
 from .themes.theme_manager import ThemeManager
@@ -43,19 +47,29 @@ from .themes.theme_manager import ThemeManager
 if getattr(sys, "frozen", False):
     # Running as compiled .exe
     from downloader import Downloader
-    from config import load_config, save_config
+    from config import load_config, save_config, save_bandwidth_limit_config
     from utils import check_network
+    from playlist import PLAYLIST_QUALITIES
+    from url_import import count_urls
+    from site_index import classify_url
+    from engine_client import EngineClient
 else:
     # Running directly as .py
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from downloader import Downloader
-    from config import load_config, save_config
+    from config import load_config, save_config, save_bandwidth_limit_config
     from utils import check_network
+    from playlist import PLAYLIST_QUALITIES
+    from url_import import count_urls
+    from site_index import classify_url
+    from engine_client import EngineClient
 
 # Add SETTINGS_FILE constant
 SETTINGS_FILE = os.path.join(
     os.path.expanduser("~"), ".adm_video_downloader_settings.json"
 )
+# Thumbnail of the fetched video, beside its title (16:9 at the title box's height)
+PREVIEW_SIZE = QSize(62, 35)
 
 
 class VideoDownloaderApp(QMainWindow):
@@ -80,10 +94,22 @@ class VideoDownloaderApp(QMainWindow):
         self.download_queue = queue.Queue()
         self.downloader = Downloader(self.download_queue)
         self.last_downloaded_file = None
+        self.jobs_dialog = None  # Created on first use
 
         # Initialize queue handler
         self.queue_handler = QueueHandler(self.download_queue)
 
+        # Downloads go to the download engine when one is running, so they outlive
+        # the window and share its scheduler; its events arrive on the same queue
+        self.engine = EngineClient.connect()
+        if self.engine is not None:
+            self.engine.forward_events(self.download_queue)
+
+        # Thumbnails are fetched over the media probe's connection pool
+        self.thumbnail_loader = ThumbnailLoader(self.downloader.media_probe.http, self)
+        self.thumbnail_loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.preview_thumbnail = None  # URL shown beside the title
+
         # Load settings first
         self.load_app_settings()
 
@@ -105,15 +131,23 @@ class VideoDownloaderApp(QMainWindow):
         self.queue_timer.timeout.connect(self.check_queue)
         self.queue_timer.start()
 
+        if self.engine is not None:
+            self.progress_section.set_status(
+                f"Connected to the download engine on port {self.engine.port}"
+            )
+
     def setup_ui(self):
         """Set up the user interface."""
         self.setWindowTitle("ADM Video Downloader v2.2.1")
-        self.setMinimumSize(600, 500)
-        self.setMaximumSize(600, 500)
+        self.setMinimumSize(600, 680)
+        self.setMaximumSize(600, 680)
 
         # Set application icon
         UIHelpers.setup_app_icon(self)
 
+        # URL list files and blocks of URLs can be dropped on the window
+        self.setAcceptDrops(True)
+
         # Create central widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -147,7 +181,12 @@ class VideoDownloaderApp(QMainWindow):
         self.video_title_entry.setPlaceholderText(
             "Video title will appear here automatically"
         )
+        self.thumbnail_preview = QLabel()
+        self.thumbnail_preview.setFixedSize(PREVIEW_SIZE)
+        self.thumbnail_preview.setAlignment(Qt.AlignCenter)
+        self.thumbnail_preview.setVisible(False)
         title_layout.addWidget(title_label)
+        title_layout.addWidget(self.thumbnail_preview)
         title_layout.addWidget(self.video_title_entry, 1)
         main_layout.addLayout(title_layout)
 
@@ -228,6 +267,7 @@ class VideoDownloaderApp(QMainWindow):
 
         # Progress Section Component
         self.progress_section = ProgressSectionComponent()
+        self.progress_section.job_table.set_thumbnail_loader(self.thumbnail_loader)
         main_layout.addWidget(self.progress_section)
 
         # Connect component signals
@@ -250,6 +290,9 @@ class VideoDownloaderApp(QMainWindow):
         # self.menu_bar.calibrate_triggered.connect(self.start_calibration)
         self.menu_bar.theme_toggle_triggered.connect(self.toggle_theme)
         self.menu_bar.default_format_triggered.connect(self.select_default_format)
+        self.menu_bar.bandwidth_limit_triggered.connect(self.set_bandwidth_limit)
+        self.menu_bar.jobs_triggered.connect(self.show_jobs_dialog)
+        self.menu_bar.import_urls_triggered.connect(self.show_import_dialog)
         self.menu_bar.auto_fetch_toggled.connect(self.toggle_auto_fetch)
         self.menu_bar.remember_directory_toggled.connect(self.toggle_remember_directory)
         self.menu_bar.view_logs_triggered.connect(UIHelpers.open_log_file)
@@ -259,15 +302,18 @@ class VideoDownloaderApp(QMainWindow):
         # URL input signals
         self.url_input.url_changed.connect(self.on_url_changed)
         self.url_input.url_pasted.connect(self.on_url_pasted)
+        self.url_input.urls_pasted.connect(self.show_import_dialog)
 
         # Format selector signals
         self.format_selector.fetch_clicked.connect(self.fetch_formats)
         self.format_selector.format_selected.connect(self.on_format_selected)
+        self.format_selector.playlist_toggled.connect(self.on_playlist_toggled)
 
     def setup_queue_handlers(self):
         """Connect signals from the queue handler to UI slots."""
         self.queue_handler.formats_signal.connect(self.handle_formats)
         self.queue_handler.video_title_signal.connect(self.handle_video_title)
+        self.queue_handler.thumbnail_signal.connect(self.handle_thumbnail)
         self.queue_handler.error_signal.connect(self.handle_error)
         self.queue_handler.enable_fetch_signal.connect(self.handle_enable_fetch)
         self.queue_handler.progress_signal.connect(self.handle_progress)
@@ -277,6 +323,12 @@ class VideoDownloaderApp(QMainWindow):
         self.queue_handler.merge_failed_signal.connect(self.handle_merge_failed)
         self.queue_handler.download_error_signal.connect(self.handle_download_error)
         self.queue_handler.status_signal.connect(self.handle_status)
+        self.queue_handler.playlist_progress_signal.connect(self.handle_playlist_progress)
+        self.queue_handler.playlist_complete_signal.connect(
+            self.handle_playlist_complete
+        )
+        self.queue_handler.jobs_changed_signal.connect(self.handle_jobs_changed)
+        self.queue_handler.job_updates_signal.connect(self.progress_section.update_jobs)
 
     def register_theme_components(self):
         """Register components with the theme manager."""
@@ -340,6 +392,27 @@ class VideoDownloaderApp(QMainWindow):
         # Re-enable fetch button using correct state
         self.format_selector.set_fetching_state(False)
 
+    def handle_thumbnail(self, url):
+        """Show the fetched video's thumbnail beside its title."""
+        self.preview_thumbnail = url
+        self.on_thumbnail_ready(url)
+
+    @pyqtSlot(str)
+    def on_thumbnail_ready(self, url):
+        """Put the preview thumbnail in place once the loader has it."""
+        if url != self.preview_thumbnail:
+            return
+        pixmap = self.thumbnail_loader.pixmap(url, PREVIEW_SIZE)
+        if pixmap is not None:
+            self.thumbnail_preview.setPixmap(pixmap)
+            self.thumbnail_preview.setVisible(True)
+
+    def clear_preview(self):
+        """Hide the preview thumbnail, e.g. when another URL is entered."""
+        self.preview_thumbnail = None
+        self.thumbnail_preview.clear()
+        self.thumbnail_preview.setVisible(False)
+
     def handle_video_title(self, data):
         """Handle video title message from queue."""
         # The data is already the title string, not a list
@@ -403,45 +476,78 @@ class VideoDownloaderApp(QMainWindow):
         self.progress_section.set_progress(0)
         self.progress_section.set_status(f"Error: {error_msg}")
 
-        # Re-enable buttons and title field
-        self.format_selector.enable_fetch(True)
+        # Re-enable buttons and title field (both stay off in playlist mode)
+        single_video = not self.format_selector.is_playlist_mode()
+        self.format_selector.enable_fetch(single_video)
         self.download_button.setEnabled(True)
-        self.video_title_entry.setEnabled(True)
+        self.video_title_entry.setEnabled(single_video)
 
     def handle_status(self, data):
         """Handle status update messages, including PhantomJS updates."""
         # Update status in the progress section
         self.progress_section.set_status_message(data)
 
+    def handle_playlist_progress(self, data):
+        """Handle aggregated playlist progress from the queue."""
+        self.progress_section.set_progress(int(data["percent"]))
+        total = data["total"] if not data["enumerating"] else f"{data['total']}+"
+        status = f"{data.get('name', 'Playlist')}: {data['done'] + data['skipped']}/{total} done"
+        if data["failed"]:
+            status += f", {data['failed']} failed"
+        if data["active"]:
+            status += f", {data['active']} active at {data['speed']} MB/s"
+        if data["paused"]:
+            status += f", {data['paused']} paused"
+        self.progress_section.set_status(status)
+
+    def handle_playlist_complete(self, data):
+        """Handle the end of a playlist download."""
+        self.progress_section.set_progress(100)
+        status = f"{data.get('name', 'Playlist')} completed: {data['done']} downloaded"
+        if data["skipped"]:
+            status += f", {data['skipped']} already present"
+        if data.get("duplicates"):
+            status += f", {data['duplicates']} duplicates"
+        if data["failed"]:
+            status += f", {data['failed']} failed"
+        self.progress_section.set_status(status)
+        self.last_downloaded_file = data["folder"]
+
+        # Re-enable the download button; fetching stays off in playlist mode
+        self.download_button.setEnabled(True)
+
+        if data["failures"]:
+            lines = [f"#{index} {title}: {error}" for index, title, error in data["failures"][:10]]
+            if len(data["failures"]) > 10:
+                lines.append(f"...and {len(data['failures']) - 10} more (see the log)")
+            UIHelpers.show_warning(self, "Some entries failed", "\n".join(lines))
+
     # Slot methods for UI events
     @pyqtSlot(str)
     def on_url_changed(self, url):
         """Handle URL text changes."""
         self.url_input.url_entry.setText(url)
         self.url_input.url_entry.setCursorPosition(0)  # Move cursor to the start
+        # Playlist mode keeps its quality list regardless of the URL
+        if self.format_selector.is_playlist_mode():
+            return
         # Clear format selection when URL changes
         self.format_selector.clear_formats()
         self.download_button.setEnabled(False)
+        self.clear_preview()
 
-        # Auto-fetch if enabled and URL seems valid
-        if (
-            self.app_settings["auto_fetch"]
-            and url
-            and any(
-                domain in url
-                for domain in [
-                    "youtube.com/watch",
-                    "youtu.be/",
-                    "vimeo.com/",
-                    "dailymotion.com/",
-                ]
-            )
-        ):
-            self.fetch_formats()
+        # Auto-fetch if enabled and the URL points at a video on a supported site
+        # (an id in the URL, so a half-typed link or a site's front page doesn't fetch)
+        if self.app_settings["auto_fetch"] and url:
+            site = classify_url(url)
+            if site.supported and site.id:
+                self.fetch_formats()
 
     @pyqtSlot(str)
     def on_url_pasted(self, url):
         """Handle URL pasted event."""
+        if self.format_selector.is_playlist_mode():
+            return
         # Clear format selection when URL changes
         self.format_selector.clear_formats()
         self.download_button.setEnabled(False)
@@ -450,6 +556,21 @@ class VideoDownloaderApp(QMainWindow):
         if self.app_settings["auto_fetch"]:
             self.fetch_formats()
 
+    @pyqtSlot(bool)
+    def on_playlist_toggled(self, checked):
+        """Switch between single-video and whole-playlist mode."""
+        self.format_selector.clear_formats()
+        self.format_selector.enable_fetch(not checked)
+        self.video_title_entry.setEnabled(not checked)
+        if checked:
+            # Entries are not fetched up front, so offer a quality cap instead of formats
+            self.format_selector.set_formats(PLAYLIST_QUALITIES)
+            self.download_button.setEnabled(True)
+            self.progress_section.set_status("Playlist mode: choose a maximum quality.")
+        else:
+            self.download_button.setEnabled(False)
+            self.progress_section.set_status("")
+
     @pyqtSlot(str)
     def on_format_selected(self, format_str):
         """Handle format selection changes."""
@@ -488,16 +609,14 @@ class VideoDownloaderApp(QMainWindow):
             UIHelpers.show_warning(self, "Error", "Please enter a video URL")
             return
 
-        # Validate URL
-        if not any(
-            domain in url
-            for domain in ["youtube.com", "youtu.be", "vimeo.com", "dailymotion.com"]
-        ):
-            if not UIHelpers.show_question(
-                self,
-                "URL Validation",
-                "The URL doesn't appear to be from a known video site. Continue anyway?",
-            ):
+        # Validate URL against the sites yt-dlp supports
+        site = classify_url(url)
+        if not site.supported:
+            if site.extractor:
+                message = "yt-dlp's support for this site is currently broken. Continue anyway?"
+            else:
+                message = "The URL doesn't appear to be from a supported video site. Continue anyway?"
+            if not UIHelpers.show_question(self, "URL Validation", message):
                 return
 
         # Check network
@@ -511,6 +630,7 @@ class VideoDownloaderApp(QMainWindow):
 
         # Clear previous formats
         self.format_selector.clear_formats()
+        self.clear_preview()
         self.download_button.setEnabled(False)
 
         # Set status and disable fetch button (using fetching state)
@@ -536,23 +656,20 @@ class VideoDownloaderApp(QMainWindow):
             UIHelpers.show_warning(self, "Error", "Please select a format")
             return
 
-        folder = self.folder_entry.text().strip()
+        folder = self.get_download_folder()
         if not folder:
-            UIHelpers.show_warning(self, "Error", "Please select a download folder")
             return
 
-        # Check if folder exists or can be created
-        if not os.path.exists(folder):
-            try:
-                os.makedirs(folder, exist_ok=True)
-            except Exception as e:
-                UIHelpers.show_warning(
-                    self, "Error", f"Could not create folder: {str(e)}"
-                )
-                return
+        if self.format_selector.is_playlist_mode():
+            self.start_playlist_download(url, format_str, folder)
+            return
 
-        # Save the selected folder
-        save_config(folder)
+        if self.downloader.is_archived(url) and not UIHelpers.show_question(
+            self,
+            "Already Downloaded",
+            "This video is in the download archive. Download it again?",
+        ):
+            return
 
         # Get selected type and title
         type_choice = str(self.download_options.get_selected_option())
@@ -571,7 +688,7 @@ class VideoDownloaderApp(QMainWindow):
 
         # Start the download
         success, error_msg = self.downloader.start_download(
-            url, type_choice, format_str, folder, user_title
+            url, type_choice, format_str, folder, user_title, engine=self.engine
         )
         if not success:
             UIHelpers.show_warning(self, "Error", error_msg)
@@ -585,6 +702,119 @@ class VideoDownloaderApp(QMainWindow):
             self.progress_section.set_status(f"Error: {error_msg}")
             self.progress_section.set_progress(0)
 
+    def get_download_folder(self):
+        """
+        The download folder, created and saved if needed.
+
+        Returns:
+            str: Folder, or None after warning the user that it can't be used
+        """
+        folder = self.folder_entry.text().strip()
+        if not folder:
+            UIHelpers.show_warning(self, "Error", "Please select a download folder")
+            return None
+
+        # Check if folder exists or can be created
+        if not os.path.exists(folder):
+            try:
+                os.makedirs(folder, exist_ok=True)
+            except Exception as e:
+                UIHelpers.show_warning(
+                    self, "Error", f"Could not create folder: {str(e)}"
+                )
+                return None
+
+        # Save the selected folder
+        save_config(folder)
+        return folder
+
+    @pyqtSlot()
+    @pyqtSlot(str)
+    def show_import_dialog(self, text="", path=None):
+        """Ask for a list of URLs and download them all."""
+        try:
+            dialog = ImportDialog(
+                self, theme_manager=self.theme_manager, text=text, path=path
+            )
+            if not dialog.exec_():
+                return
+            folder = self.get_download_folder()
+            if not folder:
+                return
+            text, path = dialog.get_source()
+            if not path and not count_urls(text):
+                UIHelpers.show_warning(self, "Error", "No URLs found")
+                return
+            self.start_url_import(text, path, dialog.get_quality(), folder)
+        except Exception as e:
+            print(f"Error showing import dialog: {str(e)}")
+            UIHelpers.show_warning(self, "Error", f"Could not import URLs: {str(e)}")
+
+    def start_url_import(self, text, path, quality, folder):
+        """Start downloading every URL in a pasted list or a file."""
+        type_choice = str(self.download_options.get_selected_option())
+        self.progress_section.set_status("Reading URL list...")
+        self.progress_section.set_progress(0)
+        self.download_button.setEnabled(False)
+
+        success, error_msg = (self.engine or self.downloader).start_url_list_download(
+            type_choice, quality, folder, text=text, path=path
+        )
+        if not success:
+            UIHelpers.show_warning(self, "Error", error_msg)
+            self.download_button.setEnabled(True)
+            self.progress_section.set_status(f"Error: {error_msg}")
+
+    def dragEnterEvent(self, event):
+        """Accept dropped URL list files and text."""
+        mime = event.mimeData()
+        if mime.hasUrls() or mime.hasText():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        """Open the import dialog for a dropped URL list, or use a single dropped URL."""
+        mime = event.mimeData()
+        files = [url.toLocalFile() for url in mime.urls() if url.isLocalFile()] if mime.hasUrls() else []
+        text = mime.text() if mime.hasText() else ""
+        event.acceptProposedAction()
+        self.open_urls_and_files(text, files)
+
+    @pyqtSlot(list)
+    def open_arguments(self, arguments):
+        """Bring the window up and open the URLs and files a launch was given."""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        files = [argument for argument in arguments if os.path.isfile(argument)]
+        urls = [argument for argument in arguments if argument not in files]
+        self.open_urls_and_files("\n".join(urls), files)
+
+    def open_urls_and_files(self, text, files):
+        """Open the import dialog for a URL list file or several URLs, or use a single URL."""
+        lists = [path for path in files if is_url_list_file(path)]
+        if lists:
+            self.show_import_dialog(path=lists[0])
+        elif not files and count_urls(text) > 1:
+            self.show_import_dialog(text)
+        elif not files and count_urls(text) == 1:
+            self.url_input.url_entry.setText(text.strip())
+
+    def start_playlist_download(self, url, quality, folder):
+        """Start downloading a whole playlist or channel."""
+        type_choice = str(self.download_options.get_selected_option())
+        self.progress_section.set_status("Listing playlist entries...")
+        self.progress_section.set_progress(0)
+        self.download_button.setEnabled(False)
+
+        success, error_msg = (self.engine or self.downloader).start_playlist_download(
+            url, type_choice, quality, folder
+        )
+        if not success:
+            UIHelpers.show_warning(self, "Error", error_msg)
+            self.download_button.setEnabled(True)
+            self.progress_section.set_status(f"Error: {error_msg}")
+
     @pyqtSlot()
     def select_default_format(self):
         """Open dialog to select default download format."""
@@ -609,6 +839,69 @@ class VideoDownloaderApp(QMainWindow):
                 self, "Error", f"Could not open format selection: {str(e)}"
             )
 
+    @pyqtSlot()
+    def show_jobs_dialog(self):
+        """Open (or raise) the non-modal downloads dialog."""
+        try:
+            if self.jobs_dialog is None:
+                # The engine runs the downloads when connected
+                self.jobs_dialog = JobsDialog(
+                    self.engine or self.downloader, self, theme_manager=self.theme_manager
+                )
+            self.jobs_dialog.update_jobs((self.engine or self.downloader).list_jobs())
+            self.jobs_dialog.show()
+            self.jobs_dialog.raise_()
+        except Exception as e:
+            print(f"Error showing downloads dialog: {str(e)}")
+            UIHelpers.show_warning(
+                self, "Error", f"Could not open downloads: {str(e)}"
+            )
+
+    def handle_jobs_changed(self, jobs):
+        """Refresh the downloads dialog when a job starts, pauses, resumes or ends."""
+        if self.jobs_dialog is not None and self.jobs_dialog.isVisible():
+            self.jobs_dialog.update_jobs(jobs)
+        current = self.downloader.download_job
+        for job in jobs:
+            if current is not None and job["key"] == current.key and job["state"] != "running":
+                self.progress_section.set_status(
+                    "Download paused" if job["state"] == "paused" else "Waiting for a higher-priority download..."
+                )
+
+    @pyqtSlot()
+    def set_bandwidth_limit(self):
+        """Ask for the total download limit shared by all running downloads."""
+        try:
+            governor = self.downloader.governor
+            if self.engine is not None:
+                current = self.engine.bandwidth_limit()
+            else:
+                current = governor.limit / 1048576 if governor.limit else 0.0
+            limit, ok = QInputDialog.getDouble(
+                self,
+                "Bandwidth Limit",
+                "Total download limit in MB/s (0 = unlimited):",
+                current,
+                0.0,
+                10000.0,
+                1,
+            )
+            if ok:
+                if self.engine is not None:
+                    # The engine's downloads share its limit; it saves the setting
+                    self.engine.set_bandwidth_limit(limit)
+                else:
+                    save_bandwidth_limit_config(limit)
+                governor.set_limit(limit)
+                self.progress_section.set_status(
+                    f"Bandwidth limit: {limit} MB/s" if limit else "Bandwidth limit removed"
+                )
+        except Exception as e:
+            print(f"Error setting bandwidth limit: {str(e)}")
+            UIHelpers.show_warning(
+                self, "Settings Error", f"Could not change bandwidth limit: {str(e)}"
+            )
+
     @pyqtSlot()
     def toggle_theme(self):
         """Toggle between light and dark themes."""
@@ -663,6 +956,9 @@ class VideoDownloaderApp(QMainWindow):
         # Clean up any resources
         try:
             self.downloader.cleanup()
+            self.thumbnail_loader.stop()
+            if self.engine is not None:
+                self.engine.stop()
             for thread in threading.enumerate():
                 if thread != threading.current_thread() and not thread.daemon:
                     thread.join(0.1)
@@ -87,6 +87,24 @@ class DarkTheme:
                 max-height: 1px;
                 margin: 5px 0;
             }
+            QTableView {
+                font-size: 9pt;
+                background-color: #2a2a2a;
+                alternate-background-color: #303030;
+                color: #ffffff;
+                border: 1px solid #555555;
+                border-radius: 4px;
+                selection-background-color: #0078d7;
+                selection-color: #ffffff;
+            }
+            QHeaderView::section {
+                font-size: 9pt;
+                background-color: #3a3a3a;
+                color: #ffffff;
+                border: none;
+                border-right: 1px solid #555555;
+                padding: 3px;
+            }
         """
     
     @staticmethod
@@ -186,6 +204,17 @@ class DarkTheme:
             QPushButton:hover {
                 background-color: #4f4f4f;
             }
+            QPlainTextEdit, QComboBox {
+                background-color: #2a2a2a;
+                color: #ffffff;
+                border: 1px solid #555555;
+                border-radius: 4px;
+                padding: 4px;
+                font-size: 10pt;
+            }
+            QPlainTextEdit:disabled {
+                color: #555555;
+            }
             QListWidget {
                 background-color: #2a2a2a;
                 color: #ffffff;
@@ -90,6 +90,24 @@ class LightTheme:
                 max-height: 1px;
                 margin: 5px 0;
             }
+            QTableView {
+                font-size: 9pt;
+                background-color: #ffffff;
+                alternate-background-color: #f5f5f5;
+                color: #333333;
+                border: 1px solid #cccccc;
+                border-radius: 4px;
+                selection-background-color: #0078d7;
+                selection-color: #ffffff;
+            }
+            QHeaderView::section {
+                font-size: 9pt;
+                background-color: #e8e8e8;
+                color: #333333;
+                border: none;
+                border-right: 1px solid #cccccc;
+                padding: 3px;
+            }
         """
     
     @staticmethod
@@ -191,6 +209,17 @@ class LightTheme:
             QPushButton:hover {
                 background-color: #d0d0d0;
             }
+            QPlainTextEdit, QComboBox {
+                background-color: #ffffff;
+                color: #333333;
+                border: 1px solid #cccccc;
+                border-radius: 4px;
+                padding: 4px;
+                font-size: 10pt;
+            }
+            QPlainTextEdit:disabled {
+                color: #cccccc;
+            }
             QListWidget {
                 background-color: #ffffff;
                 color: #333333;
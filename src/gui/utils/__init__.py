@@ -1,12 +1,14 @@
 """
 Utility functions and classes for the GUI components.
-Includes queue handling and other helpers.
+Includes queue handling, thumbnail loading and other helpers.
 """
 
 from .queue_handler import QueueHandler
 from .ui_helpers import UIHelpers
+from .thumbnail_loader import ThumbnailLoader
 
 __all__ = [
     'QueueHandler',
-    'UIHelpers'
+    'UIHelpers',
+    'ThumbnailLoader'
 ] 
\ No newline at end of file
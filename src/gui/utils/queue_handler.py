@@ -15,6 +15,7 @@ class QueueHandler(QObject):
     # Define signals for different message types
     formats_signal = pyqtSignal(object)
     video_title_signal = pyqtSignal(str)
+    thumbnail_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
     enable_fetch_signal = pyqtSignal(object)
     progress_signal = pyqtSignal(object)
@@ -22,6 +23,10 @@ class QueueHandler(QObject):
     merge_failed_signal = pyqtSignal(str)
     download_error_signal = pyqtSignal(str)
     status_signal = pyqtSignal(str)
+    playlist_progress_signal = pyqtSignal(object)
+    playlist_complete_signal = pyqtSignal(object)
+    jobs_changed_signal = pyqtSignal(object)
+    job_updates_signal = pyqtSignal(object)
     
     def __init__(self, download_queue):
         """
@@ -50,6 +55,8 @@ class QueueHandler(QObject):
                     self.formats_signal.emit(formats_data)
                 elif message_type == "video_title":
                     self.video_title_signal.emit(message_data)
+                elif message_type == "thumbnail":
+                    self.thumbnail_signal.emit(message_data)
                 elif message_type == "error":
                     self.error_signal.emit(message_data)
                 elif message_type == "enable_fetch":
@@ -72,6 +79,14 @@ class QueueHandler(QObject):
                          self.status_signal.emit("Merging formats...")
                     else:
                          self.status_signal.emit(message_data)
+                elif message_type == "playlist_progress":
+                    self.playlist_progress_signal.emit(message_data)
+                elif message_type == "playlist_complete":
+                    self.playlist_complete_signal.emit(message_data)
+                elif message_type == "jobs_changed":
+                    self.jobs_changed_signal.emit(message_data)
+                elif message_type == "job_updates":
+                    self.job_updates_signal.emit(message_data)
                 elif message_type == "progress_unknown":
                     downloaded_mb = message_data
                     progress_data = [0, f"{downloaded_mb}", ""] 
@@ -0,0 +1,176 @@
+"""
+Thumbnail loader for the Video Downloader application.
+Fetches, resizes and caches thumbnails off the GUI thread.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageWriter, QPixmap
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from thumbnails import THUMBNAIL_CACHE_DIR, CACHE_SIZE, cache_path, prune_cache
+else:
+    # Running directly as .py
+    from thumbnails import THUMBNAIL_CACHE_DIR, CACHE_SIZE, cache_path, prune_cache
+
+# Decoded pixmaps kept in memory, counted as width * height * 4 bytes
+MEMORY_BUDGET = 32 * 1024 * 1024
+# Requests not yet started beyond this many are dropped, oldest first;
+# rows scrolled back into view ask again
+MAX_PENDING = 64
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+
+
+def _cache_format():
+    """WebP where Qt can write it (smaller files), else JPEG."""
+    return ('webp', 'WEBP') if b'webp' in QImageWriter.supportedImageFormats() else ('jpg', 'JPEG')
+
+
+class ThumbnailLoader(QObject):
+    """
+    Loads thumbnails on demand for the views that show them.
+
+    pixmap() answers from a memory-bounded LRU of decoded QPixmaps, or
+    queues the thumbnail and returns None; thumbnail_ready is emitted once
+    it is available. Callers ask only when they paint, so only visible
+    rows are ever fetched or decoded. Worker threads take the newest
+    requests first (what is on screen now), download them over the shared
+    connection pool, scale them down to CACHE_SIZE and keep them on disk,
+    so later runs don't download them again. QImage work happens on the
+    workers; only the QPixmap conversion runs on the GUI thread.
+    """
+
+    thumbnail_ready = pyqtSignal(str)
+    _loaded = pyqtSignal(object, object)  # (url, width, height), QImage or None
+
+    def __init__(self, http, parent=None, workers=4, memory_budget=MEMORY_BUDGET, cache_dir=THUMBNAIL_CACHE_DIR):
+        """
+        Initialize the thumbnail loader.
+
+        Args:
+            http: urllib3.PoolManager to download with
+            parent: Parent QObject
+            workers (int): Concurrent downloads
+            memory_budget (int): Bytes of decoded pixmaps to keep
+            cache_dir (str): Folder for resized thumbnails
+        """
+        super().__init__(parent)
+        self.http = http
+        self.workers = workers
+        self.memory_budget = memory_budget
+        self.cache_dir = cache_dir
+        self.extension, self.image_format = _cache_format()
+        self._pixmaps = OrderedDict()  # (url, width, height) -> QPixmap, least recently used first
+        self._memory = 0
+        self._pending = OrderedDict()  # (url, width, height) -> None, newest last
+        self._active = set()
+        self._failed = set()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self._loaded.connect(self._on_loaded)
+
+    def pixmap(self, url, size):
+        """
+        Thumbnail scaled to fit size, if it is loaded.
+
+        Args:
+            url (str): Thumbnail URL
+            size (QSize): Box to fit the thumbnail in
+
+        Returns:
+            QPixmap: The thumbnail, or None while it loads (or if it can't be)
+        """
+        key = (url, size.width(), size.height())
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        self._request(key)
+        return None
+
+    def _request(self, key):
+        with self._condition:
+            if self._stopped or key in self._active or key in self._failed:
+                return
+            self._pending[key] = None
+            self._pending.move_to_end(key)
+            while len(self._pending) > MAX_PENDING:
+                self._pending.popitem(last=False)
+            if not self._threads:
+                self._start_workers()
+            self._condition.notify()
+
+    def _start_workers(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        threading.Thread(target=prune_cache, args=(self.cache_dir,), daemon=True).start()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                key, _ = self._pending.popitem(last=True)
+                self._active.add(key)
+            try:
+                image = self._load(*key)
+            except Exception as e:
+                print(f"Error loading thumbnail {key[0]}: {str(e)}")
+                image = None
+            self._loaded.emit(key, image)
+
+    def _load(self, url, width, height):
+        """Scaled QImage of a thumbnail from the disk cache or the network (worker thread)."""
+        path = cache_path(url, self.extension, self.cache_dir)
+        image = QImage(path) if os.path.exists(path) else QImage()
+        if not image.isNull():
+            os.utime(path)  # Keeps it off the pruning list
+        else:
+            response = self.http.request('GET', url, preload_content=False, redirect=True)
+            try:
+                if response.status != 200:
+                    return None
+                data = response.read(MAX_DOWNLOAD_BYTES + 1)
+            finally:
+                response.release_conn()
+            if len(data) > MAX_DOWNLOAD_BYTES or not image.loadFromData(data):
+                return None
+            if image.width() > CACHE_SIZE[0] or image.height() > CACHE_SIZE[1]:
+                image = image.scaled(*CACHE_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            part_path = path + '.part'
+            if image.save(part_path, self.image_format, 85):
+                os.replace(part_path, path)
+        return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def _on_loaded(self, key, image):
+        with self._condition:
+            self._active.discard(key)
+            if image is None or image.isNull():
+                self._failed.add(key)
+                return
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[key] = pixmap
+        self._memory += pixmap.width() * pixmap.height() * 4
+        while self._memory > self.memory_budget and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self._memory -= evicted.width() * evicted.height() * 4
+        self.thumbnail_ready.emit(key[0])
+
+    def stop(self):
+        """Drop queued requests and end the worker threads."""
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
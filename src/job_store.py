@@ -0,0 +1,392 @@
+import os
+import sys
+import hmac
+import abc
+import json
+import time
+import sqlite3
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import urllib3
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from url_import import url_key
+else:
+    # Running directly as .py
+    from utils import logger
+    from url_import import url_key
+
+# A claimed job goes back to the queue unless its worker renews the lease within this time
+LEASE_SECONDS = 120
+# Claims (including lease expiries) after which a job is given up as failed
+MAX_ATTEMPTS = 3
+# States of a job in the store
+JOB_STATES = ('queued', 'leased', 'done', 'failed')
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+def _job_key(url):
+    """Deduplication key of a job's URL, as a string."""
+    key = url_key(url)
+    return f"{key[0]} {key[1]}"
+
+
+class JobStore(abc.ABC):
+    """
+    Queue of download jobs shared by workers, possibly on several machines.
+
+    Jobs are URLs in a named queue. A worker claims jobs and holds a lease
+    on each; it renews the leases with heartbeat() while it works and
+    hands each job back with complete(). A job whose lease runs out (its
+    worker died or lost its connection) can be claimed by another worker.
+    Every claim counts as an attempt: the attempt number doubles as the
+    lease token, so a worker that lost a lease can no longer renew or
+    complete the job.
+
+    Backends implement the abstract methods below; open_job_store() picks
+    one by location.
+    """
+
+    @abc.abstractmethod
+    def add(self, urls, queue='default'):
+        """
+        Queue URLs, skipping ones already in the queue (in any URL form).
+
+        Returns:
+            int: Number of jobs added
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def claim(self, worker, limit=1, queue='default', lease_seconds=LEASE_SECONDS):
+        """
+        Lease up to limit queued jobs (or jobs whose lease expired), oldest first.
+
+        Returns:
+            list: Dicts with id, url and attempt
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def heartbeat(self, worker, leases, lease_seconds=LEASE_SECONDS):
+        """
+        Renew leases.
+
+        Args:
+            worker (str): Worker id
+            leases (list): (job id, attempt) pairs the worker holds
+
+        Returns:
+            list: Ids of the jobs whose lease the worker no longer holds
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def complete(self, worker, job_id, attempt, state, error=None, path=None):
+        """
+        Record the outcome of a leased job.
+
+        'done' and 'skipped' finish it; 'failed' puts it back in the queue
+        until it has used MAX_ATTEMPTS; 'cancelled' puts it back without
+        counting the attempt.
+
+        Returns:
+            bool: False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stats(self, queue='default'):
+        """
+        Job counts by state and the workers seen.
+
+        Returns:
+            dict: queue, counts (state -> number) and workers (id -> seconds since last seen)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a SQLite database, for workers on one machine.
+
+    Claims run in an immediate transaction, so several worker processes
+    can share the file without handing out the same job twice. Don't put
+    the file on a network share; serve it with JobStoreServer instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            queue TEXT NOT NULL,
+            key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',
+            worker TEXT,
+            lease_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            path TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL,
+            UNIQUE (queue, key))''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (queue, state, id)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, last_seen REAL NOT NULL)')
+
+    def add(self, urls, queue='default'):
+        now = time.time()
+        # Deduplicated by key, but downloaded from the URL as given (signed queries must stay intact)
+        rows = [(queue, _job_key(url), url, now, now) for url in urls]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany('INSERT OR IGNORE INTO jobs (queue, key, url, created, updated) '
+                                     'VALUES (?, ?, ?, ?, ?)', rows)
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            added = self._db.total_changes - before
+        logger.info(f"Job store: added {added} of {len(rows)} URLs to queue {queue}")
+        return added
+
+    def claim(self, worker, limit=1, queue='default', lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                # Leases that ran out on their last attempt are given up rather than handed out again
+                self._db.execute("UPDATE jobs SET state = 'failed', worker = NULL, updated = ?, "
+                                 "error = 'Lease expired on the last attempt' "
+                                 "WHERE queue = ? AND state = 'leased' AND lease_until < ? AND attempts >= ?",
+                                 (now, queue, now, MAX_ATTEMPTS))
+                rows = self._db.execute(
+                    "SELECT id, url, attempts FROM jobs WHERE queue = ? "
+                    "AND (state = 'queued' OR (state = 'leased' AND lease_until < ?)) ORDER BY id LIMIT ?",
+                    (queue, now, limit)).fetchall()
+                self._db.executemany("UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, "
+                                     "attempts = attempts + 1, updated = ? WHERE id = ?",
+                                     [(worker, now + lease_seconds, now, row[0]) for row in rows])
+                self._seen(worker, now)
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return [{'id': job_id, 'url': url, 'attempt': attempts + 1} for job_id, url, attempts in rows]
+
+    def heartbeat(self, worker, leases, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        lost = []
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                for job_id, attempt in leases:
+                    cursor = self._db.execute(
+                        "UPDATE jobs SET lease_until = ?, updated = ? "
+                        "WHERE id = ? AND worker = ? AND attempts = ? AND state = 'leased'",
+                        (now + lease_seconds, now, job_id, worker, attempt))
+                    if not cursor.rowcount:
+                        lost.append(job_id)
+                self._seen(worker, now)
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return lost
+
+    def complete(self, worker, job_id, attempt, state, error=None, path=None):
+        now = time.time()
+        if state in ('done', 'skipped'):
+            update, values = "state = 'done', error = ?, path = ?", (error, path)
+        elif state == 'cancelled':
+            update, values = "state = 'queued', attempts = attempts - 1", ()
+        else:
+            update = "state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, error = ?"
+            values = (MAX_ATTEMPTS, error)
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET {update}, worker = NULL, lease_until = NULL, updated = ? "
+                "WHERE id = ? AND worker = ? AND attempts = ? AND state = 'leased'",
+                values + (now, job_id, worker, attempt))
+        return cursor.rowcount > 0
+
+    def stats(self, queue='default'):
+        now = time.time()
+        with self._lock:
+            counts = dict(self._db.execute('SELECT state, COUNT(*) FROM jobs WHERE queue = ? GROUP BY state',
+                                           (queue,)).fetchall())
+            workers = self._db.execute('SELECT id, last_seen FROM workers ORDER BY id').fetchall()
+        return {
+            'queue': queue,
+            'counts': {state: counts.get(state, 0) for state in JOB_STATES},
+            'workers': {worker: round(now - last_seen, 1) for worker, last_seen in workers},
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _seen(self, worker, now):
+        self._db.execute('INSERT OR REPLACE INTO workers (id, last_seen) VALUES (?, ?)', (worker, now))
+
+
+class RemoteJobStore(JobStore):
+    """
+    Job store served by JobStoreServer on another machine.
+
+    The location is http://TOKEN@host:port, with the token printed by the
+    server.
+    """
+
+    def __init__(self, location):
+        parts = urlsplit(location)
+        self.base_url = f"{parts.scheme}://{parts.hostname}:{parts.port or 80}"
+        self.token = parts.username or ''
+        self.http = urllib3.PoolManager(maxsize=4, timeout=urllib3.Timeout(connect=5, read=30),
+                                        retries=urllib3.Retry(connect=3, read=0, backoff_factor=0.5))
+
+    def _call(self, method, **arguments):
+        try:
+            response = self.http.request('POST', f"{self.base_url}/{method}", body=json.dumps(arguments),
+                                         headers={'Authorization': f"Bearer {self.token}",
+                                                  'Content-Type': 'application/json'})
+        except urllib3.exceptions.HTTPError as e:
+            raise OSError(f"Job store {self.base_url} not reachable: {e}")
+        try:
+            data = json.loads(response.data)
+        except ValueError:
+            raise OSError(f"Unexpected answer from job store {self.base_url} (HTTP {response.status})")
+        if response.status != 200:
+            raise OSError(f"Job store {self.base_url}: {data.get('error') or response.status}")
+        return data['result']
+
+    def add(self, urls, queue='default'):
+        return self._call('add', urls=list(urls), queue=queue)
+
+    def claim(self, worker, limit=1, queue='default', lease_seconds=LEASE_SECONDS):
+        return self._call('claim', worker=worker, limit=limit, queue=queue, lease_seconds=lease_seconds)
+
+    def heartbeat(self, worker, leases, lease_seconds=LEASE_SECONDS):
+        return self._call('heartbeat', worker=worker, leases=[list(lease) for lease in leases],
+                          lease_seconds=lease_seconds)
+
+    def complete(self, worker, job_id, attempt, state, error=None, path=None):
+        return self._call('complete', worker=worker, job_id=job_id, attempt=attempt, state=state,
+                          error=error, path=path)
+
+    def stats(self, queue='default'):
+        return self._call('stats', queue=queue)
+
+    def close(self):
+        self.http.clear()
+
+
+class JobStoreRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON RPC over HTTP for RemoteJobStore: POST /<method> with the
+    method's arguments as an object answers {"result": ...}.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ADMVideoDownloaderJobStore'
+    methods = ('add', 'claim', 'heartbeat', 'complete', 'stats')
+
+    def log_message(self, format, *args):
+        logger.debug(f"Job store API: {self.address_string()} {format % args}")
+
+    def do_POST(self):
+        token = self.headers.get('Authorization', '')[len('Bearer '):]
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            self._send_json(401, {'error': 'Missing or wrong token'})
+            return
+        method = urlsplit(self.path).path.strip('/')
+        if method not in self.methods:
+            self._send_json(404, {'error': 'Not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            if length > MAX_BODY_BYTES:
+                raise ValueError("Request body too large")
+            arguments = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(arguments, dict):
+                raise ValueError("Request body must be a JSON object")
+            result = getattr(self.server.store, method)(**arguments)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Job store {method} failed: {str(e)}")
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'result': result})
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class JobStoreServer(ThreadingHTTPServer):
+    """
+    Serves a JobStore to workers on other machines.
+
+    Plain HTTP: the token is sent unencrypted. The server listens on
+    localhost unless another interface is given, such as 0.0.0.0 for a
+    trusted network.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, store, host='127.0.0.1', port=9615, token=None):
+        self.store = store
+        self.token = token or secrets.token_urlsafe(24)
+        super().__init__((host, port), JobStoreRequestHandler)
+
+
+# Location scheme -> factory taking the location; add backends with register_job_store_backend()
+JOB_STORE_BACKENDS = {
+    'sqlite': lambda location: SQLiteJobStore(location[len('sqlite://'):]),
+    'http': RemoteJobStore,
+}
+
+
+def register_job_store_backend(scheme, factory):
+    """Make open_job_store() open locations starting with scheme:// with factory(location)."""
+    JOB_STORE_BACKENDS[scheme] = factory
+
+
+def open_job_store(location):
+    """
+    Open the job store at a location.
+
+    Args:
+        location (str): A SQLite file path (or sqlite://PATH), http://TOKEN@host:port
+            for a served store, or a location of a registered backend
+
+    Returns:
+        JobStore: The store
+    """
+    scheme = location.split('://', 1)[0].lower() if '://' in location else 'sqlite'
+    factory = JOB_STORE_BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"No job store backend for {scheme}://")
+    return factory(location if '://' in location else 'sqlite://' + location)
@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QPalette, QColor
 from PyQt5.QtCore import Qt
@@ -7,7 +8,8 @@ from PyQt5.QtCore import Qt
 # Adjust import paths dynamically
 if getattr(sys, "frozen", False):
     # Running as compiled .exe
-    from gui import VideoDownloaderApp
+    from single_instance import send_to_running_instance, InstanceServer
+    from utils import logger
 else:
     # Running directly as .py
     # Add the parent directory to sys.path to make imports work
@@ -15,7 +17,8 @@ else:
     parent_dir = os.path.dirname(current_dir)
     if parent_dir not in sys.path:
         sys.path.append(parent_dir)
-    from gui import VideoDownloaderApp
+    from single_instance import send_to_running_instance, InstanceServer
+    from utils import logger
 
 
 def apply_dark_theme(app):
@@ -55,10 +58,42 @@ def apply_dark_theme(app):
     )
 
 
+def parse_args(argv):
+    """Parse the command line; arguments it doesn't know are left for Qt."""
+    parser = argparse.ArgumentParser(description="ADM Video Downloader")
+    parser.add_argument(
+        "--engine",
+        action="store_true",
+        help="run the download engine and its localhost API without a window",
+    )
+    parser.add_argument(
+        "--port", type=int, help="port for the engine's API (default from settings)"
+    )
+    parser.add_argument(
+        "--new-instance",
+        action="store_true",
+        help="start another window even if one is already running",
+    )
+    parser.add_argument("urls", nargs="*", help="URLs or URL list files to open")
+    return parser.parse_known_args(argv[1:])
+
+
 def main():
     """Main entry point for the application."""
+    args, qt_args = parse_args(sys.argv)
+    if args.engine:
+        from engine import run_engine
+
+        sys.exit(run_engine(args.port))
+
+    # A running window takes the URLs; this launch ends before loading the GUI
+    if not args.new_instance and send_to_running_instance(args.urls):
+        sys.exit(0)
+
+    from gui import VideoDownloaderApp
+
     # Create QApplication
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
 
     # Set application style to Fusion
     app.setStyle("Fusion")
@@ -70,6 +105,14 @@ def main():
     window = VideoDownloaderApp()
     window.show()
 
+    # Later launches hand their URLs to this window, unless another one already takes them
+    instance_server = InstanceServer(window)
+    if not args.new_instance and not instance_server.listen():
+        logger.info("Another window is receiving new launches; this one only opens its own URLs")
+    instance_server.arguments_received.connect(window.open_arguments)
+    if args.urls:
+        window.open_arguments(args.urls)
+
     # Start main loop
     sys.exit(app.exec_())
 
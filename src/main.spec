@@ -15,6 +15,7 @@ a = Analysis(
         (os.path.join(assets_path, 'icon.ico'), 'assets'),
         (os.path.join(assets_path, 'yt-dlp.exe'), 'assets'),
         (os.path.join(assets_path, 'yt-dlp_updater.exe'), 'assets'),
+        (os.path.join(assets_path, 'site_index.json'), 'assets'),
     ],
     hiddenimports=[
         'gui',
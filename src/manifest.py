@@ -0,0 +1,171 @@
+import re
+import sys
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+HLS_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+AUDIO_CODEC = re.compile(r'^(mp4a|ac-3|ec-3|opus|vorbis|flac|mp3|dtsc|alac)', re.IGNORECASE)
+
+
+def parse_attribute_list(text):
+    """Parse an HLS attribute list (KEY=value,KEY="quoted") into a dict."""
+    return {key: value.strip('"') for key, value in HLS_ATTRIBUTE.findall(text)}
+
+
+def split_codecs(codecs):
+    """Split a CODECS string into (vcodec, acodec); either may be None."""
+    vcodec = acodec = None
+    for codec in (c.strip() for c in (codecs or '').split(',') if c.strip()):
+        if AUDIO_CODEC.match(codec):
+            acodec = acodec or codec
+        else:
+            vcodec = vcodec or codec
+    return vcodec, acodec
+
+
+def _frame_rate(value):
+    """Frame rate from '30', '29.97' or '30000/1001'."""
+    try:
+        if '/' in value:
+            numerator, denominator = value.split('/', 1)
+            return round(int(numerator) / int(denominator), 3)
+        return float(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _record(protocol, kind, url, **fields):
+    record = {'protocol': protocol, 'kind': kind, 'url': url, 'id': None, 'width': None, 'height': None,
+              'fps': None, 'tbr': None, 'vcodec': None, 'acodec': None, 'audio_group': None,
+              'language': None, 'name': None}
+    record.update({key: value for key, value in fields.items() if value is not None})
+    return record
+
+
+def parse_hls(text, base_url):
+    """
+    Expand an HLS master playlist into format records.
+
+    Args:
+        text (str): Playlist body
+        base_url (str): URL the playlist was fetched from
+
+    Returns:
+        list: Records for each variant stream and each audio rendition
+        that has its own URI; empty for media (non-master) playlists
+    """
+    records = []
+    pending = None
+    for line in (l.strip() for l in text.splitlines()):
+        if line.startswith('#EXT-X-MEDIA:'):
+            attrs = parse_attribute_list(line[len('#EXT-X-MEDIA:'):])
+            # Renditions without a URI are muxed into the variant streams
+            if attrs.get('TYPE') == 'AUDIO' and attrs.get('URI'):
+                records.append(_record('hls', 'audio', urljoin(base_url, attrs['URI']),
+                                       audio_group=attrs.get('GROUP-ID'), language=attrs.get('LANGUAGE'),
+                                       name=attrs.get('NAME')))
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = parse_attribute_list(line[len('#EXT-X-STREAM-INF:'):])
+        elif pending is not None and line and not line.startswith('#'):
+            vcodec, acodec = split_codecs(pending.get('CODECS'))
+            width = height = None
+            resolution = re.match(r'(\d+)x(\d+)', pending.get('RESOLUTION', ''))
+            if resolution:
+                width, height = int(resolution.group(1)), int(resolution.group(2))
+            # yt-dlp prefers the average bandwidth for tbr; mirror it so format filters match
+            bandwidth = pending.get('AVERAGE-BANDWIDTH') or pending.get('BANDWIDTH')
+            kind = 'audio' if acodec and not vcodec and not height else 'video'
+            records.append(_record('hls', kind, urljoin(base_url, line),
+                                   width=width, height=height, fps=_frame_rate(pending.get('FRAME-RATE')),
+                                   tbr=int(bandwidth) / 1000 if bandwidth and bandwidth.isdigit() else None,
+                                   vcodec=vcodec, acodec=acodec, audio_group=pending.get('AUDIO')))
+            pending = None
+    return records
+
+
+def _local(tag):
+    """Element tag without its XML namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_dash(text, base_url):
+    """
+    Expand a DASH MPD into format records, one per Representation.
+
+    Only the first Period is read; later periods (ads, chapters) repeat
+    the same renditions.
+
+    Args:
+        text (str): MPD body
+        base_url (str): URL the MPD was fetched from
+
+    Returns:
+        list: Records for each video and audio Representation
+    """
+    root = ET.fromstring(text)
+    period = next((el for el in root if _local(el.tag) == 'Period'), None)
+    if period is None:
+        return []
+
+    records = []
+    for adaptation in (el for el in period if _local(el.tag) == 'AdaptationSet'):
+        for representation in (el for el in adaptation if _local(el.tag) == 'Representation'):
+            # Representations inherit anything they don't set from their AdaptationSet
+            attrs = {**adaptation.attrib, **representation.attrib}
+            mime = attrs.get('mimeType', '')
+            content_type = attrs.get('contentType') or mime.split('/')[0]
+            if content_type not in ('video', 'audio'):
+                continue
+            vcodec, acodec = split_codecs(attrs.get('codecs'))
+            if content_type == 'audio':
+                acodec, vcodec = acodec or vcodec, None
+            bandwidth = attrs.get('bandwidth', '')
+            records.append(_record('dash', content_type, base_url, id=attrs.get('id'),
+                                   width=int(attrs['width']) if attrs.get('width', '').isdigit() else None,
+                                   height=int(attrs['height']) if attrs.get('height', '').isdigit() else None,
+                                   fps=_frame_rate(attrs.get('frameRate')),
+                                   tbr=int(bandwidth) / 1000 if bandwidth.isdigit() else None,
+                                   vcodec=vcodec, acodec=acodec, language=attrs.get('lang')))
+    return records
+
+
+def parse_manifest(text, base_url):
+    """
+    Detect and parse an HLS or DASH manifest.
+
+    Returns:
+        tuple: (protocol, records); protocol is 'hls', 'dash' or None
+    """
+    try:
+        if '#EXTM3U' in text:
+            return 'hls', parse_hls(text, base_url)
+        if '<MPD' in text:
+            return 'dash', parse_dash(text, base_url)
+    except ET.ParseError as e:
+        logger.warning(f"Could not parse manifest {base_url}: {str(e)}")
+    return None, []
+
+
+def format_filter(record):
+    """
+    yt-dlp format filter matching a record, e.g. "[height=720][tbr=2500]".
+
+    yt-dlp's format ids for manifests depend on how the page was
+    extracted, so renditions are selected by their properties instead.
+    """
+    parts = []
+    if record['kind'] == 'video' and record['height']:
+        parts.append(f"[height={record['height']}]")
+    if record['tbr']:
+        parts.append(f"[tbr={('%f' % record['tbr']).rstrip('0').rstrip('.')}]")
+    elif record['language']:
+        parts.append(f"[language={record['language']}]")
+    return ''.join(parts)
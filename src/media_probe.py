@@ -0,0 +1,166 @@
+import re
+import sys
+from urllib.parse import urldefrag, urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+import urllib3
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from manifest import parse_manifest
+else:
+    # Running directly as .py
+    from utils import logger
+    from manifest import parse_manifest
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+# Progressive files smaller than this are usually previews, ads or beacons
+MIN_MEDIA_BYTES = 256 * 1024
+
+# Largest manifest body read while probing
+MAX_MANIFEST_BYTES = 1048576
+
+MANIFEST_URL = re.compile(r'\.(m3u8|mpd)(\?|#|$)', re.IGNORECASE)
+MANIFEST_TYPE = re.compile(r'mpegurl|dash\+xml', re.IGNORECASE)
+AUDIO_EXT = re.compile(r'\.(mp3|m4a|aac|ogg|opus|wav)(\?|#|$)', re.IGNORECASE)
+VIDEO_EXT = re.compile(r'\.(mp4|webm|mov|mkv|flv|m4v|ts)(\?|#|$)', re.IGNORECASE)
+HEIGHT_HINT = re.compile(r'(?<!\d)(2160|1440|1080|720|540|480|360|240|144)p?(?!\d)')
+EXT_PATTERN = re.compile(r'\.([a-z0-9]{2,4})(\?|#|$)', re.IGNORECASE)
+
+
+class MediaProbe:
+    """
+    Probes candidate media URLs concurrently over a pooled HTTP session.
+
+    Each URL gets a HEAD request (falling back to a one-byte Range GET) to
+    learn its content type, size and final redirect target. Manifests are
+    fetched and their variants listed. Results are deduplicated by final
+    URL and ranked by quality, then size.
+    """
+
+    def __init__(self, max_workers=8, timeout=10, http=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.http = http or urllib3.PoolManager(
+            num_pools=16,
+            maxsize=max_workers,
+            headers={'User-Agent': USER_AGENT},
+            retries=urllib3.Retry(total=2, redirect=5, backoff_factor=0.2),
+            timeout=urllib3.Timeout(connect=5, read=timeout),
+        )
+
+    def _request(self, method, url, headers=None):
+        return self.http.request(method, url, headers=headers, preload_content=False, redirect=True)
+
+    def probe(self, url):
+        """
+        Probe a single URL.
+
+        Returns:
+            dict: url, final_url, status, content_type, size, kind
+            ('manifest', 'video', 'audio' or 'other'), height, protocol and
+            variants (manifest format records, see manifest.py) and error
+            (if the probe failed)
+        """
+        info = {'url': url, 'final_url': url, 'content_type': '', 'size': None,
+                'kind': 'other', 'protocol': None, 'height': None, 'variants': [], 'error': None}
+        try:
+            response = self._request('HEAD', url)
+            response.release_conn()
+            if response.status >= 400 or not response.headers.get('Content-Length'):
+                # Some CDNs reject HEAD or omit the length; a one-byte GET tells us the total
+                response = self._request('GET', url, headers={'Range': 'bytes=0-0'})
+                response.release_conn()
+
+            info['status'] = response.status
+            if response.status >= 400:
+                info['error'] = f"HTTP {response.status}"
+                return info
+
+            # geturl() may be relative to the request after a redirect
+            info['final_url'] = urldefrag(urljoin(url, response.geturl() or url))[0]
+            info['content_type'] = (response.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+            content_range = response.headers.get('Content-Range', '')
+            total = re.search(r'/(\d+)$', content_range)
+            if total:
+                info['size'] = int(total.group(1))
+            elif response.headers.get('Content-Length', '').isdigit() and response.status != 206:
+                info['size'] = int(response.headers['Content-Length'])
+
+            info['kind'] = self._classify(info['final_url'], info['content_type'])
+            if info['kind'] == 'manifest':
+                info['protocol'], info['variants'] = self._manifest_variants(info['final_url'])
+                heights = [v['height'] for v in info['variants'] if v.get('height')]
+                info['height'] = max(heights) if heights else None
+            elif info['kind'] == 'video':
+                hint = HEIGHT_HINT.search(info['final_url'])
+                info['height'] = int(hint.group(1)) if hint else None
+        except Exception as e:
+            logger.warning(f"Probe failed for {url}: {str(e)}")
+            info['error'] = str(e)
+        return info
+
+    @staticmethod
+    def _classify(url, content_type):
+        if MANIFEST_TYPE.search(content_type) or MANIFEST_URL.search(url):
+            return 'manifest'
+        if content_type.startswith('video/'):
+            return 'video'
+        if content_type.startswith('audio/'):
+            return 'audio'
+        if content_type in ('', 'application/octet-stream', 'binary/octet-stream'):
+            if AUDIO_EXT.search(url):
+                return 'audio'
+            if VIDEO_EXT.search(url):
+                return 'video'
+        return 'other'
+
+    def _manifest_variants(self, url):
+        """Fetch a manifest (up to MAX_MANIFEST_BYTES); returns (protocol, variants)."""
+        response = self._request('GET', url)
+        try:
+            text = response.read(MAX_MANIFEST_BYTES).decode('utf-8', errors='replace')
+        finally:
+            response.release_conn()
+        return parse_manifest(text, url)
+
+    def probe_all(self, urls):
+        """
+        Probe URLs concurrently, drop unusable ones, dedupe and rank them.
+
+        Returns:
+            list: Probe results, best candidate first
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique_urls))) as pool:
+            results = list(pool.map(self.probe, unique_urls))
+
+        candidates = {}
+        for info in results:
+            if info['error'] or info['kind'] == 'other':
+                continue
+            if info['kind'] != 'manifest' and info['size'] is not None and info['size'] < MIN_MEDIA_BYTES:
+                logger.info(f"Dropping small media ({info['size']} bytes): {info['url']}")
+                continue
+            # Several page URLs often redirect to the same file
+            candidates.setdefault(info['final_url'], info)
+
+        kind_rank = {'manifest': 0, 'video': 1, 'audio': 2}
+        return sorted(candidates.values(),
+                      key=lambda i: (kind_rank[i['kind']], -(i['height'] or 0), -(i['size'] or 0)))
+
+    @staticmethod
+    def extension_for(info):
+        """Best-guess file extension for a probed URL."""
+        if info['kind'] == 'manifest':
+            return 'mp4'
+        match = EXT_PATTERN.search(info['final_url'])
+        if match:
+            return match.group(1).lower()
+        return 'mp3' if info['kind'] == 'audio' else 'mp4'
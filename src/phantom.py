@@ -2,13 +2,205 @@ import os
 import sys
 import subprocess
 import json
+import time
 import tempfile
 import logging
+import threading
+import itertools
+import queue
 from urllib.parse import urlparse
 
 # Configure logging
 logger = logging.getLogger("phantom")
 
+class PhantomJSWorker:
+    """
+    Long-lived PhantomJS process that answers extraction requests over a pipe.
+
+    The browser is started once and reused, so each URL only pays for the
+    page load itself. Requests are handled one at a time; a request that
+    overruns its timeout kills the process and the next request restarts it.
+    Each request has an id, so one caller can cancel its own request without
+    touching another caller's.
+    """
+    def __init__(self, phantomjs_path, script):
+        self.phantomjs_path = phantomjs_path
+        self.script = script
+        self.process = None
+        self.script_path = None
+        self.lines = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # Request in flight, and requests still waiting for the worker
+        self._state_lock = threading.Lock()
+        self._active = None
+        self._waiting = set()
+        self._cancelled = set()
+
+    def _start(self):
+        """Write the worker script once and launch PhantomJS."""
+        if self.script_path is None:
+            with tempfile.NamedTemporaryFile(suffix='.js', delete=False, mode='w') as temp:
+                temp.write(self.script)
+                self.script_path = temp.name
+
+        logger.info("Starting persistent PhantomJS worker")
+        self.process = subprocess.Popen(
+            [self.phantomjs_path, self.script_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            encoding='utf-8',
+            errors='replace',
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+
+        # Hand stdout lines to whoever is waiting for a result
+        self.lines = queue.Queue()
+
+        def read_output(stream, lines):
+            try:
+                for line in iter(stream.readline, ''):
+                    lines.put(line.rstrip('\n'))
+            except Exception as e:
+                logger.error(f"Error reading PhantomJS output: {e}")
+            finally:
+                lines.put(None)  # EOF marker
+
+        threading.Thread(target=read_output, args=(self.process.stdout, self.lines), daemon=True).start()
+
+    def _stop(self):
+        """Kill the worker process (keeps the script file for a restart)."""
+        if self.process is not None:
+            try:
+                if self.process.poll() is None:
+                    self.process.kill()
+                    self.process.wait(timeout=5)
+            except Exception as e:
+                logger.warning(f"Error stopping PhantomJS worker: {str(e)}")
+        self.process = None
+        self.lines = None
+
+    def new_request_id(self):
+        """Allocate an id to pass to extract() and cancel()."""
+        return next(self._ids)
+
+    def extract(self, url, max_wait=5.0, poll_interval=0.1, timeout=30, request_id=None):
+        """
+        Extract media URLs from a page using the worker.
+
+        Args:
+            url (str): The page URL
+            max_wait (float): Upper bound in seconds to wait for media after page load
+            poll_interval (float): How often the page is checked for media
+            timeout (float): Hard limit for the whole request
+            request_id (int): Id from new_request_id(), needed to cancel the request
+
+        Returns:
+            dict: The extraction result, or {"error": ...}
+        """
+        if request_id is None:
+            request_id = self.new_request_id()
+        with self._state_lock:
+            self._waiting.add(request_id)
+        try:
+            with self._lock:
+                with self._state_lock:
+                    self._waiting.discard(request_id)
+                    if request_id in self._cancelled:
+                        self._cancelled.discard(request_id)
+                        return {"error": "Cancelled"}
+                    self._active = request_id
+                return self._extract(url, max_wait, poll_interval, timeout, request_id)
+        finally:
+            with self._state_lock:
+                self._waiting.discard(request_id)
+                self._cancelled.discard(request_id)
+                if self._active == request_id:
+                    self._active = None
+
+    def _extract(self, url, max_wait, poll_interval, timeout, request_id):
+        """Send one request to the worker and wait for its answer (holds self._lock)."""
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+
+        request = {
+            'id': request_id,
+            'url': url,
+            'maxWait': int(max_wait * 1000),
+            'pollInterval': int(poll_interval * 1000),
+        }
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self._stop()
+            return {"error": f"PhantomJS worker unavailable: {str(e)}"}
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error("PhantomJS process timed out")
+                self._stop()
+                return {"error": "PhantomJS process timed out"}
+            try:
+                line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                logger.error("PhantomJS worker exited unexpectedly")
+                self._stop()
+                return {"error": "PhantomJS worker exited unexpectedly"}
+            if not line.startswith('@@RESULT '):
+                logger.debug(f"PhantomJS: {line}")
+                continue
+            try:
+                result = json.loads(line[len('@@RESULT '):])
+            except json.JSONDecodeError:
+                logger.error("Failed to parse PhantomJS output as JSON")
+                return {"error": "Invalid JSON output from PhantomJS"}
+            if result.get('id') not in (None, request_id):
+                continue  # Late answer to a request that already timed out
+            return result
+
+    def cancel(self, request_id):
+        """
+        Abort one request (safe from any thread).
+
+        A request still waiting for the worker returns without running. The
+        request in flight is aborted by killing the process, which the next
+        request restarts. Any other request is left alone.
+        """
+        with self._state_lock:
+            if request_id in self._waiting:
+                self._cancelled.add(request_id)
+            elif request_id == self._active:
+                process = self.process
+                if process is not None and process.poll() is None:
+                    process.kill()
+
+    def shutdown(self):
+        """Ask the worker to exit and remove its script file."""
+        with self._lock:
+            if self.process is not None and self.process.poll() is None:
+                try:
+                    self.process.stdin.write("quit\n")
+                    self.process.stdin.flush()
+                    self.process.wait(timeout=2)
+                except Exception:
+                    pass
+            self._stop()
+            if self.script_path:
+                try:
+                    os.unlink(self.script_path)
+                except Exception as e:
+                    logger.warning(f"Failed to delete temporary script: {str(e)}")
+                self.script_path = None
+
+
 class PhantomJSHandler:
     """
     Class to handle websites that need PhantomJS to scrape content.
@@ -31,112 +223,249 @@ class PhantomJSHandler:
             # Add more sites that typically need JS execution
         ]
         
-        # JS script for extracting video info using PhantomJS
+        # Long-lived PhantomJS worker script. Reads one JSON request per line
+        # on stdin ({id, url, maxWait, pollInterval}) and answers each with a
+        # single "@@RESULT <json>" line, reusing the same browser process.
         self.extract_js = """
-var page = require('webpage').create();
 var system = require('system');
-var url = system.args[1];
-
-page.onConsoleMessage = function(msg) {
-    console.log('PAGE LOG: ' + msg);
-};
-
-page.onError = function(msg, trace) {
-    // Silence JS errors
-};
-
-page.open(url, function(status) {
-    if (status !== 'success') {
-        console.log(JSON.stringify({error: 'Failed to load page'}));
-        phantom.exit(1);
-    } else {
-        // Wait for dynamic content to load
-        setTimeout(function() {
-            var result = page.evaluate(function() {
-                var videoData = {
-                    title: document.title,
-                    videoUrls: [],
-                    audioUrls: []
-                };
-                
-                // Find video sources
-                var videoElements = document.querySelectorAll('video');
-                var videoSources = document.querySelectorAll('video source');
-                
-                // Extract from video elements
-                Array.prototype.forEach.call(videoElements, function(video) {
-                    if (video.src) videoData.videoUrls.push(video.src);
-                });
-                
-                // Extract from source elements
-                Array.prototype.forEach.call(videoSources, function(source) {
-                    if (source.src) videoData.videoUrls.push(source.src);
-                });
-                
-                // Look for JSON data containing media URLs
-                var scripts = document.querySelectorAll('script');
-                Array.prototype.forEach.call(scripts, function(script) {
-                    if (script.text) {
-                        // Search for media URLs in script content
-                        var urlMatches = script.text.match(/(https?:\\/\\/[^"'\\s]+\\.(mp4|webm|m3u8|mp3|m4a)[^"'\\s]*)/g);
-                        if (urlMatches) {
-                            urlMatches.forEach(function(url) {
-                                if (url.match(/\\.(mp4|webm|m3u8)$/)) {
-                                    videoData.videoUrls.push(url);
-                                } else if (url.match(/\\.(mp3|m4a)$/)) {
-                                    videoData.audioUrls.push(url);
-                                }
-                            });
+var webpage = require('webpage');
+var MANIFEST_URL = /\\.(m3u8|mpd|ism\\/manifest)(\\?|#|$)/i;
+var MANIFEST_TYPE = /mpegurl|dash\\+xml|vnd\\.ms-sstr/i;
+var MEDIA_URL = /\\.(mp4|webm|mov|flv|mp3|m4a|ogg|opus)(\\?|#|$)/i;
+var AUDIO_URL = /\\.(mp3|m4a|ogg|opus)(\\?|#|$)/i;
+var SEGMENT_URL = /\\.(ts|m4s|m4f|aac|cmfv|cmfa)(\\?|#|$)|[\\/_-](seg|segment|frag|fragment|chunk)[-_]?\\d+/i;
+var SEGMENT_TYPE = /mp2t|iso\\.segment/i;
+// Progressive media smaller than this is usually a preview, ad or tracking beacon
+var MIN_MEDIA_BYTES = 256 * 1024;
+
+function scrape(page) {
+    return page.evaluate(function() {
+        var videoData = {
+            title: document.title,
+            videoUrls: [],
+            audioUrls: []
+        };
+
+        // Find video sources
+        var videoElements = document.querySelectorAll('video');
+        var videoSources = document.querySelectorAll('video source');
+
+        // Extract from video elements
+        Array.prototype.forEach.call(videoElements, function(video) {
+            if (video.src && video.src.indexOf('blob:') !== 0) videoData.videoUrls.push(video.src);
+        });
+
+        // Extract from source elements
+        Array.prototype.forEach.call(videoSources, function(source) {
+            if (source.src) videoData.videoUrls.push(source.src);
+        });
+
+        // Look for JSON data containing media URLs
+        var scripts = document.querySelectorAll('script');
+        Array.prototype.forEach.call(scripts, function(script) {
+            if (script.text) {
+                // Search for media URLs in script content
+                var urlMatches = script.text.match(/(https?:\\/\\/[^"'\\s]+\\.(mp4|webm|m3u8|mp3|m4a)[^"'\\s]*)/g);
+                if (urlMatches) {
+                    urlMatches.forEach(function(url) {
+                        if (url.match(/\\.(mp4|webm|m3u8)$/)) {
+                            videoData.videoUrls.push(url);
+                        } else if (url.match(/\\.(mp3|m4a)$/)) {
+                            videoData.audioUrls.push(url);
                         }
-                        
-                        // Look for HLS and DASH streams
-                        if (script.text.includes('m3u8') || script.text.includes('mpd')) {
+                    });
+                }
+
+                // Look for HLS streams inside embedded JSON
+                if (script.text.indexOf('m3u8') !== -1 || script.text.indexOf('mpd') !== -1) {
+                    var jsonData = script.text.match(/({[^;]*})/g);
+                    if (jsonData) {
+                        jsonData.forEach(function(potential) {
                             try {
-                                var jsonData = script.text.match(/({[^;]*})/g);
-                                if (jsonData) {
-                                    jsonData.forEach(function(potential) {
-                                        try {
-                                            var obj = JSON.parse(potential);
-                                            if (obj && typeof obj === 'object') {
-                                                var jsonStr = JSON.stringify(obj);
-                                                if (jsonStr.includes('m3u8')) {
-                                                    var m3u8Matches = jsonStr.match(/(https?:\\/\\/[^"'\\s]+\\.m3u8[^"'\\s]*)/g);
-                                                    if (m3u8Matches) {
-                                                        m3u8Matches.forEach(function(url) {
-                                                            videoData.videoUrls.push(url);
-                                                        });
-                                                    }
-                                                }
-                                            }
-                                        } catch (e) {
-                                            // Not valid JSON, ignore
-                                        }
+                                var jsonStr = JSON.stringify(JSON.parse(potential));
+                                var m3u8Matches = jsonStr.match(/(https?:\\/\\/[^"'\\s]+\\.m3u8[^"'\\s]*)/g);
+                                if (m3u8Matches) {
+                                    m3u8Matches.forEach(function(url) {
+                                        videoData.videoUrls.push(url);
                                     });
                                 }
                             } catch (e) {
-                                // JSON parsing error, ignore
+                                // Not valid JSON, ignore
                             }
-                        }
+                        });
                     }
-                });
-                
-                // Remove duplicates
-                videoData.videoUrls = videoData.videoUrls.filter(function(item, pos, self) {
-                    return self.indexOf(item) === pos;
-                });
-                videoData.audioUrls = videoData.audioUrls.filter(function(item, pos, self) {
-                    return self.indexOf(item) === pos;
-                });
-                
-                return videoData;
-            });
-            
-            console.log(JSON.stringify(result));
-            phantom.exit(0);
-        }, 5000); // Wait 5 seconds for content to load
+                }
+            }
+        });
+
+        return videoData;
+    });
+}
+
+function unique(list) {
+    return list.filter(function(item, pos, self) {
+        return self.indexOf(item) === pos;
+    });
+}
+
+function header(headers, name) {
+    name = name.toLowerCase();
+    for (var i = 0; i < (headers || []).length; i++) {
+        if (headers[i].name.toLowerCase() === name) return headers[i].value;
+    }
+    return null;
+}
+
+// Total resource size from Content-Range (ranged requests) or Content-Length
+function resourceSize(headers) {
+    var range = header(headers, 'Content-Range');
+    var match = range && range.match(/\\/(\\d+)$/);
+    if (match) return parseInt(match[1], 10);
+    var length = header(headers, 'Content-Length');
+    return length ? parseInt(length, 10) : null;
+}
+
+// Classify a network resource as 'manifest', 'video', 'audio', 'segment' or null
+function classify(url, contentType, size) {
+    contentType = (contentType || '').toLowerCase();
+    if (url.indexOf('blob:') === 0 || url.indexOf('data:') === 0) return null;
+    if (MANIFEST_TYPE.test(contentType) || MANIFEST_URL.test(url)) return 'manifest';
+    if (SEGMENT_TYPE.test(contentType) || SEGMENT_URL.test(url)) return 'segment';
+    var kind = null;
+    if (contentType.indexOf('video/') === 0) kind = 'video';
+    else if (contentType.indexOf('audio/') === 0) kind = 'audio';
+    else if (!contentType && MEDIA_URL.test(url)) kind = AUDIO_URL.test(url) ? 'audio' : 'video';
+    if (kind && size !== null && size !== undefined && size < MIN_MEDIA_BYTES) return null;
+    return kind;
+}
+
+function handle(request, done) {
+    var page = webpage.create();
+    var started = Date.now();
+    var networkMedia = {};  // url -> {url, kind, contentType, size}
+    var segmentCount = 0;
+    var loaded = false;
+    var finished = false;
+
+    page.onError = function(msg, trace) {
+        // Silence JS errors
+    };
+
+    function finish(result, reason) {
+        if (finished) return;
+        finished = true;
+        result.id = request.id;
+        result.videoUrls = result.videoUrls || [];
+        result.audioUrls = result.audioUrls || [];
+        result.networkMedia = [];
+        for (var url in networkMedia) {
+            var media = networkMedia[url];
+            result.networkMedia.push(media);
+            // Manifests go first: they describe every rendition
+            if (media.kind === 'manifest') result.videoUrls.unshift(url);
+            else if (media.kind === 'audio') result.audioUrls.push(url);
+            else result.videoUrls.push(url);
+        }
+        result.videoUrls = unique(result.videoUrls);
+        result.audioUrls = unique(result.audioUrls);
+        result.segmentRequests = segmentCount;
+        result.readyReason = reason;
+        result.elapsedMs = Date.now() - started;
+        system.stdout.writeLine('@@RESULT ' + JSON.stringify(result));
+        page.close();
+        setTimeout(done, 0);
+    }
+
+    function finishFromNetwork(reason) {
+        // Defer: closing the page inside a network callback is unsafe
+        setTimeout(function() {
+            finish({title: page.title, videoUrls: [], audioUrls: []}, reason);
+        }, 0);
+    }
+
+    function record(url, kind, contentType, size) {
+        if (kind === 'segment') {
+            segmentCount++;
+            return;
+        }
+        var media = networkMedia[url] || {url: url};
+        media.kind = kind;
+        if (contentType) media.contentType = contentType;
+        if (size !== null && size !== undefined) media.size = size;
+        networkMedia[url] = media;
     }
-});
+
+    // A manifest on the wire answers the request immediately, even mid-load.
+    // Progressive files wait for their response headers so that previews and
+    // ads can be filtered by content-type and size.
+    page.onResourceRequested = function(data) {
+        if (finished) return;
+        if (classify(data.url, '', null) === 'manifest') {
+            record(data.url, 'manifest', null, null);
+            finishFromNetwork('manifest');
+        }
+    };
+
+    page.onResourceReceived = function(response) {
+        if (finished || response.stage !== 'start') return;
+        var size = resourceSize(response.headers);
+        var kind = classify(response.url, response.contentType, size);
+        if (!kind) return;
+        record(response.url, kind, response.contentType, size);
+        if (kind === 'manifest') {
+            finishFromNetwork('manifest');
+        } else if (kind !== 'segment' && size !== null) {
+            finishFromNetwork('network');
+        }
+    };
+
+    page.open(request.url, function(status) {
+        if (loaded || finished) return;
+        loaded = true;
+        if (status !== 'success') {
+            finish({error: 'Failed to load page'}, 'error');
+            return;
+        }
+        // Poll for media instead of sleeping; maxWait is only the upper bound
+        var deadline = Date.now() + request.maxWait;
+        (function poll() {
+            if (finished) return;
+            var result = scrape(page);
+            if (result.videoUrls.length || result.audioUrls.length) {
+                finish(result, 'dom');
+            } else if (Date.now() >= deadline) {
+                finish(result, 'timeout');
+            } else {
+                setTimeout(poll, request.pollInterval);
+            }
+        })();
+    });
+}
+
+function next() {
+    var line = system.stdin.readLine();
+    if (!line || line === 'quit') {
+        phantom.exit(0);
+        return;
+    }
+    var request;
+    try {
+        request = JSON.parse(line);
+    } catch (e) {
+        system.stdout.writeLine('@@RESULT ' + JSON.stringify({error: 'Invalid request'}));
+        setTimeout(next, 0);
+        return;
+    }
+    handle(request, next);
+}
+
+next();
 """
+
+        # Persistent worker process, started on first use
+        self.worker = None
+        # Request ids outlive a restarted worker
+        self._request_ids = itertools.count(1)
     
     def is_phantom_required(self, url):
         """
@@ -165,12 +494,17 @@ page.open(url, function(status) {
             logger.error(f"Error in is_phantom_required: {str(e)}")
             return False
     
-    def extract_media_urls(self, url):
+    def new_request_id(self):
+        """Allocate an id so an extraction can be cancelled from another thread."""
+        return next(self._request_ids)
+
+    def extract_media_urls(self, url, request_id=None):
         """
         Use PhantomJS to extract media URLs from a page.
         
         Args:
             url (str): The URL to extract media from
+            request_id (int): Id from new_request_id(), needed to cancel the extraction
             
         Returns:
             dict: A dictionary with video and audio URLs extracted
@@ -180,47 +514,31 @@ page.open(url, function(status) {
             return {"error": "PhantomJS executable not found"}
         
         try:
-            # Create temporary script file
-            with tempfile.NamedTemporaryFile(suffix='.js', delete=False, mode='w') as temp:
-                temp.write(self.extract_js)
-                script_path = temp.name
-            
-            # Run PhantomJS
+            if self.worker is None:
+                self.worker = PhantomJSWorker(self.phantomjs_path, self.extract_js)
+
+            if request_id is None:
+                request_id = self.new_request_id()
             logger.info(f"Running PhantomJS for URL: {url}")
-            process = subprocess.Popen(
-                [self.phantomjs_path, script_path, url],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            stdout, stderr = process.communicate(timeout=30)
-            
-            # Clean up temporary file
-            try:
-                os.unlink(script_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete temporary script: {str(e)}")
-            
-            # Parse the output
-            if process.returncode == 0 and stdout:
-                try:
-                    result = json.loads(stdout.strip())
-                    return result
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse PhantomJS output as JSON")
-                    return {"error": "Invalid JSON output from PhantomJS"}
-            else:
-                logger.error(f"PhantomJS failed: {stderr}")
-                return {"error": f"PhantomJS error: {stderr}"}
-                
-        except subprocess.TimeoutExpired:
-            logger.error("PhantomJS process timed out")
-            return {"error": "PhantomJS process timed out"}
+            result = self.worker.extract(url, request_id=request_id)
+            if "error" not in result:
+                logger.info(f"PhantomJS resolved by {result.get('readyReason')} in {result.get('elapsedMs')} ms")
+            return result
         except Exception as e:
             logger.error(f"PhantomJS extraction error: {str(e)}")
             return {"error": f"PhantomJS extraction error: {str(e)}"}
 
+    def cancel(self, request_id):
+        """Cancel one extraction; other callers' extractions keep running."""
+        if self.worker is not None:
+            self.worker.cancel(request_id)
+
+    def shutdown(self):
+        """Stop the persistent PhantomJS worker, if one was started."""
+        if self.worker is not None:
+            self.worker.shutdown()
+            self.worker = None
+
     def get_ytdlp_compatible_urls(self, phantom_result):
         """
         Convert PhantomJS results into a format compatible with yt-dlp.
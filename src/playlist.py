@@ -0,0 +1,581 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import ffmpeg_executable, sanitize_filename, logger
+    from config import load_playlist_workers_config
+    from bandwidth import with_limit_rate
+    from scheduler import PRIORITY_LOW
+    from archive import key_for_info
+    from diskspace import info_size
+    from thumbnails import pick_thumbnail
+else:
+    # Running directly as .py
+    from utils import ffmpeg_executable, sanitize_filename, logger
+    from config import load_playlist_workers_config
+    from bandwidth import with_limit_rate
+    from scheduler import PRIORITY_LOW
+    from archive import key_for_info
+    from diskspace import info_size
+    from thumbnails import pick_thumbnail
+
+# Quality choices offered instead of per-video formats in playlist mode
+PLAYLIST_QUALITIES = ["Best available", "1080p", "720p", "480p", "360p"]
+
+# Job table phase of an entry in each state, unless a more specific one was recorded
+STATE_PHASES = {'extracting': 'extract', 'downloading': 'download', 'processing': 'postprocess'}
+
+# States an entry doesn't leave
+FINAL_STATES = ('done', 'failed', 'skipped', 'cancelled')
+
+# Stop marker passed between pipeline stages
+_DONE = object()
+
+
+def playlist_format(type_choice, quality):
+    """
+    yt-dlp format selector for every entry of a playlist.
+
+    Args:
+        type_choice (str): '1' video+audio, '2' video only, '3' audio only
+        quality (str): One of PLAYLIST_QUALITIES
+
+    Returns:
+        str: Format selector
+    """
+    if type_choice == '3':
+        return "ba/b"
+    height = quality[:-1] if quality.endswith('p') and quality[:-1].isdigit() else None
+    cap = f"[height<={height}]" if height else ""
+    if type_choice == '2':
+        return f"bv*{cap}/bv*" if cap else "bv*"
+    return f"bv*{cap}+ba/b{cap}/bv*+ba/b" if cap else "bv*+ba/b"
+
+
+class PlaylistDownload:
+    """
+    Downloads every entry of a playlist or channel through a bounded pipeline.
+
+    Entries are enumerated with --flat-playlist as a stream and pass through
+    three stages, each with its own worker count and a bounded queue in
+    front of it so enumeration never runs far ahead of the downloads:
+
+        extract      --dump-json per entry (info is reused by the download)
+        download     yt-dlp --load-info-json, so the page isn't extracted twice
+        postprocess  MP3 conversion for audio-only downloads
+
+    Output files are prefixed with the playlist position so they sort in
+    playlist order. A failing entry is recorded and skipped; the rest of
+    the playlist carries on. Progress across all entries is reported as
+    ("playlist_progress", stats) and the end as ("playlist_complete", stats).
+    """
+
+    name = "Playlist"  # Shown in progress messages
+    priority = PRIORITY_LOW  # Scheduler priority of the entries' downloads
+    skip_archived = True  # Whether videos in the download archive are skipped
+
+    def __init__(self, downloader, url, type_choice, quality, folder, workers=None, queue_size=8, messages=None):
+        self.downloader = downloader
+        self.queue = messages or downloader.queue  # Where progress and job table updates go
+        self.url = url
+        self.type_choice = type_choice
+        self.format_spec = playlist_format(type_choice, quality)
+        self.folder = folder
+        self.workers = workers or load_playlist_workers_config()
+        self.queue_size = queue_size
+
+        self.entries = {}  # playlist index -> entry dict
+        self.total = None  # From playlist_count when the extractor knows it
+        self.playlist_folder = None
+        self.enumerated = False
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._processes = set()
+        self.job_group = f"playlist-{id(self)}"  # Scheduler group of this playlist's downloads
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+        self._dirty = set()  # Indexes of entries changed since the last job table update
+        self._workdir = None
+        self._existing_names = None  # File name without extension -> name, listed on first use
+
+    def start(self):
+        """Run the pipeline in a background thread."""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def cancel(self):
+        """Stop enumeration and all running entries."""
+        self.stop_event.set()
+        # Entries waiting behind a higher-priority download must give up too
+        self.downloader.scheduler.cancel(group=self.job_group)
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.kill()
+            except Exception:
+                pass
+
+    def run(self):
+        """Enumerate the playlist and drive entries through the pipeline."""
+        self._workdir = tempfile.mkdtemp(prefix="playlist_")
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(3)]
+        stages = [
+            ("extract", self._extract, queues[0], queues[1], self.workers[0]),
+            ("download", self._download, queues[1], queues[2], self.workers[1]),
+            ("postprocess", self._postprocess, queues[2], None, self.workers[2]),
+        ]
+        threads = []
+        for index, (name, handler, in_queue, out_queue, count) in enumerate(stages):
+            next_count = stages[index + 1][4] if index + 1 < len(stages) else 0
+            remaining = [count]  # Workers still running; the last one to exit stops the next stage
+            for n in range(count):
+                thread = threading.Thread(
+                    target=self._stage_worker,
+                    args=(name, handler, in_queue, out_queue, remaining, next_count),
+                    name=f"playlist-{name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            error = self._enumerate(queues[0])
+        finally:
+            for _ in range(self.workers[0]):
+                self._put(queues[0], _DONE, force=True)
+            for thread in threads:
+                thread.join()
+            shutil.rmtree(self._workdir, ignore_errors=True)
+
+        if self.stop_event.is_set():
+            with self._lock:
+                cancelled = [entry for entry in self.entries.values() if entry['state'] not in FINAL_STATES]
+                for entry in cancelled:
+                    entry.update(state='cancelled', speed=0.0)
+                    self._dirty.add(entry['index'])
+            for entry in cancelled:
+                self._release(entry)
+            self._report(force=True)
+
+        stats = self.stats()
+        if error and not self.entries:
+            self.queue.put(("download_error", error))
+            return
+        stats['folder'] = self.playlist_folder or self.folder
+        stats['failures'] = [(e['index'], e['title'], e['error']) for e in self._sorted_entries()
+                             if e['state'] == 'failed']
+        logger.info(f"Playlist finished: {stats['done']} done, {stats['failed']} failed, "
+                    f"{stats['skipped']} skipped of {stats['total']}")
+        self.queue.put(("playlist_complete", stats))
+
+    def _put(self, target, item, force=False):
+        """Blocking put that gives up once the pipeline is cancelled."""
+        while True:
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if self.stop_event.is_set() and not force:
+                    return False
+
+    def _stage_worker(self, name, handler, in_queue, out_queue, remaining, next_count):
+        while True:
+            entry = in_queue.get()
+            if entry is _DONE:
+                break
+            if self.stop_event.is_set():
+                continue  # Drain without working so upstream can finish
+            try:
+                result = handler(entry)
+            except Exception as e:
+                logger.error(f"Playlist entry {entry['index']} failed in {name}: {str(e)}")
+                result = None
+                self._update(entry, state='failed', error=str(e))
+            if result is not None and out_queue is not None:
+                self._put(out_queue, result)
+
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and out_queue is not None:
+            for _ in range(next_count):
+                self._put(out_queue, _DONE, force=True)
+
+    def _spawn(self, args):
+        """Start yt-dlp for this playlist without touching the downloader's single-job state."""
+        command = [self.downloader.ytdlp_exe] + args
+        logger.info(f"Playlist yt-dlp: {' '.join(command)}")
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            encoding='utf-8',
+            errors='replace',
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        with self._lock:
+            self._processes.add(process)
+        return process
+
+    def _finish(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+    def _enumerate(self, extract_queue):
+        """
+        Stream --flat-playlist entries into the extract queue.
+
+        Returns:
+            str: Error message if enumeration failed, else None
+        """
+        if not self.downloader.ytdlp_exe:
+            return "yt-dlp executable not found"
+        process = self._spawn(['--flat-playlist', '--dump-json', '--lazy-playlist', '--ignore-errors',
+                               '--no-warnings', self.url])
+        # stderr is read on its own thread so a chatty extractor can't block stdout
+        errors = []
+        stderr_thread = threading.Thread(target=lambda: errors.extend(process.stderr), daemon=True)
+        stderr_thread.start()
+        position = 0
+        try:
+            for line in process.stdout:
+                if self.stop_event.is_set():
+                    break
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                position += 1
+                if self.playlist_folder is None:
+                    title = data.get('playlist_title') or data.get('playlist') or "Playlist"
+                    self.playlist_folder = os.path.join(self.folder, sanitize_filename(title))
+                    os.makedirs(self.playlist_folder, exist_ok=True)
+                self.total = data.get('playlist_count') or self.total
+                index = data.get('playlist_index') or position
+                entry = self._new_entry(index, data.get('title') or data.get('id') or f"Entry {index}",
+                                        data.get('url') or data.get('webpage_url') or data.get('id'),
+                                        archive_key=key_for_info(data), video_id=data.get('id'))
+                entry['thumbnail'] = pick_thumbnail(data)
+                if not self._add_entry(extract_queue, entry):
+                    break
+        finally:
+            process.wait()
+            stderr_thread.join(1)
+            self._finish(process)
+            self.enumerated = True
+
+        if self.stop_event.is_set():
+            return "Cancelled"
+        if process.returncode != 0 and not self.entries:
+            message = next((l.strip() for l in errors if l.startswith('ERROR')), "Could not list playlist entries")
+            logger.error(f"Playlist enumeration failed: {message}")
+            return message
+        return None
+
+    def _new_entry(self, index, title, url, archive_key=None, video_id=None):
+        return {
+            'index': index,
+            'id': video_id,
+            'archive_key': archive_key,
+            'title': title,
+            'url': url,
+            'state': 'queued',
+            'percent': 0.0,
+            'speed': 0.0,
+            'error': None,
+            'path': None,
+            'thumbnail': None,
+        }
+
+    def _add_entry(self, extract_queue, entry):
+        """Register an enumerated entry and queue it; False once cancelled."""
+        with self._lock:
+            self.entries[entry['index']] = entry
+            self._dirty.add(entry['index'])
+        self._report()
+        return self._put(extract_queue, entry)
+
+    def _base_name(self, entry):
+        """Output name prefixed with the zero-padded playlist position."""
+        width = max(3, len(str(self.total or 0)))
+        return sanitize_filename(f"{entry['index']:0{width}d} - {entry['title']}")
+
+    def _extract(self, entry):
+        # Anything in the download archive is skipped before it is extracted
+        archive = self.downloader.archive if self.skip_archived else None
+        if archive is not None and archive.contains_key(entry['archive_key']):
+            self._update(entry, state='skipped')
+            return None
+        # Entries finished by an earlier run of the same playlist are left alone
+        existing = self._existing_file(entry)
+        if existing:
+            entry['path'] = existing
+            self._update(entry, state='skipped')
+            return None
+
+        self._update(entry, state='extracting')
+        started = []
+        try:
+            result = self.downloader.execute_ytdlp(['--dump-json', '--no-playlist', '--no-warnings', entry['url']],
+                                                   timeout=120, on_start=lambda p: (started.append(p), self._track(p)))
+        finally:
+            for process in started:
+                self._finish(process)
+        if self.stop_event.is_set():
+            return None
+        if result.returncode != 0 or not result.stdout:
+            message = next((l for l in (result.stderr or '').splitlines() if l.startswith('ERROR')),
+                           "Could not retrieve video information")
+            self._update(entry, state='failed', error=message)
+            return None
+        info = json.loads(result.stdout.splitlines()[-1])
+        entry['title'] = info.get('title') or entry['title']
+        entry['archive_key'] = key_for_info(info) or entry['archive_key']
+        entry['size'] = info_size(info)
+        entry['thumbnail'] = pick_thumbnail(info) or entry['thumbnail']
+        if archive is not None and archive.contains_key(entry['archive_key']):
+            self._update(entry, state='skipped')
+            return None
+        # The same video may be queued by another playlist or import, or under another URL
+        if not self.downloader.claim_key(entry['archive_key']):
+            self._update(entry, state='skipped', error="Already queued")
+            return None
+        entry['claimed'] = True
+        entry['info_path'] = os.path.join(self._workdir, f"{entry['index']}.info.json")
+        with open(entry['info_path'], 'w', encoding='utf-8') as f:
+            f.write(result.stdout)
+        return entry
+
+    def _existing_file(self, entry):
+        """
+        Path of a file from an earlier run saved under this entry's name, if any.
+
+        The whole name (position and title) must match: channels shift
+        positions as videos are added, so a position alone would mistake a
+        new video for an old one. The folder is listed once per run.
+        """
+        with self._lock:
+            if self._existing_names is None:
+                self._existing_names = {}
+                for name in os.listdir(self.playlist_folder):
+                    if not name.endswith(('.part', '.ytdl', '.temp')):
+                        self._existing_names.setdefault(os.path.splitext(name)[0], name)
+            name = self._existing_names.get(self._base_name(entry))
+        return os.path.join(self.playlist_folder, name) if name else None
+
+    def _track(self, process):
+        with self._lock:
+            self._processes.add(process)
+
+    def _download(self, entry):
+        base = os.path.join(self.playlist_folder, self._base_name(entry))
+        args = [
+            '--progress', '--newline', '--no-warnings', '--socket-timeout', '30', '--retries', '5',
+            '--load-info-json', entry['info_path'],
+            '--format', self.format_spec,
+            '--output', f"{base}.%(ext)s",
+            '--print', 'after_move:filepath',
+            '--no-quiet',  # --print would otherwise hide the merge and post-processing lines
+        ]
+        if ffmpeg_executable:
+            args.extend(['--ffmpeg-location', ffmpeg_executable])
+        if self.type_choice == '1':
+            args.extend(['--merge-output-format', 'mp4'])
+
+        # Entries are batch work: the scheduler pauses them while a main-window download runs,
+        # and the governor restarts them when their share changes. yt-dlp resumes from the .part file.
+        governor = self.downloader.governor
+        scheduler = self.downloader.scheduler
+        key = self._job_key(entry)
+        # Wait for running entries to free disk space rather than overrunning the disk together
+        reservation, error = self.downloader.disk_space.reserve(
+            self.playlist_folder, entry.get('size'), overhead=2.0 if self.type_choice in ('1', '3') else 1.0,
+            wait=True, cancelled=self.stop_event)
+        if reservation is None:
+            self._update(entry, state='failed', error=error)
+            return None
+
+        job = scheduler.add(key, entry['title'], self.priority, group=self.job_group)
+        process = None
+        registered = False
+        self._update(entry, state='waiting')
+        try:
+            while scheduler.wait_turn(job):
+                if not registered:
+                    governor.register(key, on_rate_change=job.restart)
+                    registered = True
+                self._update(entry, state='downloading', phase='download')
+                process = self._spawn(with_limit_rate(args, governor.rate_for(key)))
+                scheduler.attach(job, process)
+                errors = []
+                stderr_thread = threading.Thread(target=lambda: errors.extend(process.stderr), daemon=True)
+                stderr_thread.start()
+                try:
+                    for line in process.stdout:
+                        line = line.strip()
+                        progress = self.downloader.parse_progress_output(line)
+                        if progress and progress.get('status') == 'downloading':
+                            self._update(entry, percent=progress['percent'], speed=progress['speed'],
+                                         eta=progress['eta'], size=entry.get('size') or progress['size'])
+                            governor.report(key, progress['speed'] * 1048576)
+                            reservation.update_percent(progress['percent'], progress['size'])
+                        elif progress and progress.get('status') == 'processing':
+                            governor.report(key, 0, restartable=False)
+                            if progress.get('phase') == 'merging' and entry.get('phase') != 'merge':
+                                self._update(entry, phase='merge', speed=0.0)
+                        elif line and os.path.isabs(line) and os.path.exists(line):
+                            entry['path'] = line
+                    process.wait()
+                finally:
+                    stderr_thread.join(1)
+                    self._finish(process)
+                if not scheduler.detach(job) or self.stop_event.is_set():
+                    break
+                if not scheduler.may_run(job):
+                    self._update(entry, state='paused', speed=0.0)
+                    governor.unregister(key)
+                    registered = False
+        finally:
+            scheduler.remove(job)
+            governor.unregister(key)
+            reservation.release()
+
+        if self.stop_event.is_set() or process is None:
+            return None
+        if process.returncode != 0 or not entry['path']:
+            message = next((l.strip() for l in errors if l.startswith('ERROR')),
+                           f"yt-dlp exited with code {process.returncode}")
+            self._update(entry, state='failed', error=message)
+            return None
+        self._update(entry, state='processing', percent=100.0, speed=0.0, phase='postprocess')
+        return entry
+
+    def _postprocess(self, entry):
+        path = entry['path']
+        if self.type_choice == '3' and not path.lower().endswith('.mp3'):
+            if not ffmpeg_executable:
+                logger.warning(f"FFmpeg not found, keeping {os.path.basename(path)} unconverted")
+            else:
+                target = os.path.splitext(path)[0] + '.mp3'
+                result = subprocess.run(
+                    [ffmpeg_executable, '-y', '-loglevel', 'error', '-i', path, '-vn',
+                     '-codec:a', 'libmp3lame', '-q:a', '0', target],
+                    capture_output=True, text=True,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                )
+                if result.returncode != 0:
+                    self._update(entry, state='failed', error=f"MP3 conversion failed: {result.stderr.strip()}")
+                    return None
+                os.remove(path)
+                entry['path'] = target
+        os.remove(entry['info_path'])
+        if self.downloader.archive is not None:
+            self.downloader.archive.add_key(entry['archive_key'])
+        self._update(entry, state='done', phase='')
+        return None
+
+    def _update(self, entry, **changes):
+        with self._lock:
+            entry.update(changes)
+            self._dirty.add(entry['index'])
+        if changes.get('state') in FINAL_STATES:
+            self._release(entry)
+        self._report(force='state' in changes)
+
+    def _release(self, entry):
+        """Let other batches queue this entry's video again."""
+        if entry.pop('claimed', False):
+            self.downloader.release_key(entry['archive_key'])
+
+    def _job_key(self, entry):
+        """Scheduler and job table key of an entry."""
+        return f"playlist-{id(self)}-{entry['index']}"
+
+    def _job_record(self, entry):
+        """Job table fields of an entry. Caller holds the lock."""
+        state = entry['state']
+        return {
+            'key': self._job_key(entry),
+            'title': f"#{entry['index']} {entry['title']}",
+            'state': state,
+            'percent': 100.0 if state in ('done', 'skipped') else entry['percent'],
+            'speed': entry['speed'] if state == 'downloading' else 0.0,
+            'eta': entry.get('eta', ''),
+            'size': entry.get('size'),
+            'phase': entry.get('phase') or STATE_PHASES.get(state, ''),
+            'error': entry['error'],
+            'thumbnail': entry['thumbnail'],
+        }
+
+    def _sorted_entries(self):
+        with self._lock:
+            return [dict(self.entries[i]) for i in sorted(self.entries)]
+
+    def stats(self):
+        """
+        Aggregate progress across the playlist.
+
+        Returns:
+            dict: name, total, done, failed, skipped, active, paused (held back by
+            the scheduler), percent (0-100) and
+            speed (MB/s summed over running downloads)
+        """
+        with self._lock:
+            entries = list(self.entries.values())
+            total = max(self.total or 0, len(entries))
+        counts = {state: 0 for state in ('done', 'failed', 'skipped')}
+        active = 0
+        paused = 0
+        progress = 0.0
+        speed = 0.0
+        for entry in entries:
+            state = entry['state']
+            if state in counts:
+                counts[state] += 1
+                progress += 100.0
+            else:
+                progress += entry['percent']
+                if state in ('extracting', 'downloading', 'processing'):
+                    active += 1
+                elif state in ('waiting', 'paused'):
+                    paused += 1
+                if state == 'downloading':
+                    speed += entry['speed'] or 0.0
+        return {
+            'name': self.name,
+            'total': total,
+            'done': counts['done'],
+            'failed': counts['failed'],
+            'skipped': counts['skipped'],
+            'active': active,
+            'paused': paused,
+            'percent': progress / total if total else 0.0,
+            'speed': round(speed, 1),
+            'enumerating': not self.enumerated,
+        }
+
+    def _report(self, force=False):
+        """Send aggregated progress, at most a few times a second unless forced."""
+        now = time.monotonic()
+        if not force and now - self._last_report < 0.25:
+            return
+        self._last_report = now
+        with self._lock:
+            updates = [self._job_record(self.entries[index]) for index in sorted(self._dirty)]
+            self._dirty.clear()
+        if updates:
+            self.queue.put(("job_updates", updates))
+        self.queue.put(("playlist_progress", self.stats()))
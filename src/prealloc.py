@@ -0,0 +1,179 @@
+import os
+import sys
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Writes start and end on filesystem block boundaries
+ALIGNMENT = 4096
+# Large enough that a write is one sequential run on disk, small enough to keep per job
+BUFFER_SIZE = 1024 * 1024
+# Beside a file written with track=True: how many of its bytes hold data
+POSITION_SUFFIX = '.pos'
+
+
+def preallocate(fd, offset, length):
+    """
+    Reserve disk blocks for a file region before it is written.
+
+    Uses posix_fallocate where the OS and filesystem support it, so the
+    blocks are allocated in as few extents as possible up front. Elsewhere
+    the file is extended with ftruncate, which allocates on NTFS and at
+    least sets the final size (a sparse file) on other filesystems.
+
+    Args:
+        fd (int): Open file descriptor
+        offset (int): Start of the region
+        length (int): Bytes to reserve
+
+    Returns:
+        str: 'fallocate', 'truncate', or None if nothing could be reserved
+    """
+    if length <= 0:
+        return None
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, offset, length)
+            return 'fallocate'
+        except OSError as e:
+            # EOPNOTSUPP/EINVAL on filesystems without support (some SMB and FUSE mounts)
+            logger.debug(f"posix_fallocate unavailable ({e}), extending with ftruncate")
+    try:
+        if os.fstat(fd).st_size < offset + length:
+            os.ftruncate(fd, offset + length)
+        return 'truncate'
+    except OSError as e:
+        logger.debug(f"Could not preallocate: {e}")
+        return None
+
+
+def committed_size(path):
+    """
+    Bytes at the start of a file that hold written data.
+
+    A tracked file is preallocated ahead of its data, so until close()
+    cuts it its size says nothing: after a crash or kill it is mostly
+    zeros. The position recorded beside it is used instead. Untracked or
+    closed files are taken at their size.
+
+    Returns:
+        int: 0 if the file doesn't exist or its record can't be read
+    """
+    if not os.path.exists(path):
+        return 0
+    try:
+        size = os.path.getsize(path)
+        if not os.path.exists(path + POSITION_SUFFIX):
+            return size
+        with open(path + POSITION_SUFFIX, encoding='ascii') as f:
+            return min(int(f.read()), size)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not tell how much of {path} was written, starting over: {e}")
+        return 0
+
+
+def discard(path):
+    """Delete a file and its position record."""
+    for name in (path, path + POSITION_SUFFIX):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+
+class AlignedWriter:
+    """
+    Writes a file through a large buffer in block-aligned chunks.
+
+    The region from offset to total is preallocated when the size is known,
+    so concurrent downloads don't interleave their blocks on disk. Data is
+    collected until a whole aligned chunk can go out in one write. close()
+    writes the rest and truncates the file to what was actually written:
+    the final size on completion, or the resume point if the download
+    stopped early.
+
+    A process that is killed never gets to close(). With track=True the
+    position after every chunk is kept in a file beside it (see
+    committed_size()), so the resume point survives that too.
+    """
+
+    def __init__(self, path, offset=0, total=None, buffer_size=BUFFER_SIZE, allocate=True, track=False):
+        """
+        Args:
+            path (str): File to write; existing data before offset is kept
+            offset (int): Position to start writing at (the resume point)
+            total (int): Expected final size, if known
+            buffer_size (int): Chunk size, rounded to a multiple of ALIGNMENT
+            allocate (bool): Preallocate up to total
+            track (bool): Record the written position until close()
+        """
+        self.path = path
+        self.position = offset
+        self.buffer_size = max(ALIGNMENT, buffer_size // ALIGNMENT * ALIGNMENT)
+        self.buffer = bytearray(self.buffer_size)
+        self.filled = 0
+        self.position_path = path + POSITION_SUFFIX if track else None
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        self.fd = os.open(path, flags, 0o644)
+        # Recorded before the file grows, so a preallocated file always has a record
+        self._record_position()
+        self.allocation = None
+        if allocate and total:
+            self.allocation = preallocate(self.fd, offset, total - offset)
+        os.lseek(self.fd, offset, os.SEEK_SET)
+
+    def write(self, data):
+        """Buffer data, writing out every complete aligned chunk."""
+        data = memoryview(data)
+        while len(data):
+            # The first chunk after an unaligned resume point ends on a boundary
+            size = self.buffer_size - (self.position % ALIGNMENT)
+            n = min(size - self.filled, len(data))
+            self.buffer[self.filled:self.filled + n] = data[:n]
+            self.filled += n
+            data = data[n:]
+            if self.filled == size:
+                self._write(memoryview(self.buffer)[:size])
+                self.filled = 0
+
+    def close(self):
+        """Write what's left and cut the file to the bytes written."""
+        if self.fd is None:
+            return
+        try:
+            if self.filled:
+                self._write(memoryview(self.buffer)[:self.filled])
+                self.filled = 0
+            os.ftruncate(self.fd, self.position)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+        # The size is right again
+        if self.position_path and os.path.exists(self.position_path):
+            os.remove(self.position_path)
+
+    def _write(self, view):
+        while len(view):
+            written = os.write(self.fd, view)
+            self.position += written
+            view = view[written:]
+        self._record_position()
+
+    def _record_position(self):
+        if self.position_path is None:
+            return
+        temp_path = self.position_path + '.tmp'
+        with open(temp_path, 'w', encoding='ascii') as f:
+            f.write(str(self.position))
+        os.replace(temp_path, self.position_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import math
+import random
+import threading
+from urllib.parse import urlparse
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Routing history file path
+ROUTES_FILE = os.path.join(os.path.expanduser("~"), ".yt_downloader_routes.json")
+
+# Extraction paths the router knows about
+EXTRACTION_PATHS = ('ytdlp', 'phantom', 'direct')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class ExtractorRouter:
+    """
+    Learns which extraction path works best for each domain.
+
+    For every (domain, path) pair a sliding window of recent outcomes is
+    kept (success flag and latency). A new URL is routed to the path with
+    the lowest median latency among those that succeed often enough for
+    its domain. A small share of requests explores another path so that
+    stats stay fresh. Domains without history use the caller's default.
+    """
+
+    def __init__(self, routes_file=ROUTES_FILE, window=50, min_samples=3, min_success_rate=0.8,
+                 exploration=0.1, rng=None):
+        self.routes_file = routes_file
+        self.window = window
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+        self.exploration = exploration
+        self.rng = rng or random.Random()
+        self.history = {}  # domain -> path -> [[ok, latency_seconds], ...]
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def domain_of(url):
+        """Normalized host for a URL (lowercase, no port, no leading www.)."""
+        try:
+            host = (urlparse(url).hostname or "").lower()
+        except ValueError:
+            return ""
+        return host[4:] if host.startswith("www.") else host
+
+    def load(self):
+        """Load routing history from disk."""
+        try:
+            if os.path.exists(self.routes_file):
+                with open(self.routes_file, 'r') as f:
+                    self.history = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading routing history: {str(e)}")
+            self.history = {}
+
+    def save(self):
+        """Persist routing history to disk."""
+        # Concurrent records (hedged fetches) would otherwise write the same temp file
+        with self._lock:
+            tmp_file = self.routes_file + ".tmp"
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.history, f)
+                os.replace(tmp_file, self.routes_file)
+                return True
+            except Exception as e:
+                logger.error(f"Error saving routing history: {str(e)}")
+                return False
+
+    def record(self, url, path, success, latency):
+        """Record the outcome of one extraction attempt and persist it."""
+        domain = self.domain_of(url)
+        if not domain:
+            return
+        with self._lock:
+            outcomes = self.history.setdefault(domain, {}).setdefault(path, [])
+            outcomes.append([bool(success), round(float(latency), 4)])
+            del outcomes[:-self.window]
+        self.save()
+
+    def stats(self, url_or_domain):
+        """
+        Per-path stats for a domain.
+
+        Returns:
+            dict: path -> {samples, success_rate, p50, p95} (latencies of successes)
+        """
+        domain = self.domain_of(url_or_domain) if "://" in url_or_domain else url_or_domain
+        result = {}
+        with self._lock:
+            paths = dict(self.history.get(domain, {}))
+        for path, outcomes in paths.items():
+            latencies = [latency for ok, latency in outcomes if ok]
+            result[path] = {
+                'samples': len(outcomes),
+                'success_rate': len(latencies) / len(outcomes) if outcomes else 0.0,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+            }
+        return result
+
+    def choose(self, url, available=EXTRACTION_PATHS, default='ytdlp'):
+        """
+        Pick the extraction path for a URL.
+
+        Args:
+            url (str): The URL to route
+            available (tuple): Paths the caller can run
+            default (str): Path to use when the domain has no usable history
+
+        Returns:
+            str: The chosen path
+        """
+        available = list(available)
+        stats = self.stats(self.domain_of(url))
+
+        # Paths with enough history that succeed reliably, fastest first
+        proven = sorted(
+            (s['p50'], path) for path, s in stats.items()
+            if path in available and s['samples'] >= self.min_samples
+            and s['success_rate'] >= self.min_success_rate and s['p50'] is not None
+        )
+        best = proven[0][1] if proven else default
+
+        # Occasionally explore, favouring the least-sampled alternative
+        alternatives = [path for path in available if path != best]
+        if alternatives and self.rng.random() < self.exploration:
+            choice = min(alternatives, key=lambda p: (stats.get(p, {}).get('samples', 0), self.rng.random()))
+            logger.info(f"Routing {self.domain_of(url)} via {choice} (exploring, best is {best})")
+            return choice
+
+        logger.info(f"Routing {self.domain_of(url)} via {best}")
+        return best
@@ -0,0 +1,256 @@
+import sys
+import time
+import threading
+import subprocess
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Higher numbers win; a job only runs while no unpaused job outranks it
+PRIORITY_LOW = 0      # Batch work such as playlist entries
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2     # Downloads started from the main window
+PRIORITY_NAMES = {PRIORITY_LOW: "Low", PRIORITY_NORMAL: "Normal", PRIORITY_HIGH: "High"}
+
+
+def stop_process(process, timeout=3.0):
+    """
+    Terminate a process and wait for it to exit, killing it if it doesn't.
+
+    Returns as soon as the process is gone rather than sleeping for a fixed
+    time. Whatever yt-dlp has written stays in its .part file.
+
+    Args:
+        process: subprocess.Popen object (None is ignored)
+        timeout (float): Seconds to wait after terminate() before kill()
+    """
+    if process is None or process.poll() is not None:
+        return
+    try:
+        process.terminate()
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.info("yt-dlp did not exit after terminate, killing it")
+        process.kill()
+        process.wait()
+    except Exception as e:
+        logger.error(f"Error stopping process: {str(e)}")
+
+
+class Job:
+    """
+    A download known to the scheduler.
+
+    state is 'waiting' (queued behind a higher priority), 'running' or
+    'paused'. interrupted is set when the scheduler (or the bandwidth
+    governor, via restart()) stopped the process on purpose, so the owner
+    knows to run it again instead of treating the exit as a failure.
+    """
+
+    def __init__(self, scheduler, key, title, priority, group=None):
+        self.scheduler = scheduler
+        self.key = key
+        self.title = title
+        self.priority = priority
+        self.group = group
+        self.state = 'waiting'
+        self.paused = False
+        self.cancelled = False
+        self.interrupted = False
+        self.process = None
+        self.created = time.monotonic()
+
+    def restart(self, *_):
+        """Stop the running process so the owner starts it again (e.g. with a new rate)."""
+        self.scheduler._interrupt(self)
+
+    def snapshot(self):
+        return {
+            'key': self.key,
+            'title': self.title,
+            'priority': self.priority,
+            'state': self.state,
+        }
+
+
+class JobScheduler:
+    """
+    Runs downloads by priority, preempting lower-priority ones.
+
+    A job may run only while no other unpaused job has a higher priority.
+    When a higher-priority job arrives, lower ones are preempted: their
+    yt-dlp process is stopped and the job waits until it may run again,
+    at which point yt-dlp resumes from the .part file. Pausing works the
+    same way, except that the job waits for an explicit resume.
+
+    Owners drive their job with this loop:
+
+        job = scheduler.add(key, title, priority)
+        try:
+            while scheduler.wait_turn(job):
+                process = start yt-dlp
+                scheduler.attach(job, process)
+                process.wait()
+                if not scheduler.detach(job):
+                    break  # Finished (or failed) on its own
+        finally:
+            scheduler.remove(job)
+
+    Every change is published as ("jobs_changed", [snapshot, ...]) on the queue.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue
+        self.jobs = {}  # key -> Job
+        self._cond = threading.Condition(threading.RLock())  # Re-entrant so snapshot() works while waiting
+
+    def add(self, key, title, priority=PRIORITY_NORMAL, group=None):
+        """Register a job and preempt anything it outranks."""
+        with self._cond:
+            job = Job(self, key, title, priority, group)
+            self.jobs[key] = job
+            stops = self._reschedule()
+        logger.info(f"Job {key} added with {PRIORITY_NAMES.get(priority, priority)} priority")
+        self._stop(stops)
+        self._publish()
+        return job
+
+    def remove(self, job):
+        """Forget a finished job and let anything it held back run."""
+        with self._cond:
+            self.jobs.pop(job.key, None)
+            stops = self._reschedule()
+        self._stop(stops)
+        self._publish()
+
+    def may_run(self, job):
+        """Whether the job is allowed to run right now."""
+        with self._cond:
+            return self._may_run(job)
+
+    def wait_turn(self, job):
+        """
+        Block until the job may run.
+
+        Returns:
+            bool: True when the job should (re)start, False if it was cancelled
+        """
+        with self._cond:
+            while not job.cancelled and not self._may_run(job):
+                state = 'paused' if job.paused else 'waiting'
+                if job.state != state:
+                    job.state = state
+                    self._publish()
+                self._cond.wait()
+            if job.cancelled:
+                return False
+            job.state = 'running'
+            job.interrupted = False
+        self._publish()
+        return True
+
+    def attach(self, job, process):
+        """Record the job's process; stops it at once if the job lost its turn meanwhile."""
+        with self._cond:
+            job.process = process
+            stop = job.cancelled or not self._may_run(job)
+            if stop and not job.cancelled:
+                job.interrupted = True
+        if stop:
+            stop_process(process)
+
+    def detach(self, job):
+        """
+        Clear the job's process after it exited.
+
+        Returns:
+            bool: True if the scheduler stopped it and it should be run again
+        """
+        with self._cond:
+            job.process = None
+            restart = job.interrupted and not job.cancelled
+            job.interrupted = False
+            return restart
+
+    def pause(self, key):
+        """Stop a job's process and hold it until resume()."""
+        return self._change(key, paused=True)
+
+    def resume(self, key):
+        """Let a paused job continue from where it stopped."""
+        return self._change(key, paused=False)
+
+    def set_priority(self, key, priority):
+        """Change a job's priority, preempting or releasing other jobs as needed."""
+        return self._change(key, priority=priority)
+
+    def cancel(self, key=None, group=None):
+        """Cancel one job, or every job in a group; waiting jobs give up their turn."""
+        with self._cond:
+            jobs = [job for job in self.jobs.values()
+                    if (key is not None and job.key == key) or (group is not None and job.group == group)]
+            for job in jobs:
+                job.cancelled = True
+            processes = [job.process for job in jobs if job.process]
+            self._cond.notify_all()
+        self._stop(processes)
+        return bool(jobs)
+
+    def snapshot(self):
+        """All jobs, highest priority and oldest first."""
+        with self._cond:
+            jobs = sorted(self.jobs.values(), key=lambda job: (-job.priority, job.created))
+            return [job.snapshot() for job in jobs]
+
+    def _change(self, key, **changes):
+        with self._cond:
+            job = self.jobs.get(key)
+            if job is None:
+                return False
+            for name, value in changes.items():
+                setattr(job, name, value)
+            stops = self._reschedule()
+        logger.info(f"Job {key} updated: {changes}")
+        self._stop(stops)
+        self._publish()
+        return True
+
+    def _may_run(self, job):
+        """Caller holds the lock."""
+        if job.paused:
+            return False
+        top = max((other.priority for other in self.jobs.values()
+                   if not other.paused and not other.cancelled), default=job.priority)
+        return job.priority >= top
+
+    def _reschedule(self):
+        """Mark running jobs that lost their turn and wake waiting ones. Caller holds the lock."""
+        stops = []
+        for job in self.jobs.values():
+            if job.process is not None and not job.cancelled and not self._may_run(job):
+                job.interrupted = True
+                stops.append(job.process)
+        self._cond.notify_all()
+        return stops
+
+    def _interrupt(self, job):
+        with self._cond:
+            process = job.process
+            if process is None or job.cancelled:
+                return
+            job.interrupted = True
+        self._stop([process])
+
+    def _stop(self, processes):
+        # Stopping can take a moment; never make the caller (often the GUI thread) wait for it
+        for process in processes:
+            threading.Thread(target=stop_process, args=(process,), daemon=True).start()
+
+    def _publish(self):
+        if self.queue is not None:
+            self.queue.put(("jobs_changed", self.snapshot()))
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import hashlib
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# One instance per user: the name is derived from the home folder
+SERVER_NAME = "adm-video-downloader-" + hashlib.sha1(os.path.expanduser("~").encode('utf-8')).hexdigest()[:12]
+# A running instance answers in well under this; past it the launch starts its own window
+FORWARD_TIMEOUT_MS = 500
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def _absolute(argument):
+    """Arguments that are files on disk as absolute paths (the running instance has another cwd)."""
+    return os.path.abspath(argument) if os.path.exists(argument) else argument
+
+
+def send_to_running_instance(arguments, server_name=SERVER_NAME, timeout_ms=FORWARD_TIMEOUT_MS):
+    """
+    Hand command line URLs and files to an instance that is already running.
+
+    Needs no QApplication, so a second launch can exit before loading the
+    GUI or the downloader.
+
+    Args:
+        arguments (list): URLs and URL list files; empty to just bring the window up
+        server_name (str): Local socket name
+        timeout_ms (int): How long each step may take
+
+    Returns:
+        bool: True if the running instance took them
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(timeout_ms):
+        return False
+    try:
+        socket.write(json.dumps([_absolute(argument) for argument in arguments]).encode('utf-8') + b'\n')
+        if not socket.waitForBytesWritten(timeout_ms):
+            return False
+        # The one-byte answer means the arguments were read
+        return socket.waitForReadyRead(timeout_ms) and bytes(socket.read(1)) == b'1'
+    finally:
+        socket.abort()
+
+
+def _is_answering(server_name, timeout_ms=FORWARD_TIMEOUT_MS):
+    """Whether a running instance accepts connections on the name."""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    try:
+        return socket.waitForConnected(timeout_ms)
+    finally:
+        socket.abort()
+
+
+class InstanceServer(QObject):
+    """
+    Listens for later launches of the application.
+
+    arguments_received is emitted on the GUI thread with the list of URLs
+    and files a later launch was started with.
+    """
+
+    arguments_received = pyqtSignal(list)
+
+    def __init__(self, parent=None, server_name=SERVER_NAME):
+        super().__init__(parent)
+        self.server_name = server_name
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+
+    def listen(self):
+        """
+        Start listening, unless another instance already does.
+
+        A name that accepts connections belongs to a live instance, even if
+        it was too busy to take a launch's arguments in time, and is left to
+        it: on Unix listening again would replace its socket. Only a name
+        nothing answers on, left behind by a crashed instance, is removed.
+
+        Returns:
+            bool: False if another instance has the name or it could not be taken
+        """
+        if _is_answering(self.server_name):
+            logger.warning("Another instance is listening; later launches go to it")
+            return False
+        if self.server.listen(self.server_name):
+            return True
+        if self.server.serverError() == QAbstractSocket.AddressInUseError and not _is_answering(self.server_name):
+            QLocalServer.removeServer(self.server_name)
+            if self.server.listen(self.server_name):
+                return True
+        logger.error(f"Single instance server not started: {self.server.errorString()}")
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b''
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_ready_read(self, socket):
+        data = self._buffers.get(socket, b'') + bytes(socket.readAll())
+        if b'\n' not in data:
+            if len(data) > MAX_MESSAGE_BYTES:
+                socket.abort()
+            else:
+                self._buffers[socket] = data
+            return
+        self._buffers.pop(socket, None)
+        try:
+            arguments = [str(argument) for argument in json.loads(data.split(b'\n', 1)[0])]
+        except (ValueError, TypeError) as e:
+            logger.error(f"Bad message from a new launch: {str(e)}")
+            socket.abort()
+            return
+        socket.write(b'1')
+        socket.flush()
+        socket.disconnectFromServer()
+        logger.info(f"New launch handed over {len(arguments)} argument(s)")
+        self.arguments_received.emit(arguments)
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
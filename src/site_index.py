@@ -0,0 +1,424 @@
+"""
+URL classification against the sites yt-dlp supports.
+
+classify_url() maps a URL to the extractor yt-dlp would use for it, the
+video id that extractor reads from the URL, and whether the site is
+supported, without starting yt-dlp. It works from assets/site_index.json:
+for every extractor listed in supportedSites.md, its URL patterns and the
+domains they accept. The domains go into a trie keyed by reversed host
+labels (com -> youtube -> www), so a lookup touches only the extractors
+for that host, and only their patterns are run, compiled once on first use.
+
+The index is generated from a yt-dlp checkout whenever supportedSites.md
+changes:
+
+    python src/site_index.py --build [--ytdlp PATH]
+"""
+
+import os
+import re
+import sys
+import json
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import resource_path, logger
+else:
+    # Running directly as .py
+    from utils import resource_path, logger
+
+INDEX_FILE = os.path.join('assets', 'site_index.json')
+SUPPORTED_SITES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'supportedSites.md')
+
+# Trie node key holding the extractors of a domain (labels are never empty)
+EXTRACTORS = ''
+# Domain label standing for any one label, as in dailymotion.*
+WILDCARD_LABEL = '*'
+
+SiteMatch = namedtuple('SiteMatch', 'extractor key id supported')
+SiteMatch.__doc__ = """
+Classification of a URL.
+
+    extractor: yt-dlp extractor name (e.g. 'youtube'), or None if none matches
+    key: extractor key as yt-dlp writes it to the download archive (e.g. 'Youtube')
+    id: video (or playlist) id taken from the URL, or None
+    supported: an extractor matches and the site is not marked broken
+"""
+UNSUPPORTED = SiteMatch(None, None, None, False)
+
+
+def host_of(url):
+    """Lower-cased host name of a URL, without port or trailing dot ('' if there is none)."""
+    try:
+        host = urlsplit(url.strip()).hostname or ''
+    except ValueError:
+        return ''
+    return host.rstrip('.')
+
+
+class SiteIndex:
+    """Reversed-domain trie over the extractors of a site_index.json."""
+
+    def __init__(self, data):
+        """
+        Args:
+            data (dict): Parsed site_index.json
+        """
+        self.version = data.get('version')
+        self.extractors = data.get('extractors', [])
+        self.positions = {extractor['name']: position for position, extractor in enumerate(self.extractors)}
+        self._compiled = [None] * len(self.extractors)
+        self.trie = {}
+        for position, extractor in enumerate(self.extractors):
+            for domain in extractor['domains']:
+                node = self.trie
+                for label in reversed(domain.split('.')):
+                    node = node.setdefault(label, {})
+                node.setdefault(EXTRACTORS, []).append(position)
+
+    @classmethod
+    def load(cls, path=None):
+        """Index from a site_index.json file (the bundled one by default)."""
+        with open(path or resource_path(INDEX_FILE), encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def candidates(self, host):
+        """Positions of the extractors registered for host or any parent domain, in yt-dlp's order."""
+        found = set()
+        nodes = [self.trie]
+        for label in reversed(host.split('.')):
+            nodes = [child for node in nodes for child in (node.get(label), node.get(WILDCARD_LABEL)) if child]
+            if not nodes:
+                break
+            for node in nodes:
+                found.update(node.get(EXTRACTORS, ()))
+        return sorted(found)  # yt-dlp takes the first suitable extractor in its own order
+
+    def _patterns(self, position):
+        patterns = self._compiled[position]
+        if patterns is None:
+            patterns = self._compiled[position] = [re.compile(pattern)
+                                                   for pattern in self.extractors[position]['patterns']]
+        return patterns
+
+    def classify(self, url):
+        """
+        Classify a URL.
+
+        Returns:
+            SiteMatch: UNSUPPORTED if no extractor's pattern matches
+        """
+        url = url.strip()
+        host = host_of(url)
+        if not host:
+            return UNSUPPORTED
+        for position in self.candidates(host):
+            match = self._match(position, url)
+            if match is None:
+                continue
+            extractor = self.extractors[position]
+            if any(self._match(self.positions[name], url) for name in extractor.get('defer', ())):
+                continue  # A more specific extractor takes this URL
+            return SiteMatch(extractor['name'], extractor['key'], match.groupdict().get('id'),
+                             not extractor.get('broken'))
+        return UNSUPPORTED
+
+    def _match(self, position, url):
+        for pattern in self._patterns(position):
+            match = pattern.match(url)
+            if match:
+                return match
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_site_index():
+    """The bundled index, loaded on first use; an empty index if the file is missing."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = SiteIndex.load()
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not load site index: {str(e)}")
+                    _index = SiteIndex({})
+    return _index
+
+
+def classify_url(url):
+    """Classify a URL with the bundled index (see SiteIndex.classify)."""
+    return get_site_index().classify(url)
+
+
+def is_supported_url(url):
+    """Whether yt-dlp has a working extractor for the URL."""
+    return classify_url(url).supported
+
+
+# Building the index -----------------------------------------------------------
+
+# Stands in for any part of a pattern that can't be spelled out
+WILDCARD = '\x00'
+# Give up spelling out one pattern's hosts beyond this many variants
+MAX_VARIANTS = 4096
+# Character classes up to this size (after lower-casing) are spelled out
+MAX_CLASS = 3
+HOST_LABEL = re.compile(r'^(?:[a-z0-9_](?:[a-z0-9_-]*[a-z0-9_])?)$')
+# A '/' that isn't part of ://
+SCHEMELESS_HOST_END = re.compile(r'[^:/]/')
+SITE_LINE = re.compile(r'^ - \*\*(?P<name>.+?)\*\*(?::\s*(?P<description>.*))?$')
+
+
+class _TooManyVariants(Exception):
+    pass
+
+
+def read_supported_sites(path=SUPPORTED_SITES):
+    """
+    Extractor names listed in supportedSites.md.
+
+    Returns:
+        dict: name -> True if the site is marked as currently broken
+    """
+    sites = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            match = SITE_LINE.match(line.rstrip())
+            if match:
+                name = match.group('name').replace('​', '')
+                sites[name] = 'Currently broken' in (match.group('description') or '')
+    return sites
+
+
+def _host_end(text):
+    """Index just past the '/' ending the host part of a spelled-out URL, or -1 if it isn't reached yet."""
+    start = text.find('//')
+    if start < 0:
+        # Patterns with an optional scheme also match youtube.com/watch...
+        match = SCHEMELESS_HOST_END.search(text)
+        return match.end() if match else -1
+    end = text.find('/', start + 2)
+    return end + 1 if end >= 0 else -1
+
+
+def _join(prefixes, suffixes):
+    variants = set()
+    for prefix in prefixes:
+        if _host_end(prefix) >= 0:
+            variants.add(prefix)
+            continue
+        for suffix in suffixes:
+            text = (prefix + suffix).replace(WILDCARD + WILDCARD, WILDCARD)
+            end = _host_end(text)
+            variants.add(text[:end] if end >= 0 else text)
+            if len(variants) > MAX_VARIANTS:
+                raise _TooManyVariants()
+    return variants
+
+
+def _spell(items, constants, prefixes=frozenset({''})):
+    """
+    Every string a parsed regex can match, as far as the host part of a URL.
+
+    Spelling continues from each of prefixes and stops once a string gets
+    past the host. Anything that can't be spelled out (an open character
+    class, an unbounded repeat) becomes WILDCARD; literals are lower-cased
+    since host names are case-insensitive.
+    """
+    variants = set(prefixes)
+    for op, av in items:
+        if op is constants.LITERAL:
+            variants = _join(variants, {chr(av).lower()})
+        elif op is constants.ANY:
+            # An unescaped dot in a pattern's host part means a dot
+            variants = _join(variants, {'.'})
+        elif op is constants.IN:
+            chars = set()
+            for item_op, item_av in av:
+                if item_op is constants.LITERAL:
+                    chars.add(chr(item_av).lower())
+                elif item_op is constants.RANGE and item_av[1] - item_av[0] < MAX_CLASS * 2:
+                    chars.update(chr(c).lower() for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    chars = None
+                    break
+            variants = _join(variants, chars if chars and len(chars) <= MAX_CLASS else {WILDCARD})
+        elif op is constants.SUBPATTERN:
+            variants = _spell(av[-1], constants, variants)
+        elif op is constants.BRANCH:
+            variants = set().union(*(_spell(branch, constants, variants) for branch in av[1]))
+        elif op in (constants.MAX_REPEAT, constants.MIN_REPEAT, getattr(constants, 'POSSESSIVE_REPEAT', None)):
+            low, high, sub = av
+            if high == 1:
+                variants = _spell(sub, constants, variants) | (variants if low == 0 else set())
+            else:
+                # Repeated labels such as (?:[a-z]+\.)* still end in a dot
+                try:
+                    dotted = all(text.endswith('.') for text in _spell(sub, constants))
+                except _TooManyVariants:
+                    dotted = False
+                if low:
+                    # X+ is X followed by X*: spell the first one, as in /+ after the host
+                    variants = _spell(sub, constants, variants)
+                variants = _join(variants, {WILDCARD + '.' if dotted else WILDCARD, ''})
+        elif op not in (constants.AT, constants.ASSERT, constants.ASSERT_NOT):
+            variants = _join(variants, {WILDCARD})
+        if len(variants) > MAX_VARIANTS:
+            raise _TooManyVariants()
+    return variants
+
+
+def pattern_domains(pattern):
+    """
+    Domains a yt-dlp URL pattern accepts.
+
+    Subdomains a pattern leaves open (such as (?:[^/]+\\.)?example\\.com)
+    are dropped, since every subdomain of a registered domain is looked up
+    anyway. A label that is open as a whole, typically the top-level
+    domain in example\\.[a-z]{2,3}, becomes WILDCARD_LABEL. Patterns too
+    open to spell out, or without a fixed domain, give nothing.
+    """
+    try:
+        from re import _parser as parser, _constants as constants
+    except ImportError:  # Python < 3.11
+        import sre_parse as parser
+        import sre_constants as constants
+    try:
+        variants = _spell(parser.parse(pattern), constants)
+    except (_TooManyVariants, re.error, RecursionError):
+        return set()
+
+    domains = set()
+    for text in variants:
+        start = text.find('//')
+        host = re.split(r'[/?#]', text[start + 2:] if start >= 0 else text, maxsplit=1)[0]
+        host = host.rsplit('@', 1)[-1].split(':')[0]
+        labels = []
+        for label in reversed(host.split('.')):
+            if label == WILDCARD:
+                labels.append(WILDCARD_LABEL)
+            elif HOST_LABEL.match(label):
+                labels.append(label)
+            else:
+                break  # Open to the left of here
+        while labels and labels[-1] == WILDCARD_LABEL:
+            labels.pop()
+        concrete = [label for label in labels if label != WILDCARD_LABEL]
+        # A bare top-level domain or an IP address is no site
+        if not concrete or labels[0].isdigit() or (labels[0] != WILDCARD_LABEL and len(concrete) < 2):
+            continue
+        domains.add('.'.join(reversed(labels)))
+    return domains
+
+
+def build_index(sites, extractor_classes, version=None):
+    """
+    Index data for the listed sites.
+
+    Args:
+        sites (dict): read_supported_sites() output
+        extractor_classes: yt-dlp extractor classes in yt-dlp's order
+        version (str): yt-dlp version, stored for reference
+
+    Returns:
+        tuple: (index dict, names in sites that no extractor has)
+    """
+    listed = {name.lower(): name for name in sites}
+    extractors = []
+    found = set()
+    for ie in extractor_classes:
+        name = ie.IE_NAME
+        site = listed.get(name.lower())
+        if site is None or name == 'generic':
+            continue
+        found.add(site)
+        patterns = getattr(ie, '_VALID_URL', None)
+        if not patterns:
+            continue
+        patterns = [patterns] if isinstance(patterns, str) else list(patterns)
+        domains = set()
+        for pattern in patterns:
+            domains |= pattern_domains(pattern)
+        if not domains:
+            continue  # Search keywords and embed-only extractors; no host to find them by
+        defer = _deferrals(ie)
+        extractors.append({
+            'name': name,
+            'key': ie.ie_key(),
+            'patterns': patterns,
+            'domains': sorted(domains),
+            **({'defer': defer} if defer else {}),
+            **({'broken': True} if sites[site] else {}),
+        })
+    names = {extractor['name'] for extractor in extractors}
+    for extractor in extractors:
+        if 'defer' in extractor:
+            extractor['defer'] = [name for name in extractor['defer'] if name in names] or None
+            if not extractor['defer']:
+                del extractor['defer']
+    return {'version': version, 'extractors': extractors}, sorted(set(sites) - found)
+
+
+def _deferrals(ie):
+    """
+    Extractors that ie steps aside for.
+
+    Many extractors override suitable() to return False when a more
+    specific one, named in it, accepts the URL; the classifier repeats
+    that check with the other extractor's patterns.
+    """
+    import inspect
+    real = getattr(ie, 'real_class', ie)
+    suitable = vars(real).get('suitable')
+    if suitable is None:
+        return []
+    try:
+        source = inspect.getsource(getattr(suitable, '__func__', suitable))
+    except (OSError, TypeError):
+        return []
+    module = sys.modules[real.__module__]
+    deferred = []
+    for class_name in re.findall(r'\b(\w+IE)\b', source):
+        other = getattr(module, class_name, None)
+        # Skip the class itself and its bases (super() calls)
+        if isinstance(other, type) and not issubclass(real, other) and other.IE_NAME not in deferred:
+            deferred.append(other.IE_NAME)
+    return deferred
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate assets/site_index.json from supportedSites.md")
+    parser.add_argument('--build', action='store_true', help="Build the index")
+    parser.add_argument('--ytdlp', help="Folder containing the yt_dlp package (default: the installed one)")
+    parser.add_argument('--sites', default=SUPPORTED_SITES, help="supportedSites.md to read")
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), INDEX_FILE))
+    args = parser.parse_args()
+    if not args.build:
+        parser.print_help()
+        return
+
+    if args.ytdlp:
+        sys.path.insert(0, args.ytdlp)
+    from yt_dlp.extractor import gen_extractor_classes
+    from yt_dlp.version import __version__
+
+    index, missing = build_index(read_supported_sites(args.sites), gen_extractor_classes(), __version__)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"{len(index['extractors'])} extractors with URL patterns written to {args.output}")
+    if missing:
+        print(f"{len(missing)} listed sites not in yt-dlp {__version__}: {', '.join(missing[:20])}"
+              f"{' ...' if len(missing) > 20 else ''}")
+
+
+if __name__ == '__main__':
+    main()
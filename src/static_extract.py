@@ -0,0 +1,194 @@
+import re
+import sys
+import json
+import time
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import urllib3
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from media_probe import USER_AGENT
+else:
+    # Running directly as .py
+    from utils import logger
+    from media_probe import USER_AGENT
+
+# Stop reading a page after this many bytes even if nothing was found
+MAX_HTML_BYTES = 2 * 1048576
+CHUNK_SIZE = 16384
+
+VIDEO_META = ('og:video', 'og:video:url', 'og:video:secure_url', 'twitter:player:stream')
+AUDIO_META = ('og:audio', 'og:audio:url', 'og:audio:secure_url')
+
+# Manifest URLs inside inline scripts, including JSON-escaped slashes
+INLINE_MANIFEST = re.compile(r'https?:(?:\\?/){2}[^\s"\'<>]+?\.(?:m3u8|mpd)(?:\?[^\s"\'<>\\]*)?', re.IGNORECASE)
+
+
+class _MediaParser(HTMLParser):
+    """Collects media URLs from tags, meta properties and JSON-LD as HTML is fed in."""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = None
+        self.video_urls = []
+        self.audio_urls = []
+        self.strong = False  # Found media from markup meant to describe it, not just a guess
+        self._media_tag = None
+        self._jsonld = None
+        self._in_title = False
+
+    def _add(self, url, audio=False, strong=True):
+        if not url or url.startswith(('blob:', 'data:')):
+            return
+        url = urljoin(self.base_url, url.strip())
+        target = self.audio_urls if audio else self.video_urls
+        if url not in target:
+            target.append(url)
+        self.strong = self.strong or strong
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            prop = (attrs.get('property') or attrs.get('name') or '').lower()
+            if prop in VIDEO_META:
+                self._add(attrs.get('content'))
+            elif prop in AUDIO_META:
+                self._add(attrs.get('content'), audio=True)
+            elif prop == 'og:title' and attrs.get('content'):
+                self.title = attrs['content'].strip()
+        elif tag in ('video', 'audio'):
+            self._media_tag = tag
+            self._add(attrs.get('src'), audio=tag == 'audio')
+        elif tag == 'source' and self._media_tag:
+            self._add(attrs.get('src'), audio=self._media_tag == 'audio')
+        elif tag == 'script' and (attrs.get('type') or '').lower() == 'application/ld+json':
+            self._jsonld = []
+        elif tag == 'title' and self.title is None:
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == self._media_tag:
+            self._media_tag = None
+        elif tag == 'script' and self._jsonld is not None:
+            self._parse_jsonld(''.join(self._jsonld))
+            self._jsonld = None
+        elif tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._jsonld is not None:
+            self._jsonld.append(data)
+        elif self._in_title and data.strip():
+            self.title = data.strip()
+
+    def _parse_jsonld(self, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                node_type = node.get('@type')
+                types = node_type if isinstance(node_type, list) else [node_type]
+                if 'VideoObject' in types or 'AudioObject' in types:
+                    content_url = node.get('contentUrl')
+                    if isinstance(content_url, str):
+                        self._add(content_url, audio='AudioObject' in types)
+                    if not self.title and isinstance(node.get('name'), str):
+                        self.title = node['name'].strip()
+                stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+
+
+class StaticExtractor:
+    """
+    Finds media in a page's static HTML without rendering it.
+
+    The page is fetched once and streamed through an incremental parser
+    looking for og:video/og:audio, JSON-LD VideoObject/AudioObject,
+    <video>/<audio>/<source> tags and manifest URLs in inline scripts.
+    Reading stops as soon as markup describing the media is found.
+    """
+
+    def __init__(self, http=None, timeout=10, max_bytes=MAX_HTML_BYTES):
+        self.max_bytes = max_bytes
+        self.http = http or urllib3.PoolManager(headers={'User-Agent': USER_AGENT})
+        self.timeout = urllib3.Timeout(connect=5, read=timeout)
+
+    def extract_media_urls(self, url):
+        """
+        Fetch a page and collect media URLs from its HTML.
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            dict: title, videoUrls, audioUrls, bytesRead, elapsedMs and
+            error (if the page could not be fetched or is not HTML)
+        """
+        started = time.perf_counter()
+        result = {'title': None, 'videoUrls': [], 'audioUrls': [], 'bytesRead': 0, 'elapsedMs': 0, 'error': None}
+        response = None
+        try:
+            response = self.http.request('GET', url, preload_content=False, redirect=True,
+                                         timeout=self.timeout, headers={'Accept': 'text/html,*/*;q=0.5'})
+            content_type = response.headers.get('Content-Type', '')
+            if response.status >= 400:
+                result['error'] = f"HTTP {response.status}"
+                return result
+            if 'html' not in content_type.lower():
+                result['error'] = f"Not an HTML page ({content_type or 'no content type'})"
+                return result
+
+            charset = re.search(r'charset=([\w-]+)', content_type)
+            try:
+                decoder = codecs.getincrementaldecoder(charset.group(1) if charset else 'utf-8')(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+            parser = _MediaParser(urljoin(url, response.geturl() or url))
+            tail = window = ''
+            for chunk in response.stream(CHUNK_SIZE):
+                result['bytesRead'] += len(chunk)
+                text = decoder.decode(chunk)
+                parser.feed(text)
+                # Overlap chunks so a manifest URL split across them is still seen
+                window = tail + text
+                for match in INLINE_MANIFEST.finditer(window):
+                    if match.end() < len(window):  # May still be cut off; the next pass sees it whole
+                        parser._add(match.group(0).replace('\\/', '/'), strong=False)
+                tail = text[-512:]
+                if parser.strong or result['bytesRead'] >= self.max_bytes:
+                    break
+            else:
+                # The page ended, so a match running to the end of the last chunk is complete
+                window += decoder.decode(b'', final=True)
+                for match in INLINE_MANIFEST.finditer(window):
+                    if match.end() == len(window):
+                        parser._add(match.group(0).replace('\\/', '/'), strong=False)
+
+            result['title'] = parser.title
+            result['videoUrls'] = parser.video_urls
+            result['audioUrls'] = parser.audio_urls
+        except Exception as e:
+            logger.warning(f"Static extraction failed for {url}: {str(e)}")
+            result['error'] = str(e)
+        finally:
+            if response is not None:
+                # A page abandoned mid-body can't go back to the pool for reuse
+                if not response.isclosed():
+                    response.close()
+                response.release_conn()
+            result['elapsedMs'] = int((time.perf_counter() - started) * 1000)
+        logger.info(f"Static extraction of {url}: {len(result['videoUrls'])} video, "
+                    f"{len(result['audioUrls'])} audio in {result['elapsedMs']} ms ({result['bytesRead']} bytes)")
+        return result
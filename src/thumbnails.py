@@ -0,0 +1,65 @@
+import os
+import sys
+import hashlib
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Resized thumbnails are kept here between runs
+THUMBNAIL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".yt_downloader_thumbnails")
+# Pick the smallest thumbnail at least this wide; the cache stores them scaled to fit CACHE_SIZE
+THUMBNAIL_WIDTH = 320
+CACHE_SIZE = (320, 180)
+# The cache folder is trimmed to this size, least recently used first
+CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+
+def pick_thumbnail(info, width=THUMBNAIL_WIDTH):
+    """
+    URL of the thumbnail to show for a --dump-json (or --flat-playlist) entry.
+
+    yt-dlp lists thumbnails worst first. The smallest one at least width
+    pixels wide is taken, so a list row doesn't download a full-size
+    poster; without sizes, the best one (or the single 'thumbnail') is.
+
+    Returns:
+        str: Thumbnail URL, or None if the entry has none
+    """
+    thumbnails = [t for t in info.get('thumbnails') or [] if t.get('url', '').startswith(('http://', 'https://'))]
+    sized = [t for t in thumbnails if t.get('width')]
+    wide_enough = [t for t in sized if t['width'] >= width]
+    if wide_enough:
+        return min(wide_enough, key=lambda t: t['width'])['url']
+    if sized:
+        return max(sized, key=lambda t: t['width'])['url']
+    if thumbnails:
+        return thumbnails[-1]['url']
+    return info.get('thumbnail')
+
+
+def cache_path(url, extension, folder=THUMBNAIL_CACHE_DIR):
+    """File a thumbnail URL is cached in."""
+    return os.path.join(folder, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.' + extension)
+
+
+def prune_cache(folder=THUMBNAIL_CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """Delete the least recently used cached thumbnails until the folder fits in max_bytes."""
+    try:
+        files = [entry for entry in os.scandir(folder) if entry.is_file()]
+    except OSError:
+        return
+    stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in files]
+    total = sum(size for _, size, _ in stats)
+    for _, size, path in sorted(stats):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError as e:
+            logger.error(f"Could not remove cached thumbnail {path}: {str(e)}")
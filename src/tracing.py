@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import threading
+import itertools
+from collections import deque
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+else:
+    # Running directly as .py
+    from utils import logger
+
+# Trace file path (Chrome / Perfetto "JSON Object Format")
+TRACE_FILE = os.path.join(os.path.expanduser("~"), ".yt_downloader_trace.json")
+
+# Upper bound on buffered events so a long session can't grow without limit
+MAX_TRACE_EVENTS = 50000
+
+
+class Span:
+    """
+    A single timed span on a job's track.
+
+    Spans are written as Chrome "complete" events (ph "X") when they end.
+    They can be used as context managers or ended explicitly with end().
+    """
+
+    def __init__(self, tracer, name, job_id, parent=None, args=None):
+        self.tracer = tracer
+        self.name = name
+        self.job_id = job_id
+        self.parent = parent
+        self.args = dict(args or {})
+        self.span_id = next(tracer._span_ids)
+        self.start = tracer._now()
+        self.ended = False
+
+    def set(self, **args):
+        """Attach extra arguments to the span before it ends."""
+        self.args.update(args)
+
+    def end(self, **args):
+        """End the span and record it. Ending twice is a no-op."""
+        if self.ended:
+            return
+        self.ended = True
+        self.args.update(args)
+        self.tracer._record_span(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = f"{exc_type.__name__}: {exc}"
+        self.end()
+        return False
+
+
+class PhaseTracker:
+    """
+    Keeps exactly one open child span for the current phase of a job.
+
+    Entering a new phase ends the previous one, so output callbacks can
+    simply report "we are now merging" without tracking span objects.
+    """
+
+    def __init__(self, tracer, job_id, parent=None):
+        self.tracer = tracer
+        self.job_id = job_id
+        self.parent = parent
+        self.current = None
+        self._lock = threading.Lock()
+
+    def enter(self, name, **args):
+        """Close the current phase (if any) and open a new one."""
+        with self._lock:
+            if self.current is not None:
+                self.current.end()
+            self.current = self.tracer.start_span(name, self.job_id, parent=self.parent, **args)
+            return self.current
+
+    def close(self, **args):
+        """Close the current phase (if any)."""
+        with self._lock:
+            if self.current is not None:
+                self.current.end(**args)
+                self.current = None
+
+
+class Tracer:
+    """
+    Collects per-job spans and writes them as a Chrome trace file.
+
+    Each job gets its own track (tid) so a trace viewer shows the job's
+    phases stacked under its root span. The file can be opened in
+    chrome://tracing or ui.perfetto.dev.
+    """
+
+    def __init__(self, trace_file=TRACE_FILE, enabled=False, max_events=MAX_TRACE_EVENTS):
+        self.trace_file = trace_file
+        self.enabled = enabled
+        self.pid = os.getpid()
+        self._events = deque()
+        self._max_events = max_events
+        # Track names by job id, dropped with the job's last buffered event
+        self._metadata = {}
+        self._event_counts = {}
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+        self._span_ids = itertools.count(1)
+        self._origin = time.perf_counter()
+
+    def _now(self):
+        """Current timestamp in microseconds since the tracer was created."""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def new_job(self, label):
+        """Allocate a track for a new job and return its id."""
+        job_id = next(self._job_ids)
+        if self.enabled:
+            with self._lock:
+                self._metadata[job_id] = {
+                    'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': job_id,
+                    'args': {'name': f"job {job_id}: {label}"[:120]}
+                }
+                # Past the cap, drop the oldest job that has no buffered events
+                if len(self._metadata) > self._max_events:
+                    idle = next(tid for tid in self._metadata if tid not in self._event_counts)
+                    del self._metadata[idle]
+        return job_id
+
+    def start_span(self, name, job_id, parent=None, **args):
+        """Start a span on the job's track. Call end() on the result."""
+        return Span(self, name, job_id, parent=parent, args=args)
+
+    def span(self, name, job_id, parent=None, **args):
+        """Context-manager form of start_span()."""
+        return self.start_span(name, job_id, parent=parent, **args)
+
+    def instant(self, name, job_id, **args):
+        """Record a zero-duration marker on the job's track."""
+        if not self.enabled:
+            return
+        event = {
+            'name': name, 'ph': 'i', 's': 't', 'pid': self.pid, 'tid': job_id,
+            'ts': self._now(), 'args': args
+        }
+        self._append(event)
+
+    def _record_span(self, span):
+        if not self.enabled:
+            return
+        args = dict(span.args)
+        args['span_id'] = span.span_id
+        if span.parent is not None:
+            args['parent_id'] = span.parent.span_id
+            args['parent'] = span.parent.name
+        event = {
+            'name': span.name, 'cat': 'job', 'ph': 'X', 'pid': self.pid, 'tid': span.job_id,
+            'ts': span.start, 'dur': max(self._now() - span.start, 0), 'args': args
+        }
+        self._append(event)
+
+    def _append(self, event):
+        """Buffer an event, evicting the oldest (and its job's track name once unused)."""
+        job_id = event['tid']
+        with self._lock:
+            self._events.append(event)
+            self._event_counts[job_id] = self._event_counts.get(job_id, 0) + 1
+            while len(self._events) > self._max_events:
+                evicted = self._events.popleft()['tid']
+                remaining = self._event_counts.get(evicted, 0) - 1
+                if remaining > 0:
+                    self._event_counts[evicted] = remaining
+                else:
+                    self._event_counts.pop(evicted, None)
+                    self._metadata.pop(evicted, None)
+
+    def flush(self):
+        """Write all buffered events to the trace file (once, at shutdown)."""
+        if not self.enabled or not self._events:
+            return False
+        with self._lock:
+            events = list(self._metadata.values()) + list(self._events)
+        tmp_file = self.trace_file + ".tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+            os.replace(tmp_file, self.trace_file)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not write trace file: {str(e)}")
+            return False
+
+
+# Shared tracer used by the downloader
+tracer = Tracer()
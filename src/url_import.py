@@ -0,0 +1,165 @@
+import io
+import os
+import re
+import sys
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import sanitize_filename, logger
+    from playlist import PlaylistDownload
+    from archive import key_for_url
+else:
+    # Running directly as .py
+    from utils import sanitize_filename, logger
+    from playlist import PlaylistDownload
+    from archive import key_for_url
+
+# Anything that starts like a URL, up to whitespace or a CSV/HTML delimiter
+URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s,;"\'<>|]+', re.IGNORECASE)
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga',
+    'si', 'feature', 'pp', 'ref', 'ref_src', 'ref_url', 'share', 'spm',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+
+def iter_urls(lines):
+    """
+    URLs found in lines of pasted text, a plain list or a CSV export.
+
+    Every URL on a line is taken, whatever the separator; lines starting
+    with # are comments. Works lazily on any iterable of lines, such as
+    an open file.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        for match in URL_PATTERN.finditer(line):
+            url = match.group(0).rstrip('.)]')
+            yield url if '://' in url else 'https://' + url
+
+
+def count_urls(text):
+    """Number of URLs in a block of text (cheap enough for a paste check)."""
+    return sum(1 for _ in URL_PATTERN.finditer(text))
+
+
+def canonical_url(url):
+    """
+    URL with tracking parameters, the fragment and host case removed.
+
+    Only for comparing URLs: the query is re-encoded and parameters some
+    sites need are dropped, so it is not a URL to download from.
+
+    YouTube links in any form (youtu.be, shorts, embed, watch?v= with
+    extra parameters) become https://www.youtube.com/watch?v=ID.
+    """
+    key = key_for_url(url)
+    if key is not None and key[0] == 'youtube':
+        return f"https://www.youtube.com/watch?v={key[1]}"
+    parts = urlsplit(url.strip())
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def url_key(url):
+    """
+    Deduplication key of a URL.
+
+    Returns:
+        tuple: (extractor, id) when the video is known from the URL alone,
+            else ('url', canonical URL without scheme, www. or trailing slash)
+    """
+    key = key_for_url(url)
+    if key is not None:
+        return key
+    parts = urlsplit(canonical_url(url))
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    rest = parts.path.rstrip('/') + (f"?{parts.query}" if parts.query else '')
+    return 'url', host + rest
+
+
+class UrlListDownload(PlaylistDownload):
+    """
+    Downloads a list of URLs (pasted text or a .txt/.csv file) as one batch.
+
+    The list is read lazily on the pipeline thread and fed through the same
+    bounded extract/download/postprocess stages as a playlist, so a file
+    with ten thousand lines neither blocks the GUI nor gets far ahead of
+    the downloads. URLs are deduplicated by their canonical form, so a
+    video listed twice (in any URL form) is only fetched once, but each is
+    downloaded as written: signed query strings and parameters a site
+    needs must reach yt-dlp unchanged. Videos already in the download
+    archive or queued elsewhere are skipped.
+    """
+
+    name = "Import"
+
+    def __init__(self, downloader, type_choice, quality, folder, text=None, path=None, **kwargs):
+        """
+        Args:
+            downloader: Downloader whose scheduler, governor and archive are used
+            type_choice (str): '1' video+audio, '2' video only, '3' audio only
+            quality (str): One of PLAYLIST_QUALITIES
+            folder (str): Folder the files are saved in
+            text (str): Pasted URL list
+            path (str): File to read the URL list from instead
+        """
+        super().__init__(downloader, path or "pasted URLs", type_choice, quality, folder, **kwargs)
+        self.text = text
+        self.path = path
+        self.playlist_folder = folder
+        self.duplicates = 0
+
+    def _enumerate(self, extract_queue):
+        """Stream the URL list into the extract queue, skipping duplicates."""
+        if not self.downloader.ytdlp_exe:
+            return "yt-dlp executable not found"
+        seen = set()
+        try:
+            with (open(self.path, encoding='utf-8-sig', errors='replace') if self.path
+                  else io.StringIO(self.text or '')) as lines:
+                for url in iter_urls(lines):
+                    if self.stop_event.is_set():
+                        break
+                    key = url_key(url)
+                    if key in seen:
+                        self.duplicates += 1
+                        continue
+                    seen.add(key)
+                    index = len(seen)
+                    self.total = index
+                    entry = self._new_entry(index, url, url,
+                                            archive_key=None if key[0] == 'url' else key)
+                    if not self._add_entry(extract_queue, entry):
+                        break
+        except OSError as e:
+            logger.error(f"Could not read URL list {self.path}: {str(e)}")
+            return f"Could not read {os.path.basename(self.path)}: {e.strerror or str(e)}"
+        finally:
+            self.enumerated = True
+
+        if self.stop_event.is_set():
+            return "Cancelled"
+        if not seen:
+            return "No URLs found"
+        logger.info(f"URL import: {len(seen)} unique URLs, {self.duplicates} duplicates dropped")
+        return None
+
+    def _base_name(self, entry):
+        """Imported videos are saved under their own title."""
+        return sanitize_filename(entry['title'])
+
+    def _existing_file(self, entry):
+        # Nothing to match by position; the archive and deduplication cover it
+        return None
+
+    def stats(self):
+        stats = super().stats()
+        stats['duplicates'] = self.duplicates
+        return stats
@@ -0,0 +1,256 @@
+import os
+import sys
+import queue
+import signal
+import socket
+import threading
+from collections import Counter
+
+# Adjust import paths dynamically
+if getattr(sys, 'frozen', False):
+    # Running as compiled .exe
+    from utils import logger
+    from config import load_config, load_job_store_config
+    from downloader import Downloader
+    from playlist import PLAYLIST_QUALITIES, FINAL_STATES
+    from url_import import UrlListDownload, iter_urls, url_key
+    from job_store import LEASE_SECONDS, JobStoreServer, open_job_store
+    from engine import TYPE_CHOICES
+else:
+    # Running directly as .py
+    from utils import logger
+    from config import load_config, load_job_store_config
+    from downloader import Downloader
+    from playlist import PLAYLIST_QUALITIES, FINAL_STATES
+    from url_import import UrlListDownload, iter_urls, url_key
+    from job_store import LEASE_SECONDS, JobStoreServer, open_job_store
+    from engine import TYPE_CHOICES
+
+# How long an idle worker waits before asking the store for work again
+POLL_SECONDS = 5
+
+
+class LeasedDownload(UrlListDownload):
+    """
+    Downloads jobs leased from a shared JobStore until cancelled.
+
+    Instead of reading a list, enumeration keeps claiming jobs from the
+    store, only as many as its stages have workers, so jobs waiting here
+    are not held away from idle workers elsewhere. A heartbeat thread
+    renews the leases of unfinished entries; each entry's outcome is
+    reported back to the store when it finishes, and cancelled entries
+    are handed back for other workers. Finished entries are dropped from
+    memory, keeping only their counts, so a worker can run indefinitely.
+    """
+
+    name = "Worker"
+
+    def __init__(self, downloader, store, worker_id, type_choice, quality, folder, queue_name='default',
+                 lease_seconds=LEASE_SECONDS, **kwargs):
+        """
+        Args:
+            downloader: Downloader whose scheduler, governor and archive are used
+            store (JobStore): Where jobs are claimed from
+            worker_id (str): Name of this worker in the store
+            type_choice (str): '1' video+audio, '2' video only, '3' audio only
+            quality (str): One of PLAYLIST_QUALITIES
+            folder (str): Folder the files are saved in
+            queue_name (str): Store queue to work on
+            lease_seconds (int): Lease length; renewed every third of it
+        """
+        super().__init__(downloader, type_choice, quality, folder, **kwargs)
+        self.url = f"job store queue {queue_name}"
+        self.store = store
+        self.worker_id = worker_id
+        self.queue_name = queue_name
+        self.lease_seconds = lease_seconds
+        self.capacity = sum(self.workers)
+        self.finished = Counter()  # State -> entries dropped from self.entries
+
+    def _enumerate(self, extract_queue):
+        """Claim jobs into the extract queue until cancelled."""
+        if not self.downloader.ytdlp_exe:
+            return "yt-dlp executable not found"
+        threading.Thread(target=self._heartbeat, name="worker-heartbeat", daemon=True).start()
+        index = 0
+        try:
+            while not self.stop_event.is_set():
+                self._prune()
+                with self._lock:
+                    free = self.capacity - len(self.entries)
+                if free <= 0:
+                    self.stop_event.wait(0.5)
+                    continue
+                try:
+                    jobs = self.store.claim(self.worker_id, free, self.queue_name, self.lease_seconds)
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id} could not claim jobs: {str(e)}")
+                    jobs = []
+                if not jobs:
+                    self.stop_event.wait(POLL_SECONDS)
+                    continue
+                for job in jobs:
+                    index += 1
+                    self.total = index
+                    key = url_key(job['url'])
+                    entry = self._new_entry(index, job['url'], job['url'],
+                                            archive_key=None if key[0] == 'url' else key)
+                    entry['job'] = (job['id'], job['attempt'])
+                    # Registered even if the put gives up, so cancelling hands it back
+                    if not self._add_entry(extract_queue, entry):
+                        break
+        finally:
+            self.enumerated = True
+        return "Cancelled"
+
+    def _heartbeat(self):
+        """Renew the leases of unfinished entries; forget the ones lost to an expiry."""
+        while not self.stop_event.wait(self.lease_seconds / 3):
+            with self._lock:
+                held = {entry['job'][0]: entry for entry in self.entries.values() if 'job' in entry}
+            if not held:
+                continue
+            try:
+                lost = self.store.heartbeat(self.worker_id, [entry['job'] for entry in held.values()],
+                                            self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} heartbeat failed: {str(e)}")
+                continue
+            for job_id in lost:
+                entry = held[job_id]
+                entry.pop('job', None)
+                logger.warning(f"Worker {self.worker_id} lost the lease of job {job_id} ({entry['url']})")
+
+    def _release(self, entry):
+        """Report a finished, failed or cancelled entry to the store."""
+        super()._release(entry)
+        job = entry.pop('job', None)
+        if job is None:
+            return
+        try:
+            if not self.store.complete(self.worker_id, job[0], job[1], entry['state'],
+                                       error=entry['error'], path=entry['path']):
+                logger.warning(f"Worker {self.worker_id} no longer held job {job[0]} when it ended")
+        except Exception as e:
+            # The lease runs out and the job is handed out again
+            logger.error(f"Worker {self.worker_id} could not report job {job[0]}: {str(e)}")
+
+    def _prune(self):
+        """Drop reported entries, keeping their counts."""
+        with self._lock:
+            finished = [index for index, entry in self.entries.items()
+                        if entry['state'] in ('done', 'failed', 'skipped') and 'job' not in entry
+                        and index not in self._dirty]
+            for index in finished:
+                self.finished[self.entries.pop(index)['state']] += 1
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            finished = dict(self.finished)
+        for state, count in finished.items():
+            stats[state] += count
+        if stats['total']:
+            stats['percent'] += 100.0 * sum(finished.values()) / stats['total']
+        return stats
+
+
+def run_worker(store, folder, type_choice='1', quality=PLAYLIST_QUALITIES[0], queue_name='default',
+               worker_id=None):
+    """
+    Download jobs from a store until interrupted.
+
+    Returns:
+        int: Exit status
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    messages = queue.Queue()
+    downloader = Downloader(messages)
+    if not downloader.ytdlp_exe:
+        print("yt-dlp executable not found")
+        return 1
+    os.makedirs(folder, exist_ok=True)
+    batch = LeasedDownload(downloader, store, worker_id, type_choice, quality, folder, queue_name=queue_name)
+    downloader.playlist_job = batch
+    batch.start()
+    signal.signal(signal.SIGTERM, lambda *_: batch.cancel())
+    print(f"Worker {worker_id} downloading queue {queue_name} into {folder}")
+    try:
+        while batch.thread.is_alive():
+            try:
+                message = messages.get(timeout=1)
+            except queue.Empty:
+                continue
+            if message[0] == 'job_updates':
+                for record in message[1]:
+                    if record['state'] in FINAL_STATES:
+                        print(f"{record['state']}: {record['title']}"
+                              f"{' - ' + record['error'] if record['error'] else ''}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Unfinished entries go back to the queue for other workers
+        batch.cancel()
+        batch.thread.join()
+        downloader.cleanup()
+        store.close()
+    return 0
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Share a download queue between worker processes and machines")
+    parser.add_argument('--store', default=load_job_store_config(),
+                        help="SQLite file, or http://TOKEN@host:port of a served store (default: job_store setting)")
+    parser.add_argument('--queue', default='default', help="Queue name")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Queue URLs")
+    add.add_argument('sources', nargs='+', help="URLs, or URL list files")
+    run = commands.add_parser('run', help="Download jobs until interrupted")
+    run.add_argument('--folder', default=load_config(), help="Download folder (default: the app's)")
+    run.add_argument('--type', default='video+audio', choices=sorted(TYPE_CHOICES))
+    run.add_argument('--quality', default=PLAYLIST_QUALITIES[0], choices=PLAYLIST_QUALITIES)
+    run.add_argument('--id', help="Worker name (default: host-pid)")
+    serve = commands.add_parser('serve', help="Serve the store to workers on other machines")
+    serve.add_argument('--host', default='127.0.0.1',
+                       help="Interface to listen on (default: this machine only; 0.0.0.0 for all, on a trusted network)")
+    serve.add_argument('--port', type=int, default=9615)
+    serve.add_argument('--token', help="Access token (default: a new random one)")
+    commands.add_parser('status', help="Show job counts and workers")
+    args = parser.parse_args()
+
+    store = open_job_store(args.store)
+    if args.command == 'add':
+        urls = []
+        for source in args.sources:
+            if os.path.isfile(source):
+                with open(source, encoding='utf-8-sig', errors='replace') as f:
+                    urls.extend(iter_urls(f))
+            else:
+                urls.extend(iter_urls([source]))
+        print(f"{store.add(urls, args.queue)} of {len(urls)} URLs queued")
+    elif args.command == 'run':
+        if not args.folder:
+            parser.error("no --folder given and no download folder set")
+        sys.exit(run_worker(store, args.folder, TYPE_CHOICES[args.type], args.quality, args.queue, args.id))
+    elif args.command == 'serve':
+        server = JobStoreServer(store, args.host, args.port, args.token)
+        print(f"Serving {args.store}; workers use --store http://{server.token}@HOST:{server.server_address[1]}")
+        if server.server_address[0].startswith('127.'):
+            print("Only workers on this machine can connect; pass --host 0.0.0.0 to serve other machines")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
+    else:
+        stats = store.stats(args.queue)
+        print(f"Queue {stats['queue']}: " + ", ".join(f"{count} {state}" for state, count in stats['counts'].items()))
+        for worker, age in stats['workers'].items():
+            print(f"  {worker}: last seen {age:.0f} s ago")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Tests for resuming direct downloads after the process was killed."""
+
+import os
+import sys
+import time
+import signal
+import subprocess
+
+import urllib3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+BENCH_DIR = os.path.join(ROOT_DIR, "benchmarks")
+for folder in (SRC_DIR, BENCH_DIR):
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+
+from direct_download import DirectDownload  # noqa: E402
+from prealloc import POSITION_SUFFIX, committed_size  # noqa: E402
+from netem_server import NetemConfig, NetemServer, generate_bytes  # noqa: E402
+
+SIZE = 8 * 1048576
+MEDIA_PATH = f"/media/clip.mp4?size={SIZE}"
+
+# Runs a rate-limited download in a child process that the test kills mid-write
+CHILD = """
+import sys
+sys.path.insert(0, {src!r})
+import urllib3
+from direct_download import DirectDownload
+DirectDownload(urllib3.PoolManager(), sys.argv[1], sys.argv[2], size={size}, rate=2 * 1048576,
+               buffer_size=256 * 1024, on_output=lambda line: print(line, flush=True)).start().wait()
+"""
+
+
+def test_resume_after_kill(tmp_path):
+    server = NetemServer(config=NetemConfig()).start()
+    try:
+        url = server.url(MEDIA_PATH)
+        path = str(tmp_path / "clip.mp4")
+        part_path = path + ".part"
+        child = subprocess.Popen([sys.executable, "-c", CHILD.format(src=SRC_DIR, size=SIZE), url, path],
+                                 stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 20
+        while committed_size(part_path) < SIZE // 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+
+        # Preallocated to the full size, but only part of it is data
+        written = committed_size(part_path)
+        assert os.path.getsize(part_path) == SIZE
+        assert os.path.exists(part_path + POSITION_SUFFIX)
+        assert 0 < written < SIZE
+
+        lines = []
+        download = DirectDownload(urllib3.PoolManager(), url, path, size=SIZE, on_output=lines.append)
+        assert download.start().wait(30) == 0, lines
+        with open(path, "rb") as f:
+            assert f.read() == generate_bytes("/media/clip.mp4", 0, SIZE)
+        assert not os.path.exists(part_path)
+        assert not os.path.exists(part_path + POSITION_SUFFIX)
+    finally:
+        server.stop()
@@ -0,0 +1,35 @@
+"""Tests for the download engine's single-video submissions."""
+
+import os
+import sys
+import queue
+from types import SimpleNamespace
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from engine import SingleDownload  # noqa: E402
+
+SIGNED_URL = ("https://vod.akamaized.net/i/videos/abc/,480p,720p,1080p,.mp4.csmil/master.m3u8"
+              "?hdnea=exp=1~acl=/*~hmac=ab/cd&ref=share&si=x")
+
+
+def _enumerated(**options):
+    downloader = SimpleNamespace(queue=queue.Queue(), ytdlp_exe="yt-dlp")
+    batch = SingleDownload(downloader, SIGNED_URL, '1', "Best available", "/tmp", **options)
+    extract_queue = queue.Queue()
+    assert batch._enumerate(extract_queue) is None
+    return batch, extract_queue.get_nowait()
+
+
+def test_media_url_is_downloaded_unchanged():
+    batch, entry = _enumerated(format_spec="best", title="Clip - 720p", page_url="https://example.com/watch/1")
+    assert entry['url'] == SIGNED_URL
+    assert batch.total == 1
+    assert batch._base_name(entry) == "Clip - 720p"
+
+
+def test_page_url_keys_the_entry():
+    _, entry = _enumerated(page_url="https://www.youtube.com/watch?v=abcdefghijk")
+    assert entry['archive_key'] == ('youtube', 'abcdefghijk')
@@ -0,0 +1,73 @@
+"""Tests for cancelling requests on the shared PhantomJS worker."""
+
+import os
+import sys
+import time
+import threading
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from phantom import PhantomJSWorker  # noqa: E402
+
+# Stands in for the PhantomJS worker script: answers each request after a
+# delay taken from its URL, e.g. https://example.com/0.5
+FAKE_WORKER = """
+import sys, json, time
+for line in sys.stdin:
+    if line.strip() == 'quit':
+        break
+    request = json.loads(line)
+    time.sleep(float(request['url'].rsplit('/', 1)[1]))
+    result = {'id': request['id'], 'videoUrls': [request['url'] + '.m3u8'], 'audioUrls': []}
+    print('@@RESULT ' + json.dumps(result), flush=True)
+"""
+
+
+def _start(worker, url, results):
+    request_id = worker.new_request_id()
+
+    def run():
+        results[request_id] = worker.extract(url, request_id=request_id)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return request_id, thread
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancel_leaves_other_requests_running():
+    worker = PhantomJSWorker(sys.executable, FAKE_WORKER)
+    results = {}
+    try:
+        first, first_thread = _start(worker, "https://example.com/0.5", results)
+        _wait_for(lambda: worker._active == first)
+        second, second_thread = _start(worker, "https://example.com/0", results)
+        _wait_for(lambda: second in worker._waiting)
+
+        # Cancelling the queued request must not kill the one in flight
+        worker.cancel(second)
+        first_thread.join(5)
+        second_thread.join(5)
+        assert results[first]['videoUrls'] == ["https://example.com/0.5.m3u8"]
+        assert results[second] == {"error": "Cancelled"}
+
+        # Cancelling the one in flight leaves the queued request to a restarted worker
+        third, third_thread = _start(worker, "https://example.com/5", results)
+        _wait_for(lambda: worker._active == third)
+        fourth, fourth_thread = _start(worker, "https://example.com/0", results)
+        _wait_for(lambda: fourth in worker._waiting)
+        worker.cancel(third)
+        third_thread.join(5)
+        fourth_thread.join(5)
+        assert "error" in results[third]
+        assert results[fourth]['videoUrls'] == ["https://example.com/0.m3u8"]
+    finally:
+        worker.shutdown()